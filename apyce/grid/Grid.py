@@ -1,9 +1,47 @@
-from apyce.utils import misc, Errors
-from apyce.io import VTK
+from apyce.utils import misc, geometry, profiler, upscaling, Errors
+from apyce.io import VTK, VTU, GRDECL, ECL, Cache
 
 import numpy as np
 
+from concurrent.futures import ThreadPoolExecutor
+import os
 import re
+import threading
+
+
+class _Keyword:
+    r"""
+    Array of a GRDECL keyword that is parsed from the keyword index on first access.
+
+    Parameters
+    ----------
+    keyword : string
+        The keyword e.g. PORO.
+
+    Notes
+    -----
+    This is a non-data descriptor, once parsed the array is stored in the instance and
+        the descriptor is no longer called. Keywords not found in the grid file are empty lists.
+
+    """
+
+    def __init__(self, keyword):
+        self._keyword = keyword
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, grid, owner=None):
+        if grid is None:
+            return self
+
+        if self._keyword not in grid._index:
+            return []
+
+        data = grid._load_keyword(self._keyword)
+        grid.__dict__[self._name] = data
+
+        return data
 
 
 class Grid:
@@ -33,7 +71,7 @@ class Grid:
     G._zcorn : ndarray
         A list of floating point numbers that represents the ZCORN keyword from Schlumberger Eclipse.
     G._actnum : ndarray
-        A list of integer (0 or 1) numbers that represents the ACTNUM keyword from Schlumberger Eclipse.
+        A list of uint8 (0 or 1) numbers that represents the ACTNUM keyword from Schlumberger Eclipse.
     G._poro : ndarray
         A list of floating point numbers that represents the PORO keyword from Schlumberger Eclipse.
     G._permx : ndarray
@@ -44,6 +82,8 @@ class Grid:
         A list of floating point numbers that represents the PERMZ keyword from Schlumberger Eclipse.
     G._so : ndarray
         A list of floating point numbers that represents the SO keyword from Schlumberger Eclipse.
+    G._ntg : ndarray
+        A list of floating point numbers that represents the NTG keyword from Schlumberger Eclipse.
     G._grid_type : string
         A string that holds the grid type (corner-point / cartesian).
     G._grid_origin : string
@@ -58,15 +98,76 @@ class Grid:
         A list of floating point numbers that represents the DZ keyword from Schlumberger Eclipse.
     G._tops : ndarray
         A list of floating point numbers that represents the TOPS keyword from Schlumberger Eclipse.
+    G._cache : boolean
+        A boolean that will be used to read (and write) the parsed arrays from an on-disk cache.
+    G._files : list
+        A list of strings with the path of the grid file followed by the files reached through INCLUDE.
+    G._index : dict
+        The file, offset and length of the section of each keyword, the arrays are parsed on first access.
+    G._properties : list
+        A list of strings with the properties attached to the VTK grid, None for all of them.
+    G._global_index : ndarray
+        The global index of each cell of the VTK grid when only the active cells are built, empty otherwise.
+    G._weld_tolerance : float
+        The tolerance used to merge the coincident nodes of neighbouring cells, None if they are not merged.
+    G._cell_dtype : string
+        The type of the properties in the VTK grid, None to keep the type of the parsed arrays.
+    G._zero_copy : boolean
+        A boolean that will be used to attach the properties to the VTK grid without copies.
+    G._cell_buffers : dict
+        The NumPy arrays whose memory is used by the VTK arrays of the properties (zero_copy only), by name.
+    G._cell_data : dict
+        The properties added by load_cell_data() and compute_topology(), by name.
+    G._connections : dict
+        The cells sharing a face found by compute_topology(), see apyce.utils.geometry.face_connections().
+    G._geometry : dict
+        The volume, centroid, face areas and face normals of each cell computed by compute_geometry().
+    G._locator : dict
+        The bin index of the columns of cells used by locate(), see apyce.utils.geometry.column_index().
+    G._parent : Grid
+        The grid this grid was extracted from by subgrid(), None otherwise.
+    G._box : tuple
+        The slices (K, J, I) of the cells of the parent grid kept by subgrid(), None otherwise.
+    G._pushed : dict
+        The arrays last pushed to the VTK grid, by name, only new or replaced arrays are pushed again.
+    G._io_workers : int
+        The number of threads reading the grid file and its INCLUDE files, None to read them one at a time.
+    G._dtype : dtype
+        The type of the floating point arrays of the grid, ACTNUM is always uint8.
+    G._profiler : Profiler
+        The wall time, bytes, cells and peak RSS of each stage of the reading, processing and export of the grid.
 
     Parameters
     ----------
     filename : string, default is 'data.grdecl'.
-        A string that holds the name (path) of the grid file.
+        A string that holds the name (path) of the grid file, either an ASCII GRDECL deck or
+            an ECLIPSE binary EGRID file (the INIT and UNRST files with the same name are read too).
     grid_origin : string, default is 'eclipse'.
         A string that holds the grid origin (eclipse / builder).
     verbose : boolean, default is True.
         A boolean that will be used to emit (or not) messages to screen while processing.
+    cache : boolean, default is False.
+        If True, the parsed arrays are saved to an on-disk cache next to the grid file and loaded back
+            (memory-mapped) while the grid file and its included files are unchanged. The points and cells
+            built by process_grid() are cached too, keyed by a hash of the arrays describing the geometry,
+            so they are reused while only the properties change.
+    cell_dtype : string, default is 'auto'.
+        The type of the properties in the VTK grid ('float32' or 'float64'), None to keep the type of the
+            parsed arrays. 'auto' is 'float32', or None with zero_copy. ACTNUM is always attached as uint8.
+    zero_copy : boolean, default is False.
+        If True, the VTK arrays of the properties use the memory of the NumPy arrays instead of a copy,
+            the arrays are kept alive in G._cell_buffers. A cell_dtype other than the type of the parsed
+            arrays (see dtype) converts them, which is a copy.
+    io_workers : int, optional
+        If given, the grid file and its INCLUDE files are scanned, then all the keywords parsed, by a pool of
+            this number of threads instead of one file at a time, on first access.
+    dtype : string, default is 'float64'.
+        The type of COORD, ZCORN, DX, DY, DZ, TOPS, the properties and the points of the VTK grid
+            ('float64' or 'float32'). The pillar interpolation is always done in float64.
+    callback : callable, optional
+        A function called with the event of each stage (file read, keyword parse, point build, cell build,
+            property attach and write), see apyce.utils.profiler.Profiler. The events are also logged on the
+            'apyce.utils.profiler' logger at DEBUG level and summarized by profile().
 
     Examples
     --------
@@ -76,10 +177,43 @@ class Grid:
     >>> G.load_cell_data(filename='dome_Temperature.txt', name='TEMP')
     >>> G.export_data()
     >>> G.plot_grid(filename='Results/dome.vtu', property='TEMP')
+    >>> print(G.profile())
 
     """
 
-    def __init__(self, filename='data.txt', grid_origin='eclipse', verbose=True):
+    # Keywords with a section of data and the attribute that holds them
+    DATA_KEYWORDS = {
+        'COORD': '_coord',
+        'ZCORN': '_zcorn',
+        'TOPS': '_tops',
+        'DX': '_dx',
+        'DY': '_dy',
+        'DZ': '_dz',
+        'ACTNUM': '_actnum',
+        'PORO': '_poro',
+        'PERMX': '_permx',
+        'PERMY': '_permy',
+        'PERMZ': '_permz',
+        'SO': '_so',
+        'NTG': '_ntg'
+    }
+
+    _coord = _Keyword('COORD')
+    _zcorn = _Keyword('ZCORN')
+    _tops = _Keyword('TOPS')
+    _dx = _Keyword('DX')
+    _dy = _Keyword('DY')
+    _dz = _Keyword('DZ')
+    _actnum = _Keyword('ACTNUM')
+    _poro = _Keyword('PORO')
+    _permx = _Keyword('PERMX')
+    _permy = _Keyword('PERMY')
+    _permz = _Keyword('PERMZ')
+    _so = _Keyword('SO')
+    _ntg = _Keyword('NTG')
+
+    def __init__(self, filename='data.txt', grid_origin='eclipse', verbose=True, cache=False, cell_dtype='auto',
+                 zero_copy=False, io_workers=None, dtype='float64', callback=None):
         self._filename = filename
 
         self._vtk_unstructured_grid = VTK()
@@ -90,25 +224,49 @@ class Grid:
 
         self._cart_dims = []
         self._num_cell = 0
-        self._coord = []
-        self._zcorn = []
-        self._tops = []
-        self._dx = []
-        self._dy = []
-        self._dz = []
-        self._actnum = []
-        self._poro = []
-        self._permx = []
-        self._permy = []
-        self._permz = []
-        self._so = []
+        self._index = {}
+        self._properties = None
+        self._global_index = []
+        self._weld_tolerance = None
 
         self._grid_type = ''
         self._grid_origin = grid_origin
         self._verbose = verbose
+        self._cache = cache
+        self._files = []
+        # Properties converted to float32 unless they are attached without copies
+        if cell_dtype == 'auto':
+            cell_dtype = None if zero_copy else 'float32'
+        self._cell_dtype = cell_dtype
+        self._zero_copy = zero_copy
+        self._cell_buffers = {}
+        self._cell_data = {}
+        self._connections = {}
+        self._geometry = {}
+        self._locator = {}
+        self._parent = None
+        self._box = None
+        self._pushed = {}
+        self._io_workers = io_workers
+        self._dtype = np.dtype(dtype)
+        self._profiler = profiler.Profiler(callback)
 
         if self._grid_origin == 'eclipse':
-            self._read_grdecl(self._filename, self._verbose)
+            # Check if file exists and can be open
+            misc.file_open_exception(self._filename)
+
+            if ECL.is_binary(self._filename):
+                self._read_egrid(self._filename, self._verbose)
+            elif not (self._cache and self._read_cache()):
+                if self._io_workers is None:
+                    self._read_grdecl(self._filename, self._verbose)
+                else:
+                    with ThreadPoolExecutor(max_workers=self._io_workers) as executor:
+                        self._read_grdecl(self._filename, self._verbose,
+                                          self._scan_include_tree(self._filename, executor))
+                        self._load_keywords(executor)
+                if self._cache:
+                    self._write_cache()
         else:
             pass
 
@@ -119,14 +277,14 @@ class Grid:
                  "{0:<35s} {1}".format('keywords', self._keywords), "{0:<35s} {1}".format('unrec', self._unrec), header]
         return "\n".join(lines)
 
-    def _read_grdecl(self, filename, verbose):
+    def _read_grdecl(self, filename, verbose, scans=None):
         r"""
         Read subset of ECLIPSE grid file.
 
         The currently recognized keywords of ECLIPSE are:
             'COORD', 'SPECGRID', 'DIMENS', 'DX', 'DY', 'DZ',
             'TOPS', 'INCLUDE', 'PERMX', 'PERMY', 'PERMZ',
-            'PORO', 'ZCORN', 'SO', and 'ACTNUM'.
+            'PORO', 'ZCORN', 'SO', 'NTG' and 'ACTNUM'.
 
         Parameters
         ----------
@@ -134,208 +292,454 @@ class Grid:
             A string that holds the name (path) of the grid file.
         verbose : boolean
             A boolean that will be used to emit (or not) messages to screen while processing.
+        scans : dict, optional
+            Futures of the scans of the grid file and of its included files, by path (see _scan_include_tree()).
+                If None, the files are scanned one at a time.
+
+        Notes
+        -----
+        Only the dimensions (SPECGRID / DIMENS) are parsed here. For the other keywords, the file, offset and
+            length of the section are recorded in G._index (including the sections inside INCLUDE files),
+            the section is parsed and its size checked on first access to the array.
+
+        The keywords found by _scan_grdecl() are applied in the order of the files, so the scans can run
+            concurrently and still give the same grid and the same errors.
 
         """
 
-        # Check if file exists and can be open
-        misc.file_open_exception(filename)
+        if scans is None:
+            events = self._scan_grdecl(filename)
+        else:
+            events = scans[misc.get_path(filename)].result()
 
         if verbose:
             print("[INPUT] Reading input ECLIPSE file\n")
 
-        with open(misc.get_path(filename)) as f:
-            for line in f:
-                # Keyword pattern
-                kw = re.match('^[A-Z][A-Z0-9]{0,7}', str(line))
-
-                if kw is not None:
-                    if kw.group() == 'SPECGRID':
-                        self._grid_type = 'corner-point'
-                        if verbose:
-                            print("[+] Reading keyword SPECGRID")
-                        if kw.group() not in self._keywords:
-                            self._keywords.append(kw.group())
-                        else:
-                            raise RuntimeError(Errors.Errors.CART_DIMS_ERROR.value)
-                        line = f.readline().strip()
-                        self._cart_dims = np.array(re.findall('\d+', str(line))[0:3], dtype=int)
-                        self._num_cell = np.prod(self._cart_dims)
-                    elif kw.group() == 'DIMENS':
-                        self._grid_type = 'cartesian'
-                        if verbose:
-                            print("[+] Reading keyword DIMENS")
-                        if kw.group() not in self._keywords:
-                            self._keywords.append(kw.group())
-                        else:
-                            raise RuntimeError(Errors.Errors.CART_DIMS_ERROR.value)
-                        line = f.readline().strip()
-                        self._cart_dims = np.array(re.findall('\d+', str(line))[0:3], dtype=int)
-                        self._num_cell = np.prod(self._cart_dims)
+        for event in events:
+            keyword = event[0]
+
+            if keyword == 'ERROR':
+                raise event[1]
+            elif keyword == 'FILE':
+                self._files.append(event[1])
+            elif keyword in ['SPECGRID', 'DIMENS']:
+                self._grid_type = 'corner-point' if keyword == 'SPECGRID' else 'cartesian'
+                if verbose:
+                    print("[+] Reading keyword {}".format(keyword))
+                if keyword not in self._keywords:
+                    self._keywords.append(keyword)
+                else:
+                    raise RuntimeError(Errors.CART_DIMS_ERROR.value)
+                self._cart_dims = np.array(re.findall(r'\d+', event[1])[0:3], dtype=int)
+                self._num_cell = np.prod(self._cart_dims)
+            elif keyword == 'INCLUDE':
+                if verbose:
+                    print("[+] Reading keyword INCLUDE")
+                    print("\t--> {}".format(misc.get_basename(event[1])))
+                self._read_grdecl(event[1], False, scans)
+                if verbose:
+                    print("\t<-- {}".format(misc.get_basename(event[1])))
+            elif keyword in self.DATA_KEYWORDS:
+                # Check if grid is already defined
+                misc.check_dim(self._cart_dims, self._num_cell, keyword, None)
+                if verbose:
+                    print("[+] Reading keyword {}".format(keyword))
+                if keyword not in self._keywords:
+                    self._keywords.append(keyword)
+                # Only record where the section is, it is parsed on first access
+                self._index[keyword] = event[1]
+                self.__dict__.pop(self.DATA_KEYWORDS[keyword], None)
+            elif keyword not in self._unrec:
+                if verbose:
+                    print("[+] Unrecognized keyword found {}".format(keyword))
+                self._unrec.append(keyword)
+
+    def _scan_grdecl(self, filename):
+        r"""
+        Scan an ECLIPSE grid file, without following INCLUDE, and list the keywords found.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the grid file.
+
+        Returns
+        -------
+        events : list
+            A list of tuples, in the order of the file:
+                ('FILE', path) first,
+                ('SPECGRID', line) / ('DIMENS', line) with the line holding the dimensions,
+                ('INCLUDE', path) with the path of the included file,
+                (keyword, (path, offset, length)) for the keywords with a section of data,
+                (keyword,) for the unrecognized keywords,
+                ('ERROR', exception) if the scan failed, as the last event.
+
+        Notes
+        -----
+        No state of the grid is changed here, so several files can be scanned at the same time.
+
+        """
+
+        events = []
+
+        try:
+            # Check if file exists and can be open
+            misc.file_open_exception(filename)
+            events.append(('FILE', misc.get_path(filename)))
+
+            with self._profiler.stage('file read', misc.get_basename(filename)) as event, GRDECL(filename) as f:
+                while True:
+                    line = f.readline()
+                    if not line:
+                        break
+
+                    # Keyword pattern
+                    kw = re.match('^[A-Z][A-Z0-9]{0,7}', line.decode('latin-1'))
+
+                    if kw is None:
+                        continue
+
+                    if kw.group() in ['SPECGRID', 'DIMENS']:
+                        events.append((kw.group(), f.readline().decode('latin-1').strip()))
                     elif kw.group() == 'INCLUDE':
-                        if verbose:
-                            print("[+] Reading keyword INCLUDE")
-                        line = f.readline()
-                        inc_fn = misc.get_include_file(filename, line)
-                        if verbose:
-                            print("\t--> {}".format(misc.get_basename(inc_fn)))
-                        self._read_grdecl(inc_fn, False)
-                        if verbose:
-                            print("\t<-- {}".format(misc.get_basename(inc_fn)))
-                    elif kw.group() == 'COORD':
-                        # Check if grid is already defined
-                        misc.check_dim(self._cart_dims, self._num_cell, kw.group(), f)
-                        if verbose:
-                            print("[+] Reading keyword COORD")
-                        if kw.group() not in self._keywords:
-                            self._keywords.append(kw.group())
-                        self._coord = self._read_section_grdecl(f)
-                        # Check if self._coord have the correct number of values
-                        if len(self._coord) != 6*(self._cart_dims[0]+1)*(self._cart_dims[1]+1):
-                            raise ValueError(Errors.Errors.COORD_ERROR.value)
-                        self._coord = np.array(self._coord, dtype=float)
-                    elif kw.group() == 'ZCORN':
-                        # Check if grid is already defined
-                        misc.check_dim(self._cart_dims, self._num_cell, kw.group(), f)
-                        if verbose:
-                            print("[+] Reading keyword ZCORN")
-                        if kw.group() not in self._keywords:
-                            self._keywords.append(kw.group())
-                        self._zcorn = self._read_section_grdecl(f)
-                        # Check if self._zcorn have the correct number of values
-                        if len(self._zcorn) != 8*self._num_cell:
-                            raise ValueError(Errors.Errors.ZCORN_ERROR.value)
-                        self._zcorn = np.array(self._zcorn, dtype=float)
-                    elif kw.group() == 'PORO':
-                        # Check if grid is already defined
-                        misc.check_dim(self._cart_dims, self._num_cell, kw.group(), f)
-                        if verbose:
-                            print("[+] Reading keyword PORO")
-                        if kw.group() not in self._keywords:
-                            self._keywords.append(kw.group())
-                        self._poro = self._read_section_grdecl(f)
-                        # Check if self._poro have the correct number os values
-                        if len(self._poro) != self._num_cell:
-                            raise ValueError(Errors.Errors.PORO_ERROR.value)
-                        self._poro = np.array(self._poro, dtype=float)
-                    elif kw.group() == 'PERMX':
-                        # Check if grid is already defined
-                        misc.check_dim(self._cart_dims, self._num_cell, kw.group(), f)
-                        if verbose:
-                            print("[+] Reading keyword PERMX")
-                        if kw.group() not in self._keywords:
-                            self._keywords.append(kw.group())
-                        self._permx = self._read_section_grdecl(f)
-                        # Check if self._permx have the correct number of values
-                        if len(self._permx) != self._num_cell:
-                            raise ValueError(Errors.Errors.PERMX_ERROR.value)
-                        self._permx = np.array(self._permx, dtype=float)
-                    elif kw.group() == 'PERMY':
-                        # Check if grid is already defined
-                        misc.check_dim(self._cart_dims, self._num_cell, kw.group(), f)
-                        if verbose:
-                            print("[+] Reading keyword PERMY")
-                        if kw.group() not in self._keywords:
-                            self._keywords.append(kw.group())
-                        self._permy = self._read_section_grdecl(f)
-                        # Check if self._permy have the correct number of values
-                        if len(self._permy) != self._num_cell:
-                            raise ValueError(Errors.Errors.PERMY_ERROR.value)
-                        self._permy = np.array(self._permy, dtype=float)
-                    elif kw.group() == 'PERMZ':
-                        # Check if grid is already defined
-                        misc.check_dim(self._cart_dims, self._num_cell, kw.group(), f)
-                        if verbose:
-                            print("[+] Reading keyword PERMZ")
-                        if kw.group() not in self._keywords:
-                            self._keywords.append(kw.group())
-                        self._permz = self._read_section_grdecl(f)
-                        # Check if self._permz have the correct number of values
-                        if len(self._permz) != self._num_cell:
-                            raise ValueError(Errors.Errors.PERMZ_ERROR.value)
-                        self._permz = np.array(self._permz, dtype=float)
-                    elif kw.group() == 'ACTNUM':
-                        # Check if grid is already defined
-                        misc.check_dim(self._cart_dims, self._num_cell, kw.group(), f)
-                        if verbose:
-                            print("[+] Reading keyword ACTNUM")
-                        if kw.group() not in self._keywords:
-                            self._keywords.append(kw.group())
-                        self._actnum = self._read_section_grdecl(f)
-                        # Check if self._actnum have the correct number of values
-                        if len(self._actnum) != self._num_cell:
-                            raise ValueError(Errors.Errors.ACTNUM_ERROR.value)
-                        self._actnum = np.array(self._actnum, dtype=int)
-                    elif kw.group() == 'SO':
-                        # Check if grid is already defined
-                        misc.check_dim(self._cart_dims, self._num_cell, kw.group(), f)
-                        if verbose:
-                            print("[+] Reading keyword SO")
-                        if kw.group() not in self._keywords:
-                            self._keywords.append(kw.group())
-                        self._so = self._read_section_grdecl(f)
-                        # Check if self._so have the correct number of values
-                        if len(self._so) != self._num_cell:
-                            raise ValueError(Errors.Errors.SO_ERROR.value)
-                        self._so = np.array(self._so, dtype=float)
-                    elif kw.group() == 'TOPS':
-                        # Check if grid is already defined
-                        misc.check_dim(self._cart_dims, self._num_cell, kw.group(), f)
-                        if verbose:
-                            print("[+] Reading keyword TOPS")
-                        if kw.group() not in self._keywords:
-                            self._keywords.append(kw.group())
-                        self._tops = self._read_section_grdecl(f)
-                        # Check if self._tops have the correct number of values
-                        if len(self._tops) != self._cart_dims[0]*self._cart_dims[1]:
-                            raise ValueError(Errors.Errors.TOPS_ERROR.value)
-                        self._tops = np.array(self._tops, dtype=float)
-                    elif kw.group() == 'DX':
-                        # Check if grid is already defined
-                        misc.check_dim(self._cart_dims, self._num_cell, kw.group(), f)
-                        if verbose:
-                            print("[+] Reading keyword DX")
-                        if kw.group() not in self._keywords:
-                            self._keywords.append(kw.group())
-                        self._dx = self._read_section_grdecl(f)
-                        # Check if self._tops have the correct number of values
-                        if len(self._dx) != self._num_cell:
-                            raise ValueError(Errors.Errors.DX_ERROR.value)
-                        self._dx = np.array(self._dx, dtype=float)
-                    elif kw.group() == 'DY':
-                        # Check if grid is already defined
-                        misc.check_dim(self._cart_dims, self._num_cell, kw.group(), f)
-                        if verbose:
-                            print("[+] Reading keyword DY")
-                        if kw.group() not in self._keywords:
-                            self._keywords.append(kw.group())
-                        self._dy = self._read_section_grdecl(f)
-                        # Check if self._tops have the correct number of values
-                        if len(self._dy) != self._num_cell:
-                            raise ValueError(Errors.Errors.DY_ERROR.value)
-                        self._dy = np.array(self._dy, dtype=float)
-                    elif kw.group() == 'DZ':
-                        # Check if grid is already defined
-                        misc.check_dim(self._cart_dims, self._num_cell, kw.group(), f)
-                        if verbose:
-                            print("[+] Reading keyword DZ")
-                        if kw.group() not in self._keywords:
-                            self._keywords.append(kw.group())
-                        self._dz = self._read_section_grdecl(f)
-                        # Check if self._tops have the correct number of values
-                        if len(self._dz) != self._num_cell:
-                            raise ValueError(Errors.Errors.DZ_ERROR.value)
-                        self._dz = np.array(self._dz, dtype=float)
-                    elif kw.group() not in self._unrec:
-                        if verbose:
-                            print("[+] Unrecognized keyword found {}".format(kw.group()))
-                        self._unrec.append(kw.group())
-
-    def process_grid(self):
+                        events.append(('INCLUDE', misc.get_include_file(filename, f.readline().decode('latin-1'))))
+                    elif kw.group() in self.DATA_KEYWORDS:
+                        offset, length = f.skip_section()
+                        events.append((kw.group(), (misc.get_path(filename), offset, length)))
+                    else:
+                        events.append((kw.group(),))
+
+                event['bytes'] = f.tell()
+        except (OSError, EOFError, ValueError) as error:
+            events.append(('ERROR', error))
+
+        return events
+
+    def _scan_include_tree(self, filename, executor):
+        r"""
+        Scan a grid file and all the files reached through INCLUDE concurrently.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the grid file.
+        executor : Executor
+            The pool running the scans.
+
+        Returns
+        -------
+        scans : dict
+            Futures of the events of _scan_grdecl(), by path. The included files are submitted as soon as
+                the file including them is scanned.
+
+        """
+
+        scans = {}
+        lock = threading.Lock()
+
+        def scan(path):
+            events = self._scan_grdecl(path)
+            for event in events:
+                if event[0] == 'INCLUDE':
+                    submit(event[1])
+            return events
+
+        def submit(path):
+            with lock:
+                if misc.get_path(path) not in scans:
+                    scans[misc.get_path(path)] = executor.submit(scan, path)
+
+        submit(filename)
+
+        return scans
+
+    def _load_keywords(self, executor):
+        r"""
+        Parse all the sections of the keyword index concurrently.
+
+        Parameters
+        ----------
+        executor : Executor
+            The pool running the parsers.
+
+        Notes
+        -----
+        The arrays are stored in the order of the index and the first error, in that order, is raised.
+
+        """
+
+        futures = {keyword: executor.submit(self._load_keyword, keyword) for keyword in self._index}
+
+        for keyword, future in futures.items():
+            self.__dict__[self.DATA_KEYWORDS[keyword]] = future.result()
+
+    def _load_keyword(self, keyword):
+        r"""
+        Parse the section of a keyword recorded in the keyword index.
+
+        Parameters
+        ----------
+        keyword : string
+            The keyword e.g. PORO.
+
+        """
+
+        # Sub-grid, the array of the parent grid is sliced instead
+        if self._parent is not None:
+            return self._get_box_data(getattr(self._parent, self.DATA_KEYWORDS[keyword]))
+
+        filename, offset, length = self._index[keyword]
+
+        if self._verbose:
+            print("[+] Loading keyword {}".format(keyword))
+
+        with self._profiler.stage('keyword parse', keyword, length) as event, GRDECL(filename) as f:
+            f.seek(offset)
+            data, count = f.read_section(self._get_keyword_size(keyword), self._get_keyword_dtype(keyword))
+            event['cells'] = count
+
+        # Check if the array have the correct number of values
+        if count != self._get_keyword_size(keyword):
+            raise ValueError(Errors[keyword + '_ERROR'].value)
+
+        return data
+
+    def _get_keyword_dtype(self, keyword):
+        r"""
+        Return the type of the array of a keyword, uint8 for ACTNUM and G._dtype otherwise.
+
+        Parameters
+        ----------
+        keyword : string
+            The keyword e.g. PORO.
+
+        """
+
+        return np.uint8 if keyword == 'ACTNUM' else self._dtype
+
+    def _get_keyword_size(self, keyword):
+        r"""
+        Return the number of values of a keyword.
+
+        Parameters
+        ----------
+        keyword : string
+            The keyword e.g. PORO.
+
+        """
+
+        if keyword == 'COORD':
+            return 6*(self._cart_dims[0]+1)*(self._cart_dims[1]+1)
+        elif keyword == 'ZCORN':
+            return 8*self._num_cell
+        elif keyword == 'TOPS':
+            return self._cart_dims[0]*self._cart_dims[1]
+        else:
+            return self._num_cell
+
+    def _read_egrid(self, filename, verbose):
+        r"""
+        Read ECLIPSE binary grid file (EGRID) and the properties of the INIT and UNRST files with the same name.
+
+        The arrays used from each file are:
+            EGRID: 'GRIDHEAD', 'COORD', 'ZCORN' and 'ACTNUM'.
+            INIT: 'PORO', 'PERMX', 'PERMY', 'PERMZ' and 'NTG'.
+            UNRST: 'SOIL' of the last report step (as 'SO').
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the EGRID file.
+        verbose : boolean
+            A boolean that will be used to emit (or not) messages to screen while processing.
+
+        Notes
+        -----
+        The INIT and UNRST arrays only hold values for the active cells, they are scattered back
+            to the global grid (zero in the inactive cells).
+
+        """
+
+        # Check if file exists and can be open
+        misc.file_open_exception(filename)
+        self._files.append(misc.get_path(filename))
+
+        if verbose:
+            print("[INPUT] Reading input ECLIPSE binary file\n")
+
+        egrid = ECL(filename)
+
+        gridhead = egrid.read('GRIDHEAD')
+        if gridhead is None:
+            raise ValueError(Errors.GRID_NOT_DEFINED_ERROR.value)
+
+        self._grid_type = 'corner-point'
+        self._cart_dims = np.array(gridhead[1:4], dtype=int)
+        self._num_cell = np.prod(self._cart_dims)
+        self._keywords.append('GRIDHEAD')
+
+        self._coord = self._read_ecl_array(egrid, 'COORD', 'COORD', 6*(self._cart_dims[0]+1)*(self._cart_dims[1]+1), verbose)
+        self._zcorn = self._read_ecl_array(egrid, 'ZCORN', 'ZCORN', 8*self._num_cell, verbose)
+        self._actnum = self._read_ecl_array(egrid, 'ACTNUM', 'ACTNUM', self._num_cell, verbose)
+
+        for keyword in egrid.keywords():
+            if keyword not in self._keywords and keyword not in self._unrec:
+                if verbose:
+                    print("[+] Unrecognized keyword found {}".format(keyword))
+                self._unrec.append(keyword)
+
+        init_fn = ECL.find_file(filename, 'INIT')
+        if init_fn is not None:
+            if verbose:
+                print("\t--> {}".format(misc.get_basename(init_fn)))
+            init = ECL(init_fn)
+            self._files.append(init_fn)
+            self._poro = self._read_ecl_array(init, 'PORO', 'PORO', self._num_cell, verbose)
+            self._permx = self._read_ecl_array(init, 'PERMX', 'PERMX', self._num_cell, verbose)
+            self._permy = self._read_ecl_array(init, 'PERMY', 'PERMY', self._num_cell, verbose)
+            self._permz = self._read_ecl_array(init, 'PERMZ', 'PERMZ', self._num_cell, verbose)
+            self._ntg = self._read_ecl_array(init, 'NTG', 'NTG', self._num_cell, verbose)
+
+        unrst_fn = ECL.find_file(filename, 'UNRST')
+        if unrst_fn is not None:
+            if verbose:
+                print("\t--> {}".format(misc.get_basename(unrst_fn)))
+            unrst = ECL(unrst_fn)
+            self._files.append(unrst_fn)
+            self._so = self._read_ecl_array(unrst, 'SOIL', 'SO', self._num_cell, verbose, occurrence=-1)
+
+    def _read_ecl_array(self, ecl_file, keyword, name, size, verbose, occurrence=0):
+        r"""
+        Read an array of an ECLIPSE binary file and check its size.
+
+        Parameters
+        ----------
+        ecl_file : ECL object
+            The opened ECLIPSE binary file.
+        keyword : string
+            The keyword of the array in the file.
+        name : string
+            The name of the keyword in APyCE e.g. SO for SOIL.
+        size : int
+            Number of values expected for the global grid.
+        verbose : boolean
+            A boolean that will be used to emit (or not) messages to screen while processing.
+        occurrence : int, default is 0.
+            Which occurrence of the keyword to read.
+
+        Returns an empty list if the keyword is not in the file.
+
+        """
+
+        with self._profiler.stage('keyword parse', name) as event:
+            data = ecl_file.read(keyword, occurrence)
+            if data is None:
+                return []
+            event['bytes'], event['cells'] = data.nbytes, len(data)
+
+        if verbose:
+            print("[+] Reading keyword {}".format(keyword))
+        if name not in self._keywords:
+            self._keywords.append(name)
+
+        # Arrays of the active cells only are scattered back to the global grid
+        if name != 'ACTNUM' and len(self._actnum) != 0 and len(data) != size and len(data) == np.count_nonzero(self._actnum):
+            active = np.zeros(size, dtype=data.dtype)
+            active[np.asarray(self._actnum).ravel() != 0] = data
+            data = active
+
+        if len(data) != size:
+            raise ValueError(Errors[name + '_ERROR'].value)
+
+        return data.astype(self._get_keyword_dtype(name), copy=False)
+
+    def _read_cache(self):
+        r"""
+        Load the arrays of the grid file from the on-disk cache.
+
+        Returns True if a valid cache was found.
+
+        """
+
+        attributes, arrays = Cache.load(self._filename)
+
+        if attributes is None:
+            return False
+
+        if self._verbose:
+            print("[INPUT] Loading cached ECLIPSE file from {}\n".format(Cache.get_directory(self._filename)))
+
+        self._grid_type = attributes['grid_type']
+        self._cart_dims = np.array(attributes['cart_dims'], dtype=int)
+        self._num_cell = np.prod(self._cart_dims)
+        self._keywords = attributes['keywords']
+        self._unrec = attributes['unrec']
+        self._files = attributes['files']
+
+        for name, array in arrays.items():
+            # Arrays cached with another type are converted, losing the memory mapping
+            setattr(self, '_' + name, array.astype(self._get_keyword_dtype(name.upper()), copy=False))
+
+        return True
+
+    def _write_cache(self):
+        r"""
+        Save the arrays read from the grid file to the on-disk cache.
+
+        """
+
+        attributes = {
+            'grid_type': self._grid_type,
+            'cart_dims': [int(x) for x in self._cart_dims],
+            'keywords': self._keywords,
+            'unrec': self._unrec,
+            'files': self._files
+        }
+
+        arrays = {}
+        for name in ['coord', 'zcorn', 'tops', 'dx', 'dy', 'dz', 'actnum', 'poro', 'permx', 'permy', 'permz', 'so',
+                     'ntg']:
+            if len(getattr(self, '_' + name)) != 0:
+                arrays[name] = getattr(self, '_' + name)
+
+        Cache.save(self._filename, self._files, attributes, arrays)
+
+    def process_grid(self, properties=None, active_only=False, weld=False, tolerance=0.0):
         r"""
         Compute grid topology and geometry from grid description.
 
+        Parameters
+        ----------
+        properties : list, default is None.
+            A list of strings with the properties (e.g. ['PORO', 'PERMX']) to attach to the VTK grid,
+                the others are never parsed. If None, all the properties found are attached.
+        active_only : boolean, default is False.
+            If True, the points, cells and cell data are only built for the active cells (ACTNUM = 1) instead of
+                flagging the inactive cells in a ghost array. The global index of each cell is kept in
+                G._global_index and attached as the GLOBAL_INDEX cell array.
+        weld : boolean, default is False.
+            If True, the coincident nodes of neighbouring cells (same pillar and same depth) are merged into shared
+                points instead of each cell owning its eight points. The nodes on each side of a fault are kept apart.
+        tolerance : float, default is 0.0.
+            Maximum difference between the depths of two nodes to be merged, 0 for exact ZCORN equality.
+
         """
 
+        self._weld_tolerance = tolerance if weld else None
+
+        # Drop the arrays of a previous call, the cells may have changed
+        self._vtk_unstructured_grid.GetCellData().Initialize()
+        self._cell_buffers = {}
+        self._pushed = {}
+
+        self._properties = None if properties is None else [x.upper() for x in properties]
+
+        # Global index of the active cells
+        if active_only and len(self._actnum) != 0:
+            self._global_index = np.flatnonzero(np.asarray(self._actnum) != 0)
+        else:
+            self._global_index = []
+
         # Check if grid is already defined
         if self._grid_type == 'corner-point':
             misc.check_corner_point_grid(self._cart_dims, self._coord, self._zcorn)
@@ -353,6 +757,456 @@ class Grid:
             else:
                 pass
 
+    def compute_topology(self):
+        r"""
+        Find the cells sharing a face, across the faults too, from ZCORN (or DZ and TOPS).
+
+        Returns
+        -------
+        connections : dict
+            Arrays with the two cells, the direction, the fault and non-neighbour flags and the overlap of each
+                connection between active cells, see apyce.utils.geometry.face_connections().
+
+        Notes
+        -----
+        The connections are kept in G._connections. The number of fault faces of each cell is attached as the
+            FAULT cell array, and the global indexes of the cells of each non-neighbour connection as the
+            NNC1 and NNC2 field arrays (0-based, unlike the NNC1 and NNC2 arrays of the EGRID files).
+
+        """
+
+        # Check if grid is already defined
+        if self._grid_type == 'corner-point':
+            misc.check_corner_point_grid(self._cart_dims, self._coord, self._zcorn)
+            zcorn = self._zcorn
+        else:
+            misc.check_cartesian_grid(self._cart_dims, self._dx, self._dy, self._dz, self._tops)
+            # The nodes of a cartesian grid are in the order of ZCORN
+            zcorn = geometry.block_centred_coords(self._dx, self._dy, self._dz, self._tops, self._cart_dims)[:, 2]
+
+        with self._profiler.stage('topology build', self._grid_type, cells=self._num_cell):
+            connections = geometry.face_connections(zcorn, self._cart_dims, self._actnum)
+
+            fault = connections['fault']
+            faults = np.bincount(np.concatenate([connections['cell1'][fault], connections['cell2'][fault]]),
+                                 minlength=self._num_cell)
+
+            nnc = connections['nnc']
+            VTK.add_field_data(self._vtk_unstructured_grid, {'NNC1': connections['cell1'][nnc],
+                                                             'NNC2': connections['cell2'][nnc]})
+
+        self._connections = connections
+        self._update({'FAULT': faults})
+
+        return connections
+
+    def compute_geometry(self):
+        r"""
+        Compute the bulk volume, centroid, face areas and face normals of every cell.
+
+        Returns
+        -------
+        geometry : dict
+            Arrays over the global grid:
+                'volume' : shape (N,), bulk volume of each cell.
+                'centroid' : shape (N, 3), centre of mass of each cell.
+                'face_areas' : shape (N, 6), area of the faces I-, I+, J-, J+, K-, K+.
+                'face_normals' : shape (N, 6, 3), outward unit normal of each face, zero for a collapsed face.
+
+        Notes
+        -----
+        The nodes of the cells of a corner-point grid are generated in slabs of K-layers of about VTU.SLAB_CELLS
+            cells, so the memory used besides the results is bounded by the size of a slab.
+            See apyce.utils.geometry.hexahedron_geometry().
+
+        The results are computed once and kept in G._geometry.
+
+        """
+
+        if self._geometry:
+            return self._geometry
+
+        # Check if grid is already defined
+        if self._grid_type == 'corner-point':
+            misc.check_corner_point_grid(self._cart_dims, self._coord, self._zcorn)
+        else:
+            misc.check_cartesian_grid(self._cart_dims, self._dx, self._dy, self._dz, self._tops)
+
+        nx, ny, nz = [int(x) for x in self._cart_dims[0:3]]
+        layer = nx * ny
+        # The nodes of a cartesian grid are computed at once
+        slab = max(1, VTU.SLAB_CELLS // layer) if self._grid_type == 'corner-point' else nz
+
+        with self._profiler.stage('geometry build', self._grid_type, cells=self._num_cell):
+            results = {
+                'volume': np.empty(self._num_cell, dtype=self._dtype),
+                'centroid': np.empty((self._num_cell, 3), dtype=self._dtype),
+                'face_areas': np.empty((self._num_cell, 6), dtype=self._dtype),
+                'face_normals': np.empty((self._num_cell, 6, 3), dtype=self._dtype)
+            }
+
+            for k in range(0, nz, slab):
+                k_stop = min(k + slab, nz)
+                cell_geometry = geometry.hexahedron_geometry(self._get_cell_coords(k, k_stop))
+                for array, result in zip(results.values(), cell_geometry):
+                    array[k*layer:k_stop*layer] = result
+
+        self._geometry = results
+
+        return results
+
+    def _get_bulk_volume(self):
+        r"""
+        Return the bulk volume of every cell in float64, without the other arrays of compute_geometry().
+
+        The volumes are computed in slabs of K-layers as in compute_geometry() and are not kept in G._geometry,
+            they are taken from it when it is already filled.
+
+        """
+
+        if self._geometry:
+            return np.asarray(self._geometry['volume'], dtype=np.float64)
+
+        nx, ny, nz = [int(x) for x in self._cart_dims[0:3]]
+        layer = nx * ny
+        slab = max(1, VTU.SLAB_CELLS // layer) if self._grid_type == 'corner-point' else nz
+
+        volume = np.empty(self._num_cell)
+        for k in range(0, nz, slab):
+            k_stop = min(k + slab, nz)
+            volume[k*layer:k_stop*layer] = geometry.hexahedron_volume(self._get_cell_coords(k, k_stop))
+
+        return volume
+
+    def pore_volume(self):
+        r"""
+        Compute the pore volume of every cell, bulk volume * PORO * NTG.
+
+        Notes
+        -----
+        NTG is 1 if the keyword is not in the grid file, the pore volume of the inactive cells is 0.
+
+        """
+
+        if len(self._poro) == 0:
+            raise ValueError(Errors.PORE_VOLUME_ERROR.value)
+
+        pore_volume = self.compute_geometry()['volume'] * np.asarray(self._poro)
+        if len(self._ntg) != 0:
+            pore_volume *= self._ntg
+        if len(self._actnum) != 0:
+            pore_volume[np.asarray(self._actnum) == 0] = 0
+
+        return pore_volume
+
+    def locate(self, points):
+        r"""
+        Find the cell holding each point, e.g. the samples of a well trajectory.
+
+        Parameters
+        ----------
+        points : ndarray
+            Array of shape (P, 3) with the XYZ of the points, Z being the depth as in ZCORN.
+
+        Returns
+        -------
+        ijk : ndarray
+            Integer array of shape (P, 3) with the (I, J, K) of the cell holding each point (inactive cells
+                included), -1 for the points outside the grid.
+
+        Notes
+        -----
+        Only for corner-point grids. The bin index of the columns of cells is built on the first call and kept in
+            G._locator, then each batch of points is located at once, see apyce.utils.geometry.locate_points().
+
+        Examples
+        --------
+        >>> ijk = G.locate([[459000.0, 7320000.0, 2400.0], [459050.0, 7320010.0, 2410.0]])
+
+        """
+
+        if self._grid_type != 'corner-point':
+            raise ValueError(Errors.LOCATE_ERROR.value)
+
+        misc.check_corner_point_grid(self._cart_dims, self._coord, self._zcorn)
+
+        if not self._locator:
+            self._locator = geometry.column_index(self._coord, self._zcorn, self._cart_dims)
+
+        return geometry.locate_points(points, self._coord, self._zcorn, self._cart_dims, self._locator)
+
+    def subgrid(self, i=None, j=None, k=None, mask=None):
+        r"""
+        Extract a box of cells, and / or the cells of a region, as a new grid.
+
+        Parameters
+        ----------
+        i, j, k : tuple, optional
+            Range (start, stop) of the cells along each direction, 0-based with stop excluded as in Python slices,
+                default is all the cells.
+        mask : ndarray, optional
+            Boolean array of size NX*NY*NZ selecting the cells of a region e.g. FIPNUM == 2. The box is shrunk to
+                the bounding box of the selected cells and the other cells of the box are made inactive.
+
+        Returns
+        -------
+        grid : Grid
+            A corner-point grid with the cells of the box, to be processed and exported on its own.
+
+        Notes
+        -----
+        COORD and ZCORN of the new grid are views of the ones of this grid, in the shapes of
+            apyce.utils.geometry.get_pillars() and get_zcorn(), so nothing is copied. The properties are views
+            too for a range of layers, copies of the cells of the box otherwise. A property not parsed yet is only
+            sliced when the new grid first uses it, the properties of load_cell_data() are sliced at once.
+
+        The results of the new grid are written to 'Results' as <name>_I<i0>-<i1>_J<j0>-<j1>_K<k0>-<k1>.vtu.
+
+        Examples
+        --------
+        >>> S = G.subgrid(i=(0, 10), j=(0, 10), k=(2, 4))
+        >>> S.process_grid()
+        >>> S.export_data()
+
+        """
+
+        if self._grid_type != 'corner-point':
+            raise ValueError(Errors.SUBGRID_ERROR.value)
+
+        misc.check_corner_point_grid(self._cart_dims, self._coord, self._zcorn)
+
+        nx, ny, nz = [int(x) for x in self._cart_dims[0:3]]
+
+        # Ranges of the box as slices (K, J, I), clipped to the grid
+        box = []
+        for r, n in [(k, nz), (j, ny), (i, nx)]:
+            start, stop, _ = slice(*(r if r is not None else (None, None))).indices(n)
+            box.append(slice(start, stop))
+        box = tuple(box)
+
+        if mask is not None:
+            mask = np.reshape(np.asarray(mask, dtype=bool), (nz, ny, nx))
+            selected = np.zeros_like(mask)
+            selected[box] = mask[box]
+            bounds = [np.flatnonzero(np.any(selected, axis=axes)) for axes in [(1, 2), (0, 2), (0, 1)]]
+            if len(bounds[0]) == 0:
+                raise ValueError(Errors.SUBGRID_RANGE_ERROR.value)
+            box = tuple(slice(int(x[0]), int(x[-1]) + 1) for x in bounds)
+
+        if any(x.stop <= x.start for x in box):
+            raise ValueError(Errors.SUBGRID_RANGE_ERROR.value)
+
+        (k0, k1), (j0, j1), (i0, i1) = [(x.start, x.stop) for x in box]
+
+        grid = self._get_derived_grid('_I{}-{}_J{}-{}_K{}-{}'.format(i0, i1, j0, j1, k0, k1), [i1 - i0, j1 - j0, k1 - k0])
+        grid._parent = self
+        grid._box = box
+
+        grid._coord = geometry.get_pillars(self._coord, self._cart_dims)[j0:j1+1, i0:i1+1]
+        grid._zcorn = geometry.get_zcorn(self._zcorn, self._cart_dims)[2*k0:2*k1, 2*j0:2*j1, 2*i0:2*i1]
+
+        # Parsed properties are sliced now, the others on first access
+        for keyword, name in self.DATA_KEYWORDS.items():
+            if keyword in ['COORD', 'ZCORN']:
+                continue
+            if name in self.__dict__:
+                if len(self.__dict__[name]) != 0:
+                    grid.__dict__[name] = grid._get_box_data(self.__dict__[name])
+            elif keyword in self._index:
+                grid._index[keyword] = self._index[keyword]
+
+        grid._cell_data = {name: grid._get_box_data(data) for name, data in self._cell_data.items()}
+
+        # Cells of the box out of the region are inactive
+        if mask is not None:
+            actnum = mask[box].astype(np.uint8).ravel()
+            if len(grid._actnum) != 0:
+                actnum &= np.asarray(grid._actnum) != 0
+            grid._actnum = actnum
+            if 'ACTNUM' not in grid._keywords:
+                grid._keywords.append('ACTNUM')
+
+        return grid
+
+    def coarsen(self, lod=1):
+        r"""
+        Merge blocks of cells into a coarser grid, e.g. for a responsive preview of a large model.
+
+        Parameters
+        ----------
+        lod : int or tuple, default is 1.
+            The level of detail n >= 1, merging blocks of 2**n x 2**n x 2**(n-1) cells (2x2x1, 4x4x2, ...),
+                or the numbers of cells (FI, FJ, FK) of a block along I, J and K.
+
+        Returns
+        -------
+        grid : Grid
+            A corner-point grid with a cell for each block, to be processed and exported on its own.
+
+        Notes
+        -----
+        The corners of each block are taken on the pillars and the layers bounding it, the pillars and the faults
+            inside a block are dropped, see apyce.utils.upscaling.coarsen_corner_point(). A block is active if
+            one of its cells is active.
+
+        The properties (the ones selected in process_grid() and the ones of load_cell_data()) are averaged over
+            the active cells of each block, weighted by the bulk volumes of the cells:
+                PORO : weighted by the net volume (bulk volume * NTG), which keeps the pore volume of the block.
+                SO : weighted by the pore volume.
+                PERMX, PERMY : arithmetic mean, flow along the layers.
+                PERMZ : harmonic mean, flow across the layers.
+                Others : arithmetic mean.
+
+        The results of the new grid are written to 'Results' as <name>_LOD<FI>x<FJ>x<FK>.vtu.
+
+        Examples
+        --------
+        >>> C = G.coarsen(lod=2)
+        >>> C.process_grid()
+        >>> C.export_data()
+
+        """
+
+        if self._grid_type != 'corner-point':
+            raise ValueError(Errors.LOD_ERROR.value)
+
+        misc.check_corner_point_grid(self._cart_dims, self._coord, self._zcorn)
+
+        factors = upscaling.get_factors(lod)
+        blocks = upscaling.get_blocks(self._cart_dims, factors)
+
+        grid = self._get_derived_grid('_LOD{}x{}x{}'.format(*factors), [len(x) - 1 for x in blocks])
+
+        with self._profiler.stage('lod build', 'x'.join(str(x) for x in factors), cells=self._num_cell):
+            grid._coord, grid._zcorn = upscaling.coarsen_corner_point(self._coord, self._zcorn, self._cart_dims, blocks)
+            grid._coord = grid._coord.astype(self._dtype, copy=False)
+            grid._zcorn = grid._zcorn.astype(self._dtype, copy=False)
+
+            index = upscaling.block_index(self._cart_dims, blocks)
+
+            # Weights of the cells, 0 for the inactive ones
+            volume = self._get_bulk_volume()
+            if len(self._actnum) != 0:
+                volume = np.where(np.asarray(self._actnum) != 0, volume, 0.0)
+            net = volume * self._ntg if len(self._ntg) != 0 else volume
+            weights = {'PORO': net, 'SO': net * self._poro if len(self._poro) != 0 else net}
+
+            if len(self._actnum) != 0:
+                grid._actnum = upscaling.upscale(self._actnum, index, grid._num_cell, volume, 'any').astype(np.uint8)
+
+            for name, data in self._get_cell_data().items():
+                if name == 'ACTNUM':
+                    continue
+                values = upscaling.upscale(data, index, grid._num_cell, weights.get(name, volume),
+                                           upscaling.METHODS.get(name, 'arithmetic'))
+                if name in self.DATA_KEYWORDS:
+                    grid.__dict__[self.DATA_KEYWORDS[name]] = values.astype(grid._get_keyword_dtype(name))
+                else:
+                    grid._cell_data[name] = values
+
+        return grid
+
+    def _get_derived_grid(self, suffix, cart_dims):
+        r"""
+        Return an empty grid with the settings of this grid, for subgrid() and coarsen().
+
+        Parameters
+        ----------
+        suffix : string
+            Added to the name of the grid file before its first '.', the results of the new grid are written
+                under this new name.
+        cart_dims : list
+            Dimensions of the new grid.
+
+        """
+
+        # export_data() names the results after the basename cut at its first '.'
+        basename = misc.get_basename(self._filename)
+        root = basename.split('.')[0]
+        filename = os.path.join(os.path.dirname(self._filename), root + suffix + basename[len(root):])
+        grid = Grid(filename=filename, grid_origin=None, verbose=self._verbose, cell_dtype=self._cell_dtype,
+                    zero_copy=self._zero_copy, dtype=self._dtype)
+
+        grid._grid_origin = self._grid_origin
+        grid._grid_type = self._grid_type
+        grid._keywords = list(self._keywords)
+        grid._unrec = list(self._unrec)
+        grid._files = list(self._files)
+        grid._cart_dims = np.array(cart_dims, dtype=int)
+        grid._num_cell = np.prod(grid._cart_dims)
+        for callback in self._profiler.callbacks():
+            grid._profiler.add_callback(callback)
+
+        return grid
+
+    def _get_lod_grid(self, lod, process=True):
+        r"""
+        Return the coarsened grid of a level of detail for plot_grid() and export_data().
+
+        Parameters
+        ----------
+        lod : int or tuple
+            The level of detail or the numbers of cells of a block, see coarsen().
+        process : boolean, default is True.
+            If True, the coarsened grid is processed with the options of the last process_grid() of this grid.
+
+        Notes
+        -----
+        The coarsened grid records its events in the profiler of this grid, so its processing and writing
+            show up in profile().
+
+        """
+
+        grid = self.coarsen(lod)
+        grid._profiler = self._profiler
+
+        if process:
+            grid.process_grid(properties=self._properties, active_only=len(self._global_index) != 0,
+                              weld=self._weld_tolerance is not None, tolerance=self._weld_tolerance or 0.0)
+
+        return grid
+
+    def _get_box_data(self, data):
+        r"""
+        Return the values of a property of the parent grid for the cells of the box of this sub-grid.
+
+        Parameters
+        ----------
+        data : ndarray
+            Array of size NX*NY*NZ of the parent grid with the values of the property.
+
+        Notes
+        -----
+        The values are a view of the parent array when the box holds whole layers, a copy otherwise.
+
+        """
+
+        nx, ny, nz = [int(x) for x in self._parent._cart_dims[0:3]]
+
+        return np.reshape(data, (nz, ny, nx))[self._box].ravel()
+
+    def _get_cell_coords(self, k_start=0, k_stop=None):
+        r"""
+        Return the coords of the eight nodes of every cell in a range of layers.
+
+        Parameters
+        ----------
+        k_start, k_stop : int
+            Range of layers [k_start, k_stop), default is the whole grid.
+
+        Returns an array of shape (N, 8, 3) with the nodes of each cell in ECLIPSE order.
+
+        """
+
+        if self._grid_type == 'corner-point':
+            return geometry.corner_point_coords(self._coord, self._zcorn, self._cart_dims, k_start, k_stop)[0]
+
+        nx, ny, nz = [int(x) for x in self._cart_dims[0:3]]
+        k_stop = nz if k_stop is None else k_stop
+        nodes = geometry.block_centred_coords(self._dx, self._dy, self._dz, self._tops, self._cart_dims)
+
+        return nodes[geometry.block_centred_connectivity(self._cart_dims)[k_start*nx*ny:k_stop*nx*ny]]
+
     def load_cell_data(self, filename, name):
         r"""
         Read a file with data and append this data to model.
@@ -388,8 +1242,36 @@ class Grid:
 
         """
 
-        # Check if file exists and can be open
-        misc.file_open_exception(filename)
+        # Check if grid is already defined
+        if self._grid_type == 'corner-point':
+            misc.check_corner_point_grid(self._cart_dims, self._coord, self._zcorn)
+        else:
+            misc.check_cartesian_grid(self._cart_dims, self._dx, self._dy, self._dz, self._tops)
+
+        data_array = self._read_cell_data(filename, name)
+        if name not in self._keywords:
+            self._keywords.append(name)
+
+        self._update({name: data_array})
+
+    def load_cell_data_many(self, files, max_workers=None):
+        r"""
+        Read several files with data, concurrently, and append this data to model.
+
+        Parameters
+        ----------
+        files : dict
+            The name (path) of the file of each property, by name of the property e.g. {'TEMP': 'dome_Temperature.txt'}.
+        max_workers : int, optional
+            Number of threads reading the files, default is the ThreadPoolExecutor default.
+
+        Notes
+        -----
+        The files follow the format of load_cell_data(). They are parsed in a thread pool and the new
+            arrays are then pushed to the VTK grid in one batch. The first error found, in the order of
+            the files, is raised.
+
+        """
 
         # Check if grid is already defined
         if self._grid_type == 'corner-point':
@@ -397,20 +1279,44 @@ class Grid:
         else:
             misc.check_cartesian_grid(self._cart_dims, self._dx, self._dy, self._dz, self._tops)
 
-        with open(misc.get_path(filename)) as f:
-            if self._verbose:
-                print("[+] Reading keyword {}".format(name))
-            data_array = self._read_section_grdecl(f)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {name: executor.submit(self._read_cell_data, filename, name) for name, filename in files.items()}
+            data_arrays = {name: future.result() for name, future in futures.items()}
+
+        for name in data_arrays:
             if name not in self._keywords:
                 self._keywords.append(name)
-            if len(data_array) != self._num_cell:
-                raise ValueError(Errors.Errors.LOAD_CELL_DATA_ERROR.value.replace('{}', name))
-            data_array = np.array(data_array, dtype=float)
 
-        self._update(data_array, name)
+        self._update(data_arrays)
+
+    def _read_cell_data(self, filename, name):
+        r"""
+        Read a file with data of load_cell_data() and check its size.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the file.
+        name : string
+            A string that holds the name of the property.
+
+        """
+
+        # Check if file exists and can be open
+        misc.file_open_exception(filename)
+
+        with self._profiler.stage('keyword parse', name) as event, GRDECL(filename) as f:
+            if self._verbose:
+                print("[+] Reading keyword {}".format(name))
+            data_array, count = f.read_section(self._num_cell, self._dtype)
+            if count != self._num_cell:
+                raise ValueError(Errors.LOAD_CELL_DATA_ERROR.value.replace('{}', name))
+            event['bytes'], event['cells'] = f.tell(), count
+
+        return data_array
 
     def plot_grid(self, filename='Data/Results/dome.vtu', lighting=False, property='PORO', show_edges=True, specular=0.0,
-                  specular_power=0.0, show_scalar_bar=True, cmap='viridis'):
+                  specular_power=0.0, show_scalar_bar=True, cmap='viridis', lod=None):
         r"""
         Plot the grid with PyVista.
 
@@ -432,6 +1338,9 @@ class Grid:
             If False, a scalar bar will not be added to the scene.
         cmap : string, default is 'viridis'
             Name of the Matplotlib colormap to us when mapping the 'scalars'. See available Matplotlib colormaps.
+        lod : int or tuple, optional
+            If given, the grid coarsened to this level of detail (see coarsen()) is built in memory and plotted
+                instead of the VTU file, for a responsive preview of a large model.
 
         Notes
         -----
@@ -443,7 +1352,8 @@ class Grid:
         import pyvista as pv
 
         # Check if file exists and can be open
-        misc.file_open_exception(filename)
+        if lod is None:
+            misc.file_open_exception(filename)
 
         # Check if grid is already defined
         if self._grid_type == 'corner-point':
@@ -458,7 +1368,10 @@ class Grid:
         cmap = plt.cm.get_cmap(cmap, 5)
 
         # Mesh to be plotted
-        mesh = pv.UnstructuredGrid(misc.get_path(filename))
+        if lod is None:
+            mesh = pv.UnstructuredGrid(misc.get_path(filename))
+        else:
+            mesh = pv.UnstructuredGrid(self._get_lod_grid(lod)._vtk_unstructured_grid)
 
         # Remove ghost cells if they are present in the mesh
         if 'ACTNUM' in mesh.array_names:
@@ -469,43 +1382,120 @@ class Grid:
         mesh.plot(lighting=lighting, specular=specular, specular_power=specular_power, show_edges=show_edges,
                    scalars=property, show_scalar_bar=show_scalar_bar, cmap=cmap)
 
-    def export_data(self):
+    def export_data(self, stream=False, slab_size=None, parallel=None, lod=None):
         r"""
         Save grid data to a single vtu file for visualizing in ParaView.
 
+        Parameters
+        ----------
+        stream : boolean, default is False.
+            If True, the points, cells and cell data of a corner-point grid are generated from COORD and ZCORN
+                and written in slabs of K-layers, without building the vtkUnstructuredGrid. The peak memory
+                is then bounded by the size of a slab instead of the size of the grid.
+        slab_size : int, optional
+            Number of K-layers of each slab when streaming, default is about VTU.SLAB_CELLS cells.
+        parallel : int, optional
+            If given, a corner-point grid is split into this number of partitions of K-layers, each one streamed
+                to its own vtu file by a worker process, and a pvtu file gathering them is written instead.
+        lod : int or tuple, optional
+            If given, the grid coarsened to this level of detail (see coarsen()) is written instead, as
+                <name>_LOD<FI>x<FJ>x<FK>.vtu, with the options of process_grid() of this grid.
+
         Notes
         -----
         The vtu file will be created on the directory 'Results' that will be created
             on the same directory than grid file
 
+        When streaming or writing in parallel, process_grid() does not need to be called. The properties attached to the vtu file
+            are the ones selected in process_grid() (all by default) plus the ones of load_cell_data().
+
         """
 
-        VTK.export_data(self._filename, self._vtk_unstructured_grid, self._verbose)
+        if lod is not None:
+            self._get_lod_grid(lod, not stream and parallel is None).export_data(stream, slab_size, parallel)
+            return
+
+        results_dir = misc.get_dirname(misc.get_path(self._filename)) + '/Results/'
+        filename = results_dir + misc.get_basename(self._filename).split('.')[0]
+
+        if not stream and parallel is None:
+            with self._profiler.stage('write', misc.get_basename(filename + ".vtu")) as event:
+                VTK.export_data(self._filename, self._vtk_unstructured_grid, self._verbose)
+                event['bytes'] = os.path.getsize(filename + ".vtu")
+                event['cells'] = self._vtk_unstructured_grid.GetNumberOfCells()
+            return
+
+        if self._grid_type != 'corner-point':
+            raise ValueError(Errors.STREAM_ERROR.value)
+
+        misc.check_corner_point_grid(self._cart_dims, self._coord, self._zcorn)
+
+        misc.create_results_directory(misc.get_path(self._filename))
+
+        if parallel is not None:
+            with self._profiler.stage('write', misc.get_basename(filename + ".pvtu"), cells=self._num_cell) as event:
+                pieces = VTU.write_partitioned(filename + ".pvtu", self._coord, self._zcorn, self._cart_dims,
+                                               self._get_cell_data(), self._actnum, parallel, slab_size, self._verbose)
+                event['bytes'] = sum(os.path.getsize(x) for x in [filename + ".pvtu"] + pieces)
+            return
+
+        with self._profiler.stage('write', misc.get_basename(filename + ".vtu"), cells=self._num_cell) as event:
+            VTU.write_corner_point(filename + ".vtu", self._coord, self._zcorn, self._cart_dims, self._get_cell_data(),
+                                   self._actnum, slab_size=slab_size, verbose=self._verbose)
+            event['bytes'] = os.path.getsize(filename + ".vtu")
 
-    def _read_section_grdecl(self, file):
+    def profile(self, events=False):
         r"""
-        Read the section of data in the ECLIPSE input file
-        and return the array of values.
+        Return the wall time, bytes, cells and peak RSS of each stage run so far, as a table.
 
         Parameters
         ----------
-        file : file object
-            File object that have the ECLIPSE grid specification.
+        events : boolean, default is False.
+            If True, return the list of the events of each stage (see apyce.utils.profiler.Profiler)
+                instead of the table.
+
+        Notes
+        -----
+        The stages are the read of the grid file and of each INCLUDE file, the parse of each keyword, the build
+            of the points and of the cells, the attach of each property and the write of the output. The keywords
+            are parsed on first access, so their events may come from process_grid() or export_data(), and the
+            time of a keyword parsed inside another stage is counted in both.
+
+        Examples
+        --------
+        >>> G = ap.grid.Grid(filename='dome.grdecl', verbose=False)
+        >>> G.process_grid()
+        >>> print(G.profile())
+
+        """
+
+        if events:
+            return self._profiler.events()
+
+        return self._profiler.report()
+
+    def _get_cell_data(self):
+        r"""
+        Return the properties to be exported, by name.
+
+        Notes
+        -----
+        The properties are the ones selected in process_grid() plus the arrays added by load_cell_data().
 
         """
 
-        section = []
-        while True:
-            line = file.readline()
-            if line.startswith('--') or not line.strip():
-                # Ignore blank lines and comments
+        cell_data = {}
+
+        for keyword in ['ACTNUM', 'PERMX', 'PERMY', 'PERMZ', 'PORO', 'SO', 'NTG']:
+            if self._properties is not None and keyword not in self._properties:
                 continue
-            values = misc.expand_scalars(line)
-            section.extend(values)
-            if section[-1] == '/':
-                section.pop()
-                break
-        return section
+            data = getattr(self, self.DATA_KEYWORDS[keyword])
+            if len(data) != 0:
+                cell_data[keyword] = data
+
+        cell_data.update(self._cell_data)
+
+        return cell_data
 
     def _process_grdecl_corner_point(self):
         r"""
@@ -550,26 +1540,30 @@ class Grid:
         if self._verbose:
             print("\n[PROCESS] Converting GRDECL corner-point grid to ParaView VTU format")
 
-        points = VTK.create_points()
-        points.SetNumberOfPoints(8*np.prod(self._cart_dims))  # 2*NX*2*NY*2*NZ
+            print("\n[+] Creating VTK Points")
+
+        geometry_key = self._get_geometry_key([self._coord, self._zcorn])
 
-        # Recover logical dimension of grid
-        nx, ny, nz = self._cart_dims[0:3]
+        with self._profiler.stage('point build', 'corner-point') as event:
+            coords, connectivity = self._load_geometry(geometry_key)
 
-        if self._verbose:
-            print("\n[+] Creating VTK Points")
+            if coords is None:
+                # Get the coords of the eight nodes of all (or the active) cells at once
+                if len(self._global_index) != 0:
+                    coords, self._n_collapsed = geometry.active_corner_point_coords(self._coord, self._zcorn,
+                                                                                    self._cart_dims, self._global_index,
+                                                                                    self._dtype)
+                else:
+                    coords = np.empty((self._num_cell, 8, 3), dtype=self._dtype)
+                    coords, self._n_collapsed = geometry.corner_point_coords(self._coord, self._zcorn,
+                                                                             self._cart_dims, out=coords)
+
+                coords, connectivity = self._get_points(coords)
+                self._save_geometry(geometry_key, coords, connectivity)
 
-        point_id = 0
-        for k in range(nz):
-            for j in range(ny):
-                for i in range(nx):
-                    # Get the cell coords
-                    coords = self._get_cell_coords(i, j, k)
-                    # Set the points for the cell
-                    for pi in range(8):
-                        points.SetPoint(point_id, coords[pi])
-                        point_id += 1
-        self._vtk_unstructured_grid.SetPoints(points)
+            points = VTK.create_points(coords)  # 2*NX*2*NY*2*NZ unless welded
+            self._vtk_unstructured_grid.SetPoints(points)
+            event['cells'] = len(connectivity)
 
         if self._verbose:
             print("\n\t[+] Created {} VTK Points".format(self._vtk_unstructured_grid.GetNumberOfPoints()))
@@ -583,28 +1577,12 @@ class Grid:
 
             print("\n[+] Creating VTK Cells")
 
-        # Removes inactive cells (ACTNUM = 0)
-        if len(self._actnum) != 0:
-            self._remove_cells()
-
-        cell_id = 0
-        for k in range(nz):
-            for j in range(ny):
-                for i in range(nx):
-                    cell = VTK.create_hexahedron()
-
-                    cell.GetPointIds().SetId(0, cell_id*8+0)
-                    cell.GetPointIds().SetId(1, cell_id*8+1)
-                    cell.GetPointIds().SetId(2, cell_id*8+3)
-                    cell.GetPointIds().SetId(3, cell_id*8+2)
-                    cell.GetPointIds().SetId(4, cell_id*8+4)
-                    cell.GetPointIds().SetId(5, cell_id*8+5)
-                    cell.GetPointIds().SetId(6, cell_id*8+7)
-                    cell.GetPointIds().SetId(7, cell_id*8+6)
-
-                    self._vtk_unstructured_grid.InsertNextCell(cell.GetCellType(), cell.GetPointIds())
+        with self._profiler.stage('cell build', 'corner-point', cells=len(connectivity)):
+            # Removes inactive cells (ACTNUM = 0)
+            if len(self._actnum) != 0 and len(self._global_index) == 0:
+                self._remove_cells()
 
-                    cell_id += 1
+            VTK.create_hexahedra(self._vtk_unstructured_grid, connectivity)
 
         if self._verbose:
             print("\n\t[+] Created {} VTK Cells".format(self._vtk_unstructured_grid.GetNumberOfCells()))
@@ -694,121 +1672,40 @@ class Grid:
         if self._verbose:
             print("\n[PROCESS] Converting GRDECL cartesian grid to VTU")
 
-        # recover grid dimensions
-        dx, dy, dz, tops = self._dx, self._dy, self._dz, self._tops
-        nx, ny, nz = self._cart_dims[0:3]
-
-        # creates coordinate arrays
-        coord_x = np.zeros((2*nx, 2*ny, 2*nz))
-        coord_y = np.zeros((2*nx, 2*ny, 2*nz))
-        coord_z = np.zeros((2*nx, 2*ny, 2*nz))
-
-        for k in range(2*nz):
-            for j in range(2*ny):
-                for i in range(2*nx):
-
-                    I, J, K = int(i/2), int(j/2), int(k/2)
-
-                    ijk = misc.get_ijk(I, J, K, nx, ny, nz)
-
-                    # 0s
-                    if i == 0:
-                        coord_x[i][i][k] = 0
-                    if j == 0:
-                        coord_y[i][j][k] = 0
-                    if k == 0:
-                        coord_z[i][j][k] = tops[ijk]
-
-                    # i, j, k varying
-                    if 0 < i < 2*nx-1:
-                        ijk = misc.get_ijk(I, J, K, nx, ny, nz)
-                        coord_x[i][j][k] = dx[ijk]
-                        if i > 2:
-                            r"""
-                            i
-                            ------>
-
-                            0---(1,2)---(3,4)---(5,6)---(7,8)---9
-
-                            """
-                            # we need to add the value of the last coord to get the spacing between cells
-                            coord_x[i][j][k] = dx[ijk] + coord_x[i-1][j][k]
-                        if i > 1 and i%2 == 0:
-                            # cells that are even have the same coordinate than previous odd cells
-                            coord_x[i][j][k] = coord_x[i-1][j][k]
-                    if 0 < j < 2*ny-1:
-                        ijk = misc.get_ijk(I, J, K, nx, ny, nz)
-                        coord_y[i][j][k] = dy[ijk]
-                        if j > 2:
-                            coord_y[i][j][k] = dy[ijk] + coord_y[i][j-1][k]
-                        if j > 1 and j%2 == 0:
-                            # cells that are even have the same coordinate than previous odd cells
-                            coord_y[i][j][k] = coord_y[i][j-1][k]
-                    if 0 < k < 2*nz-1:
-                        ijk = misc.get_ijk(I, J, K, nx, ny, nz)
-                        coord_z[i][j][k] = dz[ijk]
-                        if k > 2:
-                            coord_z[i][j][k] = dz[ijk] + coord_z[i][j][k-1]
-                        if k > 1 and k%2 == 0:
-                            # cells that are even have the same coordinate than previous odd cells
-                            coord_z[i][j][k] = coord_z[i][j][k-1]
-
-                    # final points
-                    if i == 2*nx-1:
-                        ijk = misc.get_ijk(I, J, K, nx, ny, nz)
-                        # we need to add the value of the last coord to get the spacing between cells
-                        coord_x[i][j][k] = dx[ijk] + coord_x[i-1][j][k]
-                    if j == 2*ny-1:
-                        ijk = misc.get_ijk(I, J, K, nx, ny, nz)
-                        # we need to add the value of the last coord to get the spacing between cells
-                        coord_y[i][j][k] = dy[ijk] + coord_y[i][j-1][k]
-                    if k == 2*nz-1:
-                        ijk = misc.get_ijk(I, J, K, nx, ny, nz)
-                        # we need to add the value of the last coord to get the spacing between cells
-                        coord_z[i][j][k] = dz[ijk] + coord_z[i][j][k-1]
-
-
-        points = VTK.create_points()
-        points.SetNumberOfPoints(8*np.prod(self._cart_dims))  # 2*NX*2*NY*2*NZ
-
-        if self._verbose:
             print("\n[+] Creating VTK Points")
 
-        point_id = 0
-        for k in range(2*nz):
-            for j in range(2*ny):
-                for i in range(2*nx):
-                    # Set the points for the cell
-                    points.SetPoint(point_id, [coord_x[i][j][k],coord_y[i][j][k],coord_z[i][j][k]])
-                    point_id += 1
+        geometry_key = self._get_geometry_key([self._dx, self._dy, self._dz, self._tops])
 
-        self._vtk_unstructured_grid.SetPoints(points)
+        with self._profiler.stage('point build', 'cartesian') as event:
+            coords, connectivity = self._load_geometry(geometry_key)
 
-        if self._verbose:
-            print("\n\t[+] Created {} VTK Points".format(self._vtk_unstructured_grid.GetNumberOfPoints()))
+            if coords is None:
+                # Get the coords of the (2*NX, 2*NY, 2*NZ) nodes from DX, DY, DZ and TOPS at once
+                coords = geometry.block_centred_coords(self._dx, self._dy, self._dz, self._tops, self._cart_dims)
+                coords = coords.astype(self._dtype, copy=False)
 
-            print("\n[+] Creating VTK Cells")
+                # Point ids of the eight nodes of each cell in the (2*NX, 2*NY, 2*NZ) points array
+                connectivity = geometry.block_centred_connectivity(self._cart_dims)
+
+                # Keep only the points of the active cells and / or weld them
+                if len(self._global_index) != 0 or self._weld_tolerance is not None:
+                    if len(self._global_index) != 0:
+                        connectivity = connectivity[self._global_index]
+                    coords, connectivity = self._get_points(coords[connectivity])
+
+                self._save_geometry(geometry_key, coords, connectivity)
 
-        cell_id = 0
-        for k in range(nz):
-            for j in range(ny):
-                for i in range(nx):
-                    cell = VTK.create_hexahedron()
+            points = VTK.create_points(coords)
+            self._vtk_unstructured_grid.SetPoints(points)
+            event['cells'] = len(connectivity)
 
-                    # k = 0
-                    cell.GetPointIds().SetId(0, misc.get_ijk(2*i, 2*j, 2*k, 2*nx, 2*ny, 2*nz))
-                    cell.GetPointIds().SetId(1, misc.get_ijk(2*i+1, 2*j, 2*k, 2*nx, 2*ny, 2*nz))
-                    cell.GetPointIds().SetId(3, misc.get_ijk(2*i, 2*j+1, 2*k, 2*nx, 2*ny, 2*nz)) # swap 2 and 3 (eclipse -> vtk)
-                    cell.GetPointIds().SetId(2, misc.get_ijk(2*i+1, 2*j+1, 2*k, 2*nx, 2*ny, 2*nz))
+        if self._verbose:
+            print("\n\t[+] Created {} VTK Points".format(self._vtk_unstructured_grid.GetNumberOfPoints()))
 
-                    # k = 1
-                    cell.GetPointIds().SetId(4, misc.get_ijk(2*i, 2*j, 2*k+1, 2*nx, 2*ny, 2*nz))
-                    cell.GetPointIds().SetId(5, misc.get_ijk(2*i+1, 2*j, 2*k+1, 2*nx, 2*ny, 2*nz))
-                    cell.GetPointIds().SetId(7, misc.get_ijk(2*i, 2*j+1, 2*k+1, 2*nx, 2*ny, 2*nz)) # swap 6 and 7 (eclipse -> vtk)
-                    cell.GetPointIds().SetId(6, misc.get_ijk(2*i+1, 2*j+1, 2*k+1, 2*nx, 2*ny, 2*nz))
+            print("\n[+] Creating VTK Cells")
 
-                    self._vtk_unstructured_grid.InsertNextCell(cell.GetCellType(), cell.GetPointIds())
-                    cell_id += 1
+        with self._profiler.stage('cell build', 'cartesian', cells=len(connectivity)):
+            VTK.create_hexahedra(self._vtk_unstructured_grid, connectivity)
 
         if self._verbose:
             print("\n\t[+] Created {} VTK Cells".format(self._vtk_unstructured_grid.GetNumberOfCells()))
@@ -816,262 +1713,154 @@ class Grid:
         # Set the properties to the vtk array
         self._update()
 
-    def _get_cell_coords(self, i, j, k):
+    def _get_geometry_key(self, arrays):
         r"""
-        Get XYZ coords for each node of a cell.
+        Return the key of the geometry in the on-disk cache, None if the cache is not used.
 
         Parameters
         ----------
-        i, j, k : int
-            Values from grid dimension.
-
-        Notes
-        -----
-        In corner-point grid, the nodes are ordained like the follow example:
-
-        n6    n7
-        x------x
-        |      |
-        |      | This is the bottom face
-        x------x
-        n4    n5
-
-        n2    n3
-        x------x
-        |      |
-        |      | This is the top face
-        x------x
-        n0    n1
-
-           6 --------- 7
-          /|  btm     /|
-         / |  face   / |
-        4 --------- 5  |
-        |  |        |  |
-        |  2 -------|- 3
-        | /   top   | /
-        |/    face  |/
-        0 --------- 1
+        arrays : list
+            The arrays describing the geometry e.g. [COORD, ZCORN], ACTNUM and the dimensions are added here.
 
         """
 
-        coord = []
-
-        # Get pillars for this cell
-        pillars = self._get_pillars(i, j)
-
-        # Get the Zs for this cell (The depth of the nodes)
-        zs = self._get_zs(i, j, k)
-
-        # Loop eight times for each cell (eight corners)
-        for pi in range(8):
-            r"""
-            Recover physical nodal coordinates along pillars.
+        if not self._cache:
+            return None
 
-            We assume that all pillars are straight lines so linear interpolation is sufficient.
-            As a special case we need to handle "collapsed" pillars of the form
+        attributes = {
+            'grid_type': self._grid_type,
+            'active_only': len(self._global_index) != 0,
+            'weld_tolerance': self._weld_tolerance,
+            'dtype': self._dtype.str
+        }
 
-            x0 y0 z0   x0 y0 z0
+        return Cache.get_geometry_key(attributes, [np.asarray(self._cart_dims, dtype=np.int64)] + arrays + [self._actnum])
 
-            where the top pillar point coincides with the bottom pillar point. (degenerated cell)
-            Following ECLIPSE, we assume that such pillars are really vertical...
+    def _load_geometry(self, key):
+        r"""
+        Load the points and the connectivity of the VTK grid from the on-disk cache.
 
-            In MRST:
-            ix    = abs(lines(:,6) - lines(:,3)) < abs(opt.CoincidenceTolerance);
-            t     = (grdecl.ZCORN(:) - lines(:,3)) ./ (lines(:,6) - lines(:,3));
-            t(ix) = 0;
+        Returns (None, None) if the geometry is not cached.
 
-            xCoords = lines(:,1) + t.*(lines(:,4) - lines(:,1));
-            yCoords = lines(:,2) + t.*(lines(:,5) - lines(:,2));
+        """
 
-            In APyCE:
-            MRST performs this process only once, this is because the array [lines]
-            already contain all the necessary coordinates, here in APyCE,
-            we will do the process cell by cell.
+        if key is None:
+            return None, None
 
-            """
+        attributes, arrays = Cache.load_geometry(self._filename, key)
+        if attributes is None:
+            return None, None
 
-            # p_idx -> [0,3]
-            p_idx = pi % 4
+        if self._verbose:
+            print("\n[+] Loading cached geometry {}".format(key))
 
-            # Absolute tolerance used to detect collapsed pillars where the top
-            # pillar point coincides with the bottom pillar point
-            coincidence_tolerance = 2.2204e-14
+        self._n_collapsed = attributes['n_collapsed']
 
-            pillar = pillars[p_idx]
-            z_coord = zs[pi]
+        return arrays['points'], arrays['connectivity']
 
-            # degenerated cell condition
-            if abs(pillar[1][2] - pillar[0][2]) < coincidence_tolerance:
-                self._n_collapsed += 1
-                t = 0.0
-            else:
-                t = (z_coord - pillar[0][2]) / (pillar[1][2] - pillar[0][2])
-
-            x_coord = pillar[0][0] + t * (pillar[1][0] - pillar[0][0])
-            y_coord = pillar[0][1] + t * (pillar[1][1] - pillar[0][1])
+    def _save_geometry(self, key, points, connectivity):
+        r"""
+        Save the points and the connectivity of the VTK grid to the on-disk cache.
 
-            coord.append(np.array([x_coord, y_coord, z_coord]))
+        """
 
-        return coord
+        if key is not None:
+            Cache.save_geometry(self._filename, key, {'n_collapsed': int(self._n_collapsed)},
+                                {'points': points, 'connectivity': connectivity})
 
-    def _get_pillars(self, i, j):
+    def _get_points(self, coords):
         r"""
-        Obtain the pillars index in [COORD] and the pillars coord for each cell.
+        Return the points of the VTK grid and the point ids of each cell.
 
         Parameters
         ----------
-        i, j : int
-            Values from grid dimension.
-
-        In Corner-Point grid, the pillars are ordained like the follow example:
-
-        p2    p3
-        x------x
-        |      |
-        |      |
-        x------x
-        p0    p1
-
-        In a 2D system (2x2x1), we have:
-
-        6 --- 7 --- 8
-        |  2  |  3  |
-        3 --- 4 --- 5
-        |  0  |  1  |
-        0 --- 1 --- 2
+        coords : ndarray
+            Array of shape (N, 8, 3) with the nodes of each cell of the VTK grid in ECLIPSE order.
 
-        As you can see:
-
-        (0,1,3,4) - cell 0
-        (1,2,4,5) - cell 1
-        (3,4,6,7) - cell 2
-        (4,5,7,8) - cell 3
-
-        Some pillars are shared between cells
+        Notes
+        -----
+        Each cell owns its eight points, unless process_grid() was called with weld=True.
 
         """
 
-        pillars = []
+        if self._weld_tolerance is None:
+            return coords.reshape(-1, 3), np.arange(8*len(coords)).reshape(-1, 8)
 
-        # Recover logical dimension of grid
-        # There are (nx+1)*(ny+1) pillars lines
-        nx, ny = self._cart_dims[0]+1, self._cart_dims[1]+1
+        cells = self._global_index if len(self._global_index) != 0 else None
+        points, connectivity = geometry.weld_points(coords, self._cart_dims, self._weld_tolerance, cells)
 
-        # Get the pillar index in [COORD]
-        p0 = misc.get_ijk(i, j, 0, nx, ny, 0)
-        p1 = misc.get_ijk(i+1, j, 0, nx, ny, 0)
-        p2 = misc.get_ijk(i, j+1, 0, nx, ny, 0)
-        p3 = misc.get_ijk(i+1, j+1, 0, nx, ny, 0)
-
-        r"""
-        In ECLIPSE, the [COORD] keyword follow the pattern below:
-        1. A coordinate line (pillar) is specified by two triplets of
-            X, Y, and Z coordinates, representing two distinct points on it
-
-        So, we have:
-            COORD
-            xtop ytop ztop xbtm ybtm zbtm
-            xtop ytop ztop xbtm ybtm zbtm
-            xtop ytop ztop xbtm ybtm zbtm
-            .
-            .
-            .
-            xtop ytop ztop xbtm ybtm zbtm
-
-        """
+        if self._verbose:
+            print("\n\t[+] Welded {} nodes into {} points".format(8*len(coords), len(points)))
 
-        # Get the pillar from [COORD]
-        # Create an array with the four pillars' index
-        pillars_idx = [p0, p1, p2, p3]
+        return points, connectivity
 
-        for pillar_idx in pillars_idx:
-            top_idx = [6*pillar_idx, 6*pillar_idx+1, 6*pillar_idx+2]
-            btm_idx = [6*pillar_idx+3, 6*pillar_idx+4, 6*pillar_idx+5]
+    def _remove_cells(self):
+        r"""
+        Remove the inactive cells of the model.
 
-            top_points = np.array([self._coord[x] for x in top_idx])
-            btm_points = np.array([self._coord[x] for x in btm_idx])
+        Only works if exported to ParaView!
 
-            pillars.append([top_points, btm_points])
+        """
 
-        return pillars
+        ghost_cells = np.where(np.asarray(self._actnum) == 0, VTK.get_duplicatecell(), 0).astype(np.uint8)
+        VTK.set_ghost_array(self._vtk_unstructured_grid, ghost_cells)
 
-    def _get_zs(self, i, j, k):
+    def _update(self, data_arrays=None):
         r"""
-        Get the Z index in [ZCORN] and Z coords for a cell, each cell have eight Zs (depth of nodes).
+        This method update the data in the vtkUnsctructuredGrid.
 
         Parameters
         ----------
-        i, j, k : int
-            Values from grid dimension.
+        data_arrays : dict, optional
+            NumPy arrays holding the data of load_cell_data(), by name of the property.
 
-        The depths of the corner points of each cell are specified with 2*NX * 2*NY * 2*NZ values.
-            First the two corners in the i-direction of the first grid cell is given,
-            then the two corner of the next grid block in the i-direction etc.
-            The unit of the values is metres, and the depth values are positive with increasing values downwards.
+        Notes
+        -----
+        Only the arrays that are new or replaced since the last update are pushed to the VTK grid, an array
+            changed in place must be assigned again (e.g. G._cell_data['TEMP'] = temp) to be pushed.
 
         """
 
-        # Recover logical dimension of grid (*2 because we have 8*nx*ny*nz values from [ZCORN])
-        nx, ny, nz = 2 * self._cart_dims[0], 2 * self._cart_dims[1], 2 * self._cart_dims[2]
-
-        # Zs from top layer
-        z0 = misc.get_ijk(2*i, 2*j, 2*k, nx, ny, nz)
-        z1 = misc.get_ijk(2*i+1, 2*j, 2*k, nx, ny, nz)
-        z2 = misc.get_ijk(2*i, 2*j+1, 2*k, nx, ny, nz)
-        z3 = misc.get_ijk(2*i+1, 2*j+1, 2*k, nx, ny, nz)
-
-        # Zs from bottom layer
-        z4 = misc.get_ijk(2*i, 2*j, 2*k+1, nx, ny, nz)
-        z5 = misc.get_ijk(2*i+1, 2*j, 2*k+1, nx, ny, nz)
-        z6 = misc.get_ijk(2*i, 2*j+1, 2*k+1, nx, ny, nz)
-        z7 = misc.get_ijk(2*i+1, 2*j+1, 2*k+1, nx, ny, nz)
+        if data_arrays is not None:
+            self._cell_data.update({name.upper(): data for name, data in data_arrays.items()})
 
-        # Create an array with the eight zs' index
-        zs_idx = [z0, z1, z2, z3, z4, z5, z6, z7]
+        cell_data = self._get_cell_data()
+        if len(self._global_index) != 0:
+            cell_data['GLOBAL_INDEX'] = self._global_index
 
-        return [self._zcorn[x] for x in zs_idx]
-
-    def _remove_cells(self):
-        r"""
-        Remove the inactive cells of the model.
+        # Arrays not pushed yet
+        dirty = {name: data for name, data in cell_data.items() if self._pushed.get(name) is not data}
 
-        Only works if exported to ParaView!
+        buffers = {}
+        for name, data in dirty.items():
+            with self._profiler.stage('property attach', name) as event:
+                if name == 'GLOBAL_INDEX':
+                    dtype = None
+                else:
+                    dtype = np.uint8 if name == 'ACTNUM' else self._cell_dtype
+                    data = self._get_active_data(data)
+                buffers[name] = VTK.numpy_to_vtk(name, data, self._vtk_unstructured_grid, self._verbose, dtype,
+                                                 not self._zero_copy)
+                event['cells'] = len(buffers[name])
 
-        """
+        self._pushed.update(dirty)
 
-        ind = np.argwhere(self._actnum == 0)
-        ghost_cells = np.zeros(self._num_cell, np.uint8)
-        ghost_cells[ind] = VTK.get_duplicatecell()
-        self._vtk_unstructured_grid.AllocateCellGhostArray()
-        ghosts = self._vtk_unstructured_grid.GetCellGhostArray()
-        for i in ghost_cells:
-            ghosts.InsertNextTuple1(i)
+        # Keep alive the memory used by the VTK arrays
+        if self._zero_copy:
+            self._cell_buffers.update(buffers)
 
-    def _update(self, data_array=[], name='PROPERTY'):
+    def _get_active_data(self, data):
         r"""
-        This method update the data in the vtkUnsctructuredGrid.
+        Return the values of a property for the cells of the VTK grid (only the active ones if compacted).
 
         Parameters
         ----------
-        data_array : ndarray
-            NumPy array holding the data of load_cell_data().
-        name : string
-            String holding the name of the property.
+        data : ndarray
+            Array of size NX*NY*NZ with the values of the property.
 
         """
 
-        if len(self._actnum) != 0:
-            VTK.numpy_to_vtk('ACTNUM', self._actnum, self._vtk_unstructured_grid, self._verbose)
-        if len(self._permx) != 0:
-             VTK.numpy_to_vtk('PERMX', self._permx, self._vtk_unstructured_grid, self._verbose)
-        if len(self._permy) != 0:
-            VTK.numpy_to_vtk('PERMY', self._permy, self._vtk_unstructured_grid, self._verbose)
-        if len(self._permz) != 0:
-            VTK.numpy_to_vtk('PERMZ', self._permz, self._vtk_unstructured_grid, self._verbose)
-        if len(self._poro) != 0:
-            VTK.numpy_to_vtk('PORO', self._poro, self._vtk_unstructured_grid, self._verbose)
-        if len(self._so) != 0:
-            VTK.numpy_to_vtk('SO', self._so, self._vtk_unstructured_grid, self._verbose)
-        if len(data_array) != 0:
-            VTK.numpy_to_vtk(name.upper(), data_array, self._vtk_unstructured_grid, self._verbose)
\ No newline at end of file
+        if len(self._global_index) != 0:
+            return np.asarray(data).ravel()[self._global_index]
+
+        return data
\ No newline at end of file
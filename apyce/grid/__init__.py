@@ -14,6 +14,18 @@ This module contains the main class of APyCE.
 |  process_grid  | Compute grid topology and geometry from pillar grid        |
 |                | description                                                |
 +----------------+------------------------------------------------------------+
+|compute_topology| Find the cells sharing a face, faults and non-neighbour    |
+|                | connections included                                       |
++----------------+------------------------------------------------------------+
+|compute_geometry| Compute the volume, centroid, face areas and normals of    |
+|                | every cell, pore_volume() from PORO and NTG                |
++----------------+------------------------------------------------------------+
+|     locate     | Find the (I, J, K) of the cells holding a batch of points  |
++----------------+------------------------------------------------------------+
+|    subgrid     | Extract a box of cells and / or a region as a new grid     |
++----------------+------------------------------------------------------------+
+|    coarsen     | Merge blocks of cells into a coarser grid for LOD previews |
++----------------+------------------------------------------------------------+
 | load_cell_data | Read a file with data and append this data to model        |
 +----------------+------------------------------------------------------------+
 |   plot_grid    | Plot the grid with PyVista                                 |
@@ -21,6 +33,8 @@ This module contains the main class of APyCE.
 |   export_data  | Save grid data to a single vtu file for visualizing in     |
 |                | ParaView                                                   |
 +----------------+------------------------------------------------------------+
+|     profile    | Wall time, bytes, cells and peak RSS of each stage         |
++----------------+------------------------------------------------------------+
 
 """
 
@@ -0,0 +1,312 @@
+from apyce.utils import misc
+from apyce.utils.Errors import Errors
+from apyce.__version__ import __version__
+
+import numpy as np
+
+import hashlib
+import json
+import os
+import shutil
+import warnings
+
+
+class Cache:
+    r"""
+    On-disk cache of the arrays parsed from a grid file.
+
+    The cache of 'Data/dome.grdecl' lives in 'Data/.apyce_cache/dome.grdecl/' and holds one .npy file per
+        array plus a 'manifest.json' with the grid attributes and the signature (path, size, mtime and
+        content hash) of the grid file and of every file reached through INCLUDE.
+
+    The processed geometries (points and connectivity of the VTK grid) live in
+        'Data/.apyce_geometry/<key>/', where the key is a hash of the arrays describing the geometry.
+        They are shared by all the grid files of the directory and kept when a grid file changes, in their own
+        directory so that no grid file name can collide with them.
+
+    """
+
+    # Name of the directory holding the caches, created on the same directory than grid file
+    DIRECTORY = '.apyce_cache'
+
+    # Name of the file describing the content of a cache
+    MANIFEST = 'manifest.json'
+
+    # Size of the blocks read while hashing a file
+    BLOCK_SIZE = 1024 * 1024
+
+    # Name of the directory holding the processed geometries by geometry key, created next to DIRECTORY
+    GEOMETRY = '.apyce_geometry'
+
+    @classmethod
+    def get_directory(cls, filename):
+        r"""
+        Get the directory of the cache of a grid file.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the grid file.
+
+        """
+
+        path = misc.get_path(filename)
+
+        return os.path.join(misc.get_dirname(path), cls.DIRECTORY, misc.get_basename(path))
+
+    @classmethod
+    def get_signature(cls, filename):
+        r"""
+        Get the signature (path, size, mtime and content hash) of a file.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the file.
+
+        """
+
+        path = misc.get_path(filename)
+        stat = os.stat(path)
+
+        return {'path': path, 'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': cls.get_hash(path)}
+
+    @classmethod
+    def get_hash(cls, filename):
+        r"""
+        Get the content hash of a file.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the file.
+
+        """
+
+        digest = hashlib.blake2b(digest_size=20)
+        with open(misc.get_path(filename), 'rb') as f:
+            for block in iter(lambda: f.read(cls.BLOCK_SIZE), b''):
+                digest.update(block)
+
+        return digest.hexdigest()
+
+    @classmethod
+    def is_valid(cls, signature):
+        r"""
+        Check if a file still matches the signature recorded in the cache.
+
+        Parameters
+        ----------
+        signature : dict
+            Signature of the file returned by get_signature().
+
+        Notes
+        -----
+        The content hash is only computed again if the size matches but the mtime does not.
+
+        """
+
+        try:
+            stat = os.stat(signature['path'])
+        except OSError:
+            return False
+
+        if stat.st_size != signature['size']:
+            return False
+        if stat.st_mtime_ns == signature['mtime']:
+            return True
+
+        return cls.get_hash(signature['path']) == signature['hash']
+
+    @classmethod
+    def load(cls, filename):
+        r"""
+        Load the cache of a grid file.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the grid file.
+
+        Returns
+        -------
+        attributes : dict
+            The grid attributes saved with the arrays, or None if there is no valid cache.
+        arrays : dict
+            Read-only memory-mapped arrays, paged in lazily, or None if there is no valid cache.
+
+        """
+
+        directory = cls.get_directory(filename)
+
+        try:
+            with open(os.path.join(directory, cls.MANIFEST)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None, None
+
+        if manifest.get('version') != __version__ or manifest.get('files', [{}])[0].get('path') != misc.get_path(filename):
+            return None, None
+
+        for signature in manifest['files']:
+            if not cls.is_valid(signature):
+                return None, None
+
+        try:
+            arrays = {name: np.load(os.path.join(directory, name + '.npy'), mmap_mode='r') for name in manifest['arrays']}
+        except (OSError, ValueError):
+            return None, None
+
+        return manifest['attributes'], arrays
+
+    @classmethod
+    def save(cls, filename, files, attributes, arrays):
+        r"""
+        Save the arrays parsed from a grid file.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the grid file.
+        files : list
+            A list of strings with the path of the grid file followed by the included files.
+        attributes : dict
+            JSON serializable grid attributes saved with the arrays.
+        arrays : dict
+            Arrays to be saved, by name.
+
+        Returns True if the cache was written, a warning is emitted otherwise.
+
+        """
+
+        manifest = {
+            'version': __version__,
+            'files': [cls.get_signature(x) for x in files],
+            'attributes': attributes,
+            'arrays': list(arrays)
+        }
+
+        return cls._write(cls.get_directory(filename), manifest, arrays)
+
+    @classmethod
+    def get_geometry_key(cls, attributes, arrays):
+        r"""
+        Get the key of a geometry, the hash of the arrays and attributes describing it.
+
+        Parameters
+        ----------
+        attributes : dict
+            JSON serializable attributes of the geometry e.g. the grid type and the options of process_grid().
+        arrays : list
+            Arrays describing the geometry e.g. [cart_dims, coord, zcorn, actnum].
+
+        """
+
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(json.dumps([__version__, attributes], sort_keys=True).encode())
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            digest.update(array.dtype.str.encode() + str(array.shape).encode())
+            digest.update(array.reshape(-1).view(np.uint8))
+
+        return digest.hexdigest()
+
+    @classmethod
+    def get_geometry_directory(cls, filename, key):
+        r"""
+        Get the directory of a processed geometry.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the grid file.
+        key : string
+            The key of the geometry returned by get_geometry_key().
+
+        """
+
+        return os.path.join(misc.get_dirname(misc.get_path(filename)), cls.GEOMETRY, key)
+
+    @classmethod
+    def load_geometry(cls, filename, key):
+        r"""
+        Load a processed geometry.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the grid file.
+        key : string
+            The key of the geometry returned by get_geometry_key().
+
+        Returns
+        -------
+        attributes : dict
+            The attributes saved with the arrays, or None if the geometry is not cached.
+        arrays : dict
+            Read-only memory-mapped arrays, or None if the geometry is not cached.
+
+        """
+
+        directory = cls.get_geometry_directory(filename, key)
+
+        try:
+            with open(os.path.join(directory, cls.MANIFEST)) as f:
+                manifest = json.load(f)
+            arrays = {name: np.load(os.path.join(directory, name + '.npy'), mmap_mode='r') for name in manifest['arrays']}
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+        return manifest['attributes'], arrays
+
+    @classmethod
+    def save_geometry(cls, filename, key, attributes, arrays):
+        r"""
+        Save a processed geometry.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the grid file.
+        key : string
+            The key of the geometry returned by get_geometry_key().
+        attributes : dict
+            JSON serializable attributes saved with the arrays.
+        arrays : dict
+            Arrays to be saved, by name.
+
+        Returns True if the cache was written, a warning is emitted otherwise.
+
+        """
+
+        manifest = {'version': __version__, 'attributes': attributes, 'arrays': list(arrays)}
+
+        return cls._write(cls.get_geometry_directory(filename, key), manifest, arrays)
+
+    @classmethod
+    def _write(cls, directory, manifest, arrays):
+        r"""
+        Write the arrays and the manifest of an entry of the cache.
+
+        Returns False, with a warning, if the entry can't be written e.g. in a read-only directory, the grid
+            is then processed without cache.
+
+        """
+
+        try:
+            # Remove the old entry before writing, the manifest is written last
+            shutil.rmtree(directory, ignore_errors=True)
+            os.makedirs(directory)
+
+            for name, array in arrays.items():
+                np.save(os.path.join(directory, name + '.npy'), np.asarray(array))
+
+            with open(os.path.join(directory, cls.MANIFEST + '.tmp'), 'w') as f:
+                json.dump(manifest, f, indent=1)
+            os.replace(os.path.join(directory, cls.MANIFEST + '.tmp'), os.path.join(directory, cls.MANIFEST))
+        except OSError as error:
+            shutil.rmtree(directory, ignore_errors=True)
+            warnings.warn(Errors.CACHE_WRITE_ERROR.value.format(directory, error))
+            return False
+
+        return True
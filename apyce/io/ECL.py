@@ -0,0 +1,201 @@
+from apyce.utils import misc
+
+import numpy as np
+
+import os
+
+
+class ECL:
+    r"""
+    Reader of the Schlumberger ECLIPSE binary output files (EGRID, INIT, UNRST).
+
+    The file is memory-mapped and indexed once, the arrays are then read straight from the buffer.
+
+    Parameters
+    ----------
+    filename : string
+        A string that holds the name (path) of the binary file.
+
+    Notes
+    -----
+    The binary files are a sequence of big-endian unformatted Fortran records. Each array is written
+        as a header record followed by the data records:
+
+        | 16 | KEYWORD (8 chars) | COUNT (int32) | TYPE (4 chars) | 16 |
+        | n  | data (up to 1000 numbers or 105 strings)            | n  |
+        | n  | data                                                | n  |
+        ...
+
+    Examples
+    --------
+    >>> f = ECL('CASE.EGRID')
+    >>> nx, ny, nz = f.read('GRIDHEAD')[1:4]
+    >>> zcorn = f.read('ZCORN')
+
+    """
+
+    # Big-endian NumPy type of each ECLIPSE data type
+    TYPES = {
+        'INTE': np.dtype('>i4'),
+        'REAL': np.dtype('>f4'),
+        'DOUB': np.dtype('>f8'),
+        'LOGI': np.dtype('>i4'),
+        'CHAR': np.dtype('S8'),
+        'MESS': np.dtype('S1')
+    }
+
+    # Number of items in each data record (numbers / strings)
+    BLOCK_SIZE = 1000
+    CHAR_BLOCK_SIZE = 105
+
+    # Size of the record markers
+    MARKER_SIZE = 4
+
+    def __init__(self, filename):
+        self._filename = misc.get_path(filename)
+        self._buffer = np.memmap(self._filename, dtype=np.uint8, mode='r')
+        self._records = self._index()
+
+    @classmethod
+    def is_binary(cls, filename):
+        r"""
+        Check if a file is an ECLIPSE binary file (starts with a header record).
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the file.
+
+        """
+
+        with open(misc.get_path(filename), 'rb') as f:
+            return f.read(cls.MARKER_SIZE) == np.array(16, dtype='>i4').tobytes()
+
+    @classmethod
+    def find_file(cls, filename, extension):
+        r"""
+        Find the file with the same name but other extension (e.g. CASE.EGRID -> CASE.INIT).
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the file.
+        extension : string
+            The extension of the file to find, without the dot.
+
+        Returns None if the file does not exist.
+
+        """
+
+        base = os.path.splitext(misc.get_path(filename))[0]
+        for candidate in [base + '.' + extension.upper(), base + '.' + extension.lower()]:
+            if os.path.isfile(candidate):
+                return candidate
+
+        return None
+
+    def keywords(self):
+        r"""
+        Return the list of keywords in the file, in order.
+
+        """
+
+        return [x[0] for x in self._records]
+
+    def read(self, keyword, occurrence=0):
+        r"""
+        Read an array of the file.
+
+        Parameters
+        ----------
+        keyword : string
+            The keyword of the array e.g. ZCORN.
+        occurrence : int, default is 0.
+            Which occurrence of the keyword to read, negative values count from the end
+                (e.g. -1 is the last report step of an UNRST file).
+
+        Returns
+        -------
+        data : ndarray
+            Array in native byte order, or None if the keyword is not in the file.
+
+        """
+
+        records = [x for x in self._records if x[0] == keyword]
+        if not records or not -len(records) <= occurrence < len(records):
+            return None
+
+        _, data_type, count, offset = records[occurrence]
+        dtype = self._get_dtype(data_type)
+        block = self._get_block_size(data_type)
+
+        data = np.empty(count, dtype=dtype.newbyteorder('=') if dtype.kind != 'S' else dtype)
+
+        # Full records are evenly spaced, so they are read at once through a strided view
+        n_full = count // block
+        stride = block * dtype.itemsize + 2 * self.MARKER_SIZE
+        if n_full:
+            full = np.ndarray((n_full, block), dtype=dtype, buffer=self._buffer,
+                              offset=offset + self.MARKER_SIZE, strides=(stride, dtype.itemsize))
+            data[:n_full*block].reshape(n_full, block)[:] = full
+
+        rest = count - n_full * block
+        if rest:
+            data[n_full*block:] = np.ndarray(rest, dtype=dtype, buffer=self._buffer,
+                                             offset=offset + n_full * stride + self.MARKER_SIZE)
+
+        if data_type == 'LOGI':
+            data = data != 0
+
+        return data
+
+    def _index(self):
+        r"""
+        Record the keyword, type, number of items and offset of the data of every array in the file.
+
+        """
+
+        records = []
+        position = 0
+        size = len(self._buffer)
+
+        while position + 24 <= size:
+            header = self._buffer[position:position+24].tobytes()
+            keyword = header[4:12].decode('ascii').strip()
+            count = int(np.frombuffer(header[12:16], dtype='>i4')[0])
+            data_type = header[16:20].decode('ascii')
+
+            position += 24
+            records.append((keyword, data_type, count, position))
+
+            # Skip the data records
+            if count > 0:
+                block = self._get_block_size(data_type)
+                n_blocks = -(-count // block)
+                position += count * self._get_dtype(data_type).itemsize + 2 * self.MARKER_SIZE * n_blocks
+
+        return records
+
+    @classmethod
+    def _get_dtype(cls, data_type):
+        r"""
+        Return the NumPy type of an ECLIPSE data type, including the strings of nn chars (C0nn).
+
+        """
+
+        if data_type.startswith('C0'):
+            return np.dtype('S' + str(int(data_type[2:])))
+
+        return cls.TYPES[data_type]
+
+    @classmethod
+    def _get_block_size(cls, data_type):
+        r"""
+        Return the number of items in each data record of an ECLIPSE data type.
+
+        """
+
+        if data_type == 'CHAR' or data_type.startswith('C0'):
+            return cls.CHAR_BLOCK_SIZE
+
+        return cls.BLOCK_SIZE
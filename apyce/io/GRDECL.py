@@ -0,0 +1,326 @@
+from apyce.utils import misc, Errors
+
+import numpy as np
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import re
+
+
+class GRDECL:
+    r"""
+    Reader of the Schlumberger ECLIPSE grid (GRDECL) input format.
+
+    The file is read in binary mode, line by line for the keywords and in large blocks for the
+        sections of data, that are parsed straight into preallocated NumPy arrays.
+
+    Parameters
+    ----------
+    filename : string
+        A string that holds the name (path) of the grid file, plain or compressed with gzip, bz2, xz or zstd.
+
+    Notes
+    -----
+    Compressed files are decompressed on the fly while reading, chosen by extension (.gz, .bz2, .xz, .zst)
+        or by the magic bytes at the start of the file. Seeking in a compressed file decompresses it again
+        up to the offset. The zstandard package is only needed for zstd files.
+
+    Examples
+    --------
+    >>> with GRDECL('dome.grdecl') as f:
+    ...     line = f.readline()
+    ...     data, count = f.read_section(8*20*20*4)
+
+    """
+
+    # Size of the blocks read while parsing a section of data
+    CHUNK_SIZE = 4 * 1024 * 1024
+
+    # Comments start with '--' and go to the end of the line
+    COMMENT_PATTERN = re.compile(rb'--[^\n]*')
+
+    # Terminator of a section that is not inside a comment
+    TERMINATOR_PATTERN = re.compile(rb'--[^\n]*|/')
+
+    # Repeat counts of the form n*v
+    REPEAT_PATTERN = re.compile(rb'(\d+)\*(\S+)')
+
+    # Compression of the files by extension and by magic bytes
+    EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz', '.zst': 'zstd'}
+    MAGIC = {b'\x1f\x8b': 'gzip', b'BZh': 'bz2', b'\xfd7zXZ\x00': 'xz', b'\x28\xb5\x2f\xfd': 'zstd'}
+
+    def __init__(self, filename):
+        self._file = self.open_file(filename)
+        self._pending = b''
+
+    @classmethod
+    def get_compression(cls, filename):
+        r"""
+        Get the compression of a file ('gzip', 'bz2', 'xz' or 'zstd'), None for plain files.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the file.
+
+        """
+
+        path = misc.get_path(filename)
+
+        extension = os.path.splitext(path)[1].lower()
+        if extension in cls.EXTENSIONS:
+            return cls.EXTENSIONS[extension]
+
+        with open(path, 'rb') as f:
+            start = f.read(6)
+        for magic, compression in cls.MAGIC.items():
+            if start.startswith(magic):
+                return compression
+
+        return None
+
+    @classmethod
+    def open_file(cls, filename):
+        r"""
+        Open a file for binary reading, decompressing it on the fly if needed.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the file.
+
+        """
+
+        path = misc.get_path(filename)
+        compression = cls.get_compression(path)
+
+        if compression == 'gzip':
+            return gzip.open(path, 'rb')
+        elif compression == 'bz2':
+            return bz2.open(path, 'rb')
+        elif compression == 'xz':
+            return lzma.open(path, 'rb')
+        elif compression == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                raise ImportError(Errors.ZSTD_ERROR.value.replace('{}', path))
+            reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+            return io.BufferedReader(reader, cls.CHUNK_SIZE)
+
+        return open(path, 'rb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        r"""
+        Close the file.
+
+        """
+
+        self._file.close()
+
+    def readline(self):
+        r"""
+        Read the next line of the file, an empty bytes object means EOF.
+
+        """
+
+        if self._pending:
+            end = self._pending.find(b'\n')
+            if end >= 0:
+                line, self._pending = self._pending[:end+1], self._pending[end+1:]
+                return line
+            line, self._pending = self._pending, b''
+            return line + self._file.readline()
+
+        return self._file.readline()
+
+    def read_section(self, size, dtype=float):
+        r"""
+        Read the section of data in the ECLIPSE input file until the '/' terminator.
+
+        Parameters
+        ----------
+        size : int
+            Number of values expected in the section.
+        dtype : data-type, default is float.
+            Type of the returned array.
+
+        Returns
+        -------
+        data : ndarray
+            Array of length size holding the values of the section.
+        count : int
+            Number of values found in the section, the values beyond size are discarded.
+
+        Notes
+        -----
+        Repeat counts (2*3 => 3 3) are expanded straight into the array and comments ('--') are ignored.
+        The rest of the line after the '/' terminator is ignored.
+
+        """
+
+        data = np.empty(size, dtype=dtype)
+        count = 0
+
+        while True:
+            chunk = self._read_chunk()
+            if not chunk:
+                raise EOFError(Errors.EOF_ERROR.value)
+
+            end = self._find_terminator(chunk)
+            if end >= 0:
+                chunk = chunk[:end]
+
+            if b'--' in chunk:
+                chunk = self.COMMENT_PATTERN.sub(b'', chunk)
+
+            count = self._parse(chunk, data, count, dtype)
+
+            if end >= 0:
+                return data, count
+
+    def skip_section(self):
+        r"""
+        Skip the section of data in the ECLIPSE input file until the '/' terminator, without parsing it.
+
+        Returns
+        -------
+        offset : int
+            Position of the section in the file.
+        length : int
+            Length in bytes of the section, including the line of the terminator.
+
+        """
+
+        offset = self.tell()
+
+        while True:
+            chunk = self._read_chunk()
+            if not chunk:
+                raise EOFError(Errors.EOF_ERROR.value)
+
+            if self._find_terminator(chunk) >= 0:
+                return offset, self.tell() - offset
+
+    def tell(self):
+        r"""
+        Return the current position in the file.
+
+        """
+
+        return self._file.tell() - len(self._pending)
+
+    def seek(self, offset):
+        r"""
+        Move to a position of the file returned by tell().
+
+        Parameters
+        ----------
+        offset : int
+            Position in the file.
+
+        """
+
+        self._file.seek(offset)
+        self._pending = b''
+
+    def _find_terminator(self, chunk):
+        r"""
+        Find the '/' terminator outside of the comments in a block.
+
+        Returns the position of the terminator in the block or -1. If found, the lines after the
+            terminator are kept for the next reading.
+
+        """
+
+        if b'--' in chunk:
+            end = -1
+            for match in self.TERMINATOR_PATTERN.finditer(chunk):
+                if match.group() == b'/':
+                    end = match.start()
+                    break
+        else:
+            end = chunk.find(b'/')
+
+        if end >= 0:
+            # Keep the lines after the terminator for the next reading
+            eol = chunk.find(b'\n', end)
+            if eol >= 0:
+                self._pending = chunk[eol+1:]
+
+        return end
+
+    def _read_chunk(self):
+        r"""
+        Read a block of whole lines from the file.
+
+        """
+
+        chunk = self._pending + self._file.read(self.CHUNK_SIZE)
+        self._pending = b''
+
+        # Do not split the last line of the block
+        if not chunk.endswith(b'\n'):
+            chunk += self._file.readline()
+
+        return chunk
+
+    def _parse(self, chunk, data, count, dtype):
+        r"""
+        Parse the values of a block and write them into data starting at count.
+
+        Parameters
+        ----------
+        chunk : bytes
+            Block of the section without comments and terminator.
+        data : ndarray
+            Array receiving the values.
+        count : int
+            Number of values already in data.
+        dtype : data-type
+            Type of the values.
+
+        """
+
+        start = 0
+        if b'*' in chunk:
+            for match in self.REPEAT_PATTERN.finditer(chunk):
+                count = self._store(self._values(chunk[start:match.start()], dtype), data, count)
+                value = self._values(match.group(2), dtype)[0]
+                count = self._store(np.full(int(match.group(1)), value, dtype=dtype), data, count)
+                start = match.end()
+
+        return self._store(self._values(chunk[start:] if start else chunk, dtype), data, count)
+
+    @staticmethod
+    def _values(chunk, dtype):
+        r"""
+        Convert a block of blank separated values into an array.
+
+        """
+
+        if not chunk or chunk.isspace():
+            return np.empty(0, dtype=dtype)
+
+        return np.fromstring(chunk, dtype=dtype, sep=' ')
+
+    @staticmethod
+    def _store(values, data, count):
+        r"""
+        Write the values into data starting at count and return the new count.
+
+        """
+
+        n = min(len(values), max(len(data) - count, 0))
+        data[count:count+n] = values[:n]
+
+        return count + len(values)
@@ -1,6 +1,8 @@
 import vtk
 import vtk.util.numpy_support as np_support
 
+import numpy as np
+
 from apyce.utils import misc
 
 
@@ -9,6 +11,10 @@ class VTK:
     The Visualization Toolkit (VTK) format defined by Kitware and used by ParaView
 
     """
+
+    # Node order of an ECLIPSE cell in terms of the VTK Hexahedron (swap 2 <-> 3 and 6 <-> 7)
+    ECLIPSE_TO_VTK_HEXAHEDRON = [0, 1, 3, 2, 4, 5, 7, 6]
+
     def __new__(cls):
         return vtk.vtkUnstructuredGrid()
 
@@ -45,13 +51,26 @@ class VTK:
         xml_writer.Write()
 
     @classmethod
-    def create_points(cls):
+    def create_points(cls, numpy_points=None):
         r"""
         Return a vtk.vtkPoints() object.
 
+        Parameters
+        ----------
+        numpy_points : ndarray, optional
+            Array of shape (N, 3) holding the XYZ coords of the points. If given, the points are
+                installed in one step from the array (float32 or float64) instead of point by point.
+
         """
 
-        return vtk.vtkPoints()
+        points = vtk.vtkPoints()
+
+        if numpy_points is not None:
+            numpy_points = np.ascontiguousarray(numpy_points).reshape(-1, 3)
+            points.SetDataType(np_support.get_vtk_array_type(numpy_points.dtype))
+            points.SetData(np_support.numpy_to_vtk(num_array=numpy_points, deep=False))
+
+        return points
 
     @classmethod
     def create_hexahedron(cls):
@@ -62,6 +81,62 @@ class VTK:
 
         return vtk.vtkHexahedron()
 
+    @classmethod
+    def create_hexahedra(cls, vtk_unstructured_grid, connectivity, offsets=None, cell_types=None):
+        r"""
+        Install all the hexahedra of the grid at once in the vtkUnstructuredGrid.
+
+        Parameters
+        ----------
+        vtk_unstructured_grid : vtkUnstructuredGrid Object
+            Object holding VTK Unstructured Grid.
+        connectivity : ndarray
+            Integer array of shape (N, 8) holding the point ids of each cell in ECLIPSE order.
+        offsets : ndarray, optional
+            Integer array of size N+1 holding the offset of each cell in the flattened connectivity,
+                default is one cell every eight point ids.
+        cell_types : ndarray, optional
+            Array of size N holding the VTK cell type of each cell, default is VTK_HEXAHEDRON.
+
+        Notes
+        -----
+        The VTK Hexahedron indexes 2, 3, 6, and 7 are different from ECLIPSE, the swap is done
+            by indexing the connectivity array with ECLIPSE_TO_VTK_HEXAHEDRON.
+
+        The arrays are handed to vtkCellArray without copies, so no Python work is done per cell.
+
+        """
+
+        id_type = np_support.get_vtk_to_numpy_typemap()[vtk.VTK_ID_TYPE]
+
+        connectivity = np.asarray(connectivity).reshape(-1, 8)
+        n_cells = connectivity.shape[0]
+
+        # Swap 2 <-> 3 and 6 <-> 7 (eclipse -> vtk), fancy indexing gives a new contiguous array
+        connectivity = connectivity[:, cls.ECLIPSE_TO_VTK_HEXAHEDRON].astype(id_type, copy=False).ravel()
+
+        if offsets is None:
+            offsets = np.arange(0, 8*n_cells+1, 8, dtype=id_type)
+        else:
+            offsets = np.ascontiguousarray(offsets, dtype=id_type)
+
+        if cell_types is None:
+            cell_types = np.full(n_cells, vtk.VTK_HEXAHEDRON, dtype=np.uint8)
+        else:
+            cell_types = np.ascontiguousarray(cell_types, dtype=np.uint8)
+
+        cells = vtk.vtkCellArray()
+        if hasattr(cells, 'SetData'):
+            cells.SetData(np_support.numpy_to_vtkIdTypeArray(offsets, deep=False),
+                          np_support.numpy_to_vtkIdTypeArray(connectivity, deep=False))
+        else:
+            # VTK < 9 only understands the legacy layout [n, id_0, ..., id_n-1, n, ...]
+            legacy = np.insert(connectivity, offsets[:-1], np.diff(offsets)).astype(id_type)
+            cells.SetCells(n_cells, np_support.numpy_to_vtkIdTypeArray(legacy, deep=True))
+
+        vtk_cell_types = np_support.numpy_to_vtk(num_array=cell_types, deep=False, array_type=vtk.VTK_UNSIGNED_CHAR)
+        vtk_unstructured_grid.SetCells(vtk_cell_types, cells)
+
     @classmethod
     def get_duplicatecell(cls):
         r"""
@@ -72,7 +147,45 @@ class VTK:
         return vtk.vtkDataSetAttributes.DUPLICATECELL
 
     @classmethod
-    def numpy_to_vtk(cls, name, numpy_data, vtk_unstructured_grid, verbose=True):
+    def set_ghost_array(cls, vtk_unstructured_grid, ghost_cells):
+        r"""
+        Install the ghost array of the cells in one step from a NumPy array.
+
+        Parameters
+        ----------
+        vtk_unstructured_grid : vtkUnstructuredGrid Object
+            Object holding VTK Unstructured Grid.
+        ghost_cells : ndarray
+            Array of size N holding the ghost flags of each cell (e.g. DUPLICATECELL for the inactive cells).
+
+        """
+
+        ghosts = np_support.numpy_to_vtk(num_array=np.ascontiguousarray(ghost_cells, dtype=np.uint8), deep=True,
+                                         array_type=vtk.VTK_UNSIGNED_CHAR)
+        ghosts.SetName(vtk.vtkDataSetAttributes.GhostArrayName())
+        vtk_unstructured_grid.GetCellData().AddArray(ghosts)
+
+    @classmethod
+    def add_field_data(cls, vtk_unstructured_grid, arrays):
+        r"""
+        Add a batch of numpy arrays of any size to the field data of the structure grid.
+
+        Parameters
+        ----------
+        vtk_unstructured_grid : vtkUnstructuredGrid Object
+            Object holding VTK Unstructured Grid.
+        arrays : dict
+            1-D arrays, by name, copied with their type.
+
+        """
+
+        for name, numpy_data in arrays.items():
+            vtk_data = np_support.numpy_to_vtk(num_array=np.ascontiguousarray(numpy_data), deep=True)
+            vtk_data.SetName(name)
+            vtk_unstructured_grid.GetFieldData().AddArray(vtk_data)
+
+    @classmethod
+    def numpy_to_vtk(cls, name, numpy_data, vtk_unstructured_grid, verbose=True, dtype=np.float32, deep=True):
         r"""
         Convert the numpy array to vtk array and add this array to structure grid.
 
@@ -86,6 +199,16 @@ class VTK:
             Object holding VTK Unstructured Grid.
         verbose : boolean, default is True.
             A boolean that will be used to emit (or not) messages to screen while processing.
+        dtype : data-type, default is float32.
+            The type of the vtk array (e.g. np.uint8 for ACTNUM), None to keep the type of the numpy array.
+        deep : boolean, default is True.
+            If False, the vtk array uses the memory of the numpy array (or of its conversion to dtype)
+                instead of a copy. The caller must then keep the returned array alive as long as the grid.
+
+        Returns
+        -------
+        numpy_data : ndarray
+            The contiguous array holding the values handed to VTK.
 
         Notes
         -----
@@ -96,7 +219,27 @@ class VTK:
         if verbose:
             print('\t[+] Inserting data [' + name + '] into vtk array')
 
-        vtk_data = np_support.numpy_to_vtk(num_array=numpy_data.ravel(), deep=True, array_type=vtk.VTK_FLOAT)
+        numpy_data = np.ascontiguousarray(np.asarray(numpy_data).ravel(), dtype=dtype)
+        if numpy_data.dtype.byteorder == '>':
+            numpy_data = numpy_data.astype(numpy_data.dtype.newbyteorder('='))
+
+        vtk_data = np_support.numpy_to_vtk(num_array=numpy_data, deep=deep)
         vtk_data.SetName(name)
         vtk_data.SetNumberOfComponents(1)
-        vtk_unstructured_grid.GetCellData().AddArray(vtk_data)
\ No newline at end of file
+        vtk_unstructured_grid.GetCellData().AddArray(vtk_data)
+
+        return numpy_data
+
+    @classmethod
+    def vtk_to_numpy(cls, vtk_data):
+        r"""
+        Return a NumPy view of a vtk array.
+
+        Parameters
+        ----------
+        vtk_data : vtkDataArray Object
+            Array holding the values of a property.
+
+        """
+
+        return np_support.vtk_to_numpy(vtk_data)
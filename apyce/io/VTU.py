@@ -0,0 +1,355 @@
+from apyce.utils import geometry, misc
+
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+from xml.sax.saxutils import quoteattr
+
+
+class VTU:
+    r"""
+    Streaming writer of VTK XML Unstructured Grid files (.vtu) with appended raw binary data.
+
+    The points, cells and cell data of a corner-point grid are generated and written in slabs of
+        K-layers, so the memory used by the geometry is bounded by the size of a slab instead of the
+        size of the grid.
+
+    Notes
+    -----
+    The file is made of an XML header describing every array, with its offset in the appended
+        section, followed by the raw data of the arrays. Each array is written as
+
+        | size in bytes (uint64) | data |
+
+    Since the size of every array is known in advance, the header is written first and the data
+        is then streamed array by array (points, connectivity, offsets, types and cell data).
+
+    See also
+    --------
+    https://vtk.org/wp-content/uploads/2015/04/file-formats.pdf (page 12 - XML File Formats)
+
+    """
+
+    # Number of cells in each slab, rounded to whole K-layers
+    SLAB_CELLS = 250000
+
+    # VTK XML name of the NumPy types
+    TYPES = {
+        np.dtype('<f4'): 'Float32',
+        np.dtype('<f8'): 'Float64',
+        np.dtype('<i8'): 'Int64',
+        np.dtype('u1'): 'UInt8'
+    }
+
+    # VTK_HEXAHEDRON cell type
+    HEXAHEDRON = 12
+
+    # Value of the ghost array for the inactive cells (vtkDataSetAttributes.DUPLICATECELL)
+    DUPLICATECELL = 1
+
+    # Node order of an ECLIPSE cell in terms of the VTK Hexahedron (swap 2 <-> 3 and 6 <-> 7)
+    ECLIPSE_TO_VTK_HEXAHEDRON = [0, 1, 3, 2, 4, 5, 7, 6]
+
+    @classmethod
+    def write_corner_point(cls, filename, coord, zcorn, cart_dims, cell_data=None, actnum=None, k_start=0,
+                           k_stop=None, slab_size=None, verbose=False):
+        r"""
+        Write the layers [k_start, k_stop) of a corner-point grid to a vtu file, slab by slab.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the vtu file.
+        coord : ndarray
+            A list of floating point numbers that represents the COORD keyword from Schlumberger Eclipse.
+        zcorn : ndarray
+            A list of floating point numbers that represents the ZCORN keyword from Schlumberger Eclipse.
+        cart_dims : ndarray
+            Dimensions of the grid.
+        cell_data : dict, optional
+            Arrays of size NX*NY*NZ holding the properties of the whole grid, by name.
+        actnum : ndarray, optional
+            A list of integer (0 or 1) numbers, the inactive cells are flagged in the ghost array.
+        k_start, k_stop : int
+            Range of layers [k_start, k_stop) to be written, default is the whole grid.
+        slab_size : int, optional
+            Number of K-layers generated at once, default is about SLAB_CELLS cells.
+        verbose : boolean, default is False.
+            A boolean that will be used to emit (or not) messages to screen while processing.
+
+        Notes
+        -----
+        Each cell owns its eight points, as in the grid built by Grid.process_grid(). Points are written
+            in Float64, the connectivity and offsets in Int64, ACTNUM in UInt8 and the other cell data in Float32.
+
+        """
+
+        nx, ny, nz = [int(x) for x in cart_dims]
+        k_stop = nz if k_stop is None else k_stop
+        layer = nx * ny
+        n_cells = layer * (k_stop - k_start)
+
+        if slab_size is None:
+            slab_size = max(1, cls.SLAB_CELLS // layer)
+        slabs = [(k, min(k + slab_size, k_stop)) for k in range(k_start, k_stop, slab_size)]
+
+        cell_data = {} if cell_data is None else cell_data
+        arrays = [('Points', np.dtype('<f8'), 24 * n_cells, 3),
+                  ('connectivity', np.dtype('<i8'), 8 * n_cells, 1),
+                  ('offsets', np.dtype('<i8'), n_cells, 1),
+                  ('types', np.dtype('u1'), n_cells, 1)]
+        arrays += [(name, cls._get_dtype(name), n_cells, 1) for name in cell_data]
+        if actnum is not None and len(actnum) != 0:
+            arrays.append(('vtkGhostType', np.dtype('u1'), n_cells, 1))
+
+        if verbose:
+            print("\n[OUTPUT] Streaming {} cells in {} slabs to \"{}\"".format(n_cells, len(slabs), filename))
+
+        with open(filename, 'wb') as f:
+            f.write(cls._header(8 * n_cells, n_cells, arrays).encode())
+
+            # Points
+            cls._write_size(f, arrays[0])
+            for k0, k1 in slabs:
+                coords, _ = geometry.corner_point_coords(coord, zcorn, cart_dims, k0, k1)
+                f.write(coords.astype('<f8', copy=False).tobytes())
+                del coords
+
+            # Cells
+            cls._write_size(f, arrays[1])
+            for k0, k1 in slabs:
+                first, last = layer * (k0 - k_start), layer * (k1 - k_start)
+                connectivity = np.arange(8 * first, 8 * last, dtype='<i8').reshape(-1, 8)
+                f.write(connectivity[:, cls.ECLIPSE_TO_VTK_HEXAHEDRON].tobytes())
+
+            cls._write_size(f, arrays[2])
+            for k0, k1 in slabs:
+                first, last = layer * (k0 - k_start), layer * (k1 - k_start)
+                f.write(np.arange(8 * (first + 1), 8 * (last + 1), 8, dtype='<i8').tobytes())
+
+            cls._write_size(f, arrays[3])
+            for k0, k1 in slabs:
+                f.write(np.full(layer * (k1 - k0), cls.HEXAHEDRON, dtype=np.uint8).tobytes())
+
+            # Cell data
+            for array in arrays[4:4+len(cell_data)]:
+                cls._write_size(f, array)
+                values = np.asarray(cell_data[array[0]]).ravel()
+                for k0, k1 in slabs:
+                    f.write(values[layer*k0:layer*k1].astype(array[1]).tobytes())
+
+            if arrays[-1][0] == 'vtkGhostType':
+                cls._write_size(f, arrays[-1])
+                actnum = np.asarray(actnum).ravel()
+                for k0, k1 in slabs:
+                    ghosts = np.where(actnum[layer*k0:layer*k1] == 0, cls.DUPLICATECELL, 0).astype(np.uint8)
+                    f.write(ghosts.tobytes())
+
+            f.write(b'\n  </AppendedData>\n</VTKFile>\n')
+
+    @classmethod
+    def write_partitioned(cls, filename, coord, zcorn, cart_dims, cell_data=None, actnum=None, n_pieces=1,
+                          slab_size=None, verbose=False):
+        r"""
+        Write a corner-point grid to a pvtu file and one vtu file per partition of K-layers, in parallel.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the pvtu file.
+        coord : ndarray
+            A list of floating point numbers that represents the COORD keyword from Schlumberger Eclipse.
+        zcorn : ndarray
+            A list of floating point numbers that represents the ZCORN keyword from Schlumberger Eclipse.
+        cart_dims : ndarray
+            Dimensions of the grid.
+        cell_data : dict, optional
+            Arrays of size NX*NY*NZ holding the properties of the whole grid, by name.
+        actnum : ndarray, optional
+            A list of integer (0 or 1) numbers, the inactive cells are flagged in the ghost array.
+        n_pieces : int, default is 1.
+            Number of partitions, each one is written by a worker process (at most NZ).
+        slab_size : int, optional
+            Number of K-layers generated at once by each worker, default is about SLAB_CELLS cells.
+        verbose : boolean, default is False.
+            A boolean that will be used to emit (or not) messages to screen while processing.
+
+        Notes
+        -----
+        The pieces of 'Results/dome.pvtu' are written to 'Results/dome/dome_<n>.vtu', as the VTK
+            parallel writers do.
+
+        COORD, ZCORN and the cell data are copied once to shared memory, the workers map them
+            instead of receiving a pickled copy each.
+
+        Returns the list of the paths of the pieces.
+
+        """
+
+        cell_data = {} if cell_data is None else cell_data
+        actnum = [] if actnum is None else actnum
+        nz = int(cart_dims[2])
+        n_pieces = max(1, min(n_pieces, nz))
+
+        base = misc.get_basename(filename).split('.')[0]
+        pieces_dir = os.path.join(misc.get_dirname(filename), base)
+        os.makedirs(pieces_dir, exist_ok=True)
+
+        # Split the layers as evenly as possible
+        bounds = np.linspace(0, nz, n_pieces + 1).round().astype(int)
+        pieces = [os.path.join(pieces_dir, '{}_{}.vtu'.format(base, i)) for i in range(n_pieces)]
+
+        if verbose:
+            print("\n[OUTPUT] Writting {} pieces of \"{}\" in parallel".format(n_pieces, filename))
+
+        arrays = dict(cell_data, _coord=coord, _zcorn=zcorn, _actnum=actnum)
+        blocks = {}
+        try:
+            for name, array in arrays.items():
+                blocks[name] = cls._share(np.asarray(array))
+
+            specs = {name: (block.name, array.shape, array.dtype.str) for name, (block, array) in blocks.items()}
+            tasks = [(piece, specs, list(cell_data), [int(x) for x in cart_dims], int(bounds[i]), int(bounds[i+1]),
+                      slab_size) for i, piece in enumerate(pieces)]
+
+            with ProcessPoolExecutor(max_workers=n_pieces) as executor:
+                list(executor.map(_write_piece, tasks))
+        finally:
+            for block, _ in blocks.values():
+                block.close()
+                block.unlink()
+
+        cls.write_pvtu(filename, [os.path.relpath(x, misc.get_dirname(filename)) for x in pieces],
+                       list(cell_data), len(actnum) != 0)
+
+        return pieces
+
+    @classmethod
+    def write_pvtu(cls, filename, pieces, cell_data=(), ghosts=False):
+        r"""
+        Write the pvtu file that gathers the vtu pieces of a grid.
+
+        Parameters
+        ----------
+        filename : string
+            A string that holds the name (path) of the pvtu file.
+        pieces : list
+            A list of strings with the path of the vtu pieces, relative to the pvtu file.
+        cell_data : list
+            A list of strings with the names of the properties of the pieces.
+        ghosts : boolean, default is False.
+            If True, the pieces have a ghost array flagging the inactive cells.
+
+        """
+
+        # Names and paths are quoted, they may hold characters reserved by XML
+        tags = ['<PDataArray type="{}" Name={} NumberOfComponents="1"/>'.format(cls.TYPES[cls._get_dtype(x)], quoteattr(x))
+                for x in cell_data]
+        if ghosts:
+            tags.append('<PDataArray type="UInt8" Name="vtkGhostType" NumberOfComponents="1"/>')
+
+        with open(filename, 'w') as f:
+            f.write('<?xml version="1.0"?>\n'
+                    '<VTKFile type="PUnstructuredGrid" version="1.0" byte_order="LittleEndian" header_type="UInt64">\n'
+                    '  <PUnstructuredGrid GhostLevel="0">\n'
+                    '    <PPoints>\n'
+                    '      <PDataArray type="Float64" Name="Points" NumberOfComponents="3"/>\n'
+                    '    </PPoints>\n'
+                    '    <PCellData>\n')
+            f.writelines('      ' + x + '\n' for x in tags)
+            f.write('    </PCellData>\n')
+            f.writelines('    <Piece Source={}/>\n'.format(quoteattr(x)) for x in pieces)
+            f.write('  </PUnstructuredGrid>\n'
+                    '</VTKFile>\n')
+
+    @classmethod
+    def _share(cls, array):
+        r"""
+        Copy an array to a new block of shared memory.
+
+        Returns the block and the array mapping it.
+
+        """
+
+        block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+        shared[...] = array
+
+        return block, shared
+
+    @classmethod
+    def _get_dtype(cls, name):
+        r"""
+        Return the type of a cell array in the vtu file, uint8 for ACTNUM and float32 otherwise.
+
+        """
+
+        return np.dtype('u1') if name == 'ACTNUM' else np.dtype('<f4')
+
+    @classmethod
+    def _header(cls, n_points, n_cells, arrays):
+        r"""
+        Return the XML header of the vtu file, up to the start of the appended data.
+
+        Parameters
+        ----------
+        n_points : int
+            Number of points of the grid.
+        n_cells : int
+            Number of cells of the grid.
+        arrays : list
+            A list of tuples (name, dtype, size, number of components) in the order they are written.
+
+        """
+
+        # Names are quoted, they may hold characters reserved by XML
+        offset = 0
+        tags = []
+        for name, dtype, size, components in arrays:
+            tags.append('<DataArray type="{}" Name={} NumberOfComponents="{}" format="appended" offset="{}"/>'.format(
+                cls.TYPES[dtype], quoteattr(name), components, offset))
+            offset += 8 + size * dtype.itemsize
+
+        cell_data = ''.join('\n        ' + x for x in tags[4:])
+
+        return ('<?xml version="1.0"?>\n'
+                '<VTKFile type="UnstructuredGrid" version="1.0" byte_order="LittleEndian" header_type="UInt64">\n'
+                '  <UnstructuredGrid>\n'
+                '    <Piece NumberOfPoints="{}" NumberOfCells="{}">\n'
+                '      <Points>\n        {}\n      </Points>\n'
+                '      <Cells>\n        {}\n        {}\n        {}\n      </Cells>\n'
+                '      <CellData>{}\n      </CellData>\n'
+                '    </Piece>\n'
+                '  </UnstructuredGrid>\n'
+                '  <AppendedData encoding="raw">\n   _').format(n_points, n_cells, *tags[:4], cell_data)
+
+    @classmethod
+    def _write_size(cls, f, array):
+        r"""
+        Write the size in bytes of an array, the header of its block in the appended data.
+
+        """
+
+        _, dtype, size, _ = array
+        f.write(np.array(size * dtype.itemsize, dtype='<u8').tobytes())
+
+
+def _write_piece(task):
+    r"""
+    Write a vtu piece in a worker process, mapping the arrays of the grid from shared memory.
+
+    """
+
+    filename, specs, names, cart_dims, k_start, k_stop, slab_size = task
+
+    blocks = {name: shared_memory.SharedMemory(name=spec[0]) for name, spec in specs.items()}
+    try:
+        arrays = {name: np.ndarray(spec[1], dtype=spec[2], buffer=blocks[name].buf) for name, spec in specs.items()}
+        VTU.write_corner_point(filename, arrays['_coord'], arrays['_zcorn'], cart_dims,
+                               {name: arrays[name] for name in names}, arrays['_actnum'], k_start, k_stop, slab_size)
+        del arrays
+    finally:
+        for block in blocks.values():
+            block.close()
@@ -4,7 +4,7 @@ r"""
 
 ----
 
-This module contains functionality for exporting data to VTK
+This module contains functionality for reading ECLIPSE grids and exporting data to VTK
 
 ----
 
@@ -14,7 +14,19 @@ This module contains functionality for exporting data to VTK
 |      VTK       | The Visualization Toolkit (VTK) format defined by Kitware  |
 |                | and used by ParaView                                       |
 +----------------+------------------------------------------------------------+
+|      VTU       | Streaming writer of VTK XML Unstructured Grid files        |
++----------------+------------------------------------------------------------+
+|     GRDECL     | Schlumberger ECLIPSE grid input format (ASCII)             |
++----------------+------------------------------------------------------------+
+|      ECL       | Schlumberger ECLIPSE binary output (EGRID, INIT, UNRST)    |
++----------------+------------------------------------------------------------+
+|     Cache      | Memory-mapped on-disk cache of the parsed grid arrays      |
++----------------+------------------------------------------------------------+
 
 """
 
-from .VTK import VTK
\ No newline at end of file
+from .VTK import VTK
+from .VTU import VTU
+from .GRDECL import GRDECL
+from .ECL import ECL
+from .Cache import Cache
\ No newline at end of file
@@ -10,6 +10,7 @@ class Errors(Enum):
     PERMZ_ERROR = "PERMZ data size must be NX*NY*NZ"
     ACTNUM_ERROR = "ACTNUM data size must be NX*NY*NZ"
     SO_ERROR = "SO data size must be NX*NY*NZ"
+    NTG_ERROR = "NTG data size must be NX*NY*NZ"
     GRID_NOT_DEFINED_ERROR = "The grid is not defined!"
     CHECK_DIM_ERRROR = "GRDECL keyword {} found before dimension specification"
     LOAD_CELL_DATA_ERROR = "{} data size must be NX*NY*NZ"
@@ -18,4 +19,13 @@ class Errors(Enum):
     DY_ERROR = "DY data size must be NX*NY*NZ"
     DZ_ERROR = "DZ data size must be NX*NY*NZ"
     FILE_NOT_FOUND_ERROR = "Can't open the file {}"
-    EOF_ERROR = "EOF when reading a line"
\ No newline at end of file
+    EOF_ERROR = "EOF when reading a line"
+    STREAM_ERROR = "Streaming export is only available for corner-point grids"
+    ZSTD_ERROR = "The zstandard package is required to read the file {}"
+    PORE_VOLUME_ERROR = "PORO is required to compute the pore volume"
+    LOCATE_ERROR = "Point location is only available for corner-point grids"
+    SUBGRID_ERROR = "Sub-grid extraction is only available for corner-point grids"
+    SUBGRID_RANGE_ERROR = "The sub-grid has no cells, check the ranges and the mask"
+    LOD_ERROR = "Coarsened grids are only available for corner-point grids"
+    LOD_LEVEL_ERROR = "The level of detail must be an integer >= 1 or three block sizes >= 1"
+    CACHE_WRITE_ERROR = "Can't write the cache {} ({}), running without it"
\ No newline at end of file
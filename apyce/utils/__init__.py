@@ -13,10 +13,19 @@ This module contains helpers utilities.
 +================+============================================================+
 |      misc      | General helpers                                            |
 +----------------+------------------------------------------------------------+
+|    geometry    | Vectorized geometry of corner-point and cartesian grids    |
++----------------+------------------------------------------------------------+
+|    profiler    | Wall time, bytes, cells and peak RSS of each stage         |
++----------------+------------------------------------------------------------+
+|   upscaling    | Coarsening of corner-point grids for LOD previews          |
++----------------+------------------------------------------------------------+
 |   ``Errors``   | Enum with error messages                                   |
 +----------------+------------------------------------------------------------+
 
 """
 
 from .misc import *
+from . import geometry
+from . import profiler
+from . import upscaling
 from .Errors import Errors
\ No newline at end of file
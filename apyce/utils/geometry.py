@@ -0,0 +1,918 @@
+from apyce.utils import misc
+
+import numpy as np
+
+# Absolute tolerance used to detect collapsed pillars where the top
+# pillar point coincides with the bottom pillar point
+COINCIDENCE_TOLERANCE = 2.2204e-14
+
+# Nodes of the faces I-, I+, J-, J+, K-, K+ of a cell in ECLIPSE order, each loop turning counter-clockwise
+# seen from outside the cell in a right-handed system
+HEXAHEDRON_FACES = np.array([[0, 4, 6, 2], [1, 3, 7, 5], [0, 1, 5, 4], [2, 6, 7, 3], [0, 2, 3, 1], [4, 5, 7, 6]])
+
+# Number of points located at once, tolerance on the parametric coords of a point inside a cell and maximum
+# number of Newton iterations to find them
+LOCATE_CHUNK = 65536
+LOCATE_TOLERANCE = 1e-6
+LOCATE_ITERATIONS = 20
+
+# Number of cells whose geometry is computed at once, the temporaries of a chunk stay in the CPU cache
+GEOMETRY_CHUNK = 2048
+
+
+def get_pillars(coord, cart_dims):
+    r"""
+    Reshape the [COORD] keyword into a pillar array.
+
+    Parameters
+    ----------
+    coord : ndarray
+        A list of floating point numbers that represents the COORD keyword from Schlumberger Eclipse.
+    cart_dims : ndarray
+        Dimensions of the grid.
+
+    Notes
+    -----
+    In ECLIPSE, each pillar is specified by two triplets (xtop ytop ztop xbtm ybtm zbtm), ordered with
+        the I index running fastest. The returned array has shape (NY+1, NX+1, 2, 3).
+
+    """
+
+    nx, ny = int(cart_dims[0]), int(cart_dims[1])
+
+    return np.reshape(coord, (ny+1, nx+1, 2, 3))
+
+
+def get_zcorn(zcorn, cart_dims):
+    r"""
+    Reshape the [ZCORN] keyword into a (2*NZ, 2*NY, 2*NX) array.
+
+    Parameters
+    ----------
+    zcorn : ndarray
+        A list of floating point numbers that represents the ZCORN keyword from Schlumberger Eclipse.
+    cart_dims : ndarray
+        Dimensions of the grid.
+
+    """
+
+    nx, ny, nz = [int(x) for x in cart_dims[0:3]]
+
+    return np.reshape(zcorn, (2*nz, 2*ny, 2*nx))
+
+
+def corner_point_coords(coord, zcorn, cart_dims, k_start=0, k_stop=None, out=None):
+    r"""
+    Compute the XYZ coords of the eight nodes of every cell in a range of layers.
+
+    Parameters
+    ----------
+    coord : ndarray
+        A list of floating point numbers that represents the COORD keyword from Schlumberger Eclipse.
+    zcorn : ndarray
+        A list of floating point numbers that represents the ZCORN keyword from Schlumberger Eclipse.
+    cart_dims : ndarray
+        Dimensions of the grid.
+    k_start, k_stop : int
+        Range of layers [k_start, k_stop) to be computed, default is the whole grid.
+    out : ndarray, optional
+        Float array of shape (N, 8, 3) where the coords will be written.
+
+    Returns
+    -------
+    coords : ndarray
+        Array of shape (N, 8, 3) with the nodes of each cell in ECLIPSE order, cells ordered with I running
+        fastest, then J, then K.
+    n_collapsed : int
+        The number of cell nodes lying on a collapsed pillar.
+
+    Notes
+    -----
+    We assume that all pillars are straight lines so linear interpolation is sufficient.
+    As a special case we need to handle "collapsed" pillars of the form
+
+    x0 y0 z0   x0 y0 z0
+
+    where the top pillar point coincides with the bottom pillar point. (degenerated cell)
+    Following ECLIPSE, we assume that such pillars are really vertical...
+
+    In MRST:
+    ix    = abs(lines(:,6) - lines(:,3)) < abs(opt.CoincidenceTolerance);
+    t     = (grdecl.ZCORN(:) - lines(:,3)) ./ (lines(:,6) - lines(:,3));
+    t(ix) = 0;
+
+    xCoords = lines(:,1) + t.*(lines(:,4) - lines(:,1));
+    yCoords = lines(:,2) + t.*(lines(:,5) - lines(:,2));
+
+    In APyCE the same process is done for all the nodes of the layers at once, the pillar interpolation
+        is always performed in float64.
+
+    """
+
+    nx, ny, nz = [int(x) for x in cart_dims[0:3]]
+    k_stop = nz if k_stop is None else k_stop
+    n_layers = k_stop - k_start
+
+    pillars = get_pillars(coord, cart_dims)
+
+    # Zs of the layers as (layer, kk, j, jj, i, ii) -> (layer, j, i, kk, jj, ii)
+    zs = get_zcorn(zcorn, cart_dims)[2*k_start:2*k_stop]
+    zs = zs.reshape(n_layers, 2, ny, 2, nx, 2).transpose(0, 2, 4, 1, 3, 5)
+
+    if out is None:
+        out = np.empty((n_layers*ny*nx, 8, 3))
+    coords = out.reshape(n_layers, ny, nx, 2, 2, 2, 3)
+
+    n_collapsed = 0
+    for jj in range(2):
+        for ii in range(2):
+            # Pillar of the node (ii, jj) for every cell in the layer
+            top = np.asarray(pillars[jj:jj+ny, ii:ii+nx, 0], dtype=np.float64)
+            btm = np.asarray(pillars[jj:jj+ny, ii:ii+nx, 1], dtype=np.float64)
+
+            # degenerated cell condition
+            collapsed = np.abs(btm[..., 2] - top[..., 2]) < COINCIDENCE_TOLERANCE
+            n_collapsed += 2 * n_layers * int(np.count_nonzero(collapsed))
+            height = np.where(collapsed, 1.0, btm[..., 2] - top[..., 2])
+
+            z = np.asarray(zs[..., jj, ii], dtype=np.float64)
+            t = (z - top[None, :, :, None, 2]) / height[None, :, :, None]
+            t = np.where(collapsed[None, :, :, None], 0.0, t)
+
+            coords[:, :, :, :, jj, ii, 0] = top[None, :, :, None, 0] + t * (btm[None, :, :, None, 0] - top[None, :, :, None, 0])
+            coords[:, :, :, :, jj, ii, 1] = top[None, :, :, None, 1] + t * (btm[None, :, :, None, 1] - top[None, :, :, None, 1])
+            coords[:, :, :, :, jj, ii, 2] = z
+
+    return out, n_collapsed
+
+
+def active_corner_point_coords(coord, zcorn, cart_dims, active, dtype=np.float64):
+    r"""
+    Compute the XYZ coords of the eight nodes of the active cells only.
+
+    Parameters
+    ----------
+    coord : ndarray
+        A list of floating point numbers that represents the COORD keyword from Schlumberger Eclipse.
+    zcorn : ndarray
+        A list of floating point numbers that represents the ZCORN keyword from Schlumberger Eclipse.
+    cart_dims : ndarray
+        Dimensions of the grid.
+    active : ndarray
+        Sorted global indexes of the active cells.
+    dtype : data-type, default is float64.
+        The type of the coords, the interpolation is done in float64.
+
+    Returns
+    -------
+    coords : ndarray
+        Array of shape (len(active), 8, 3) with the nodes of each active cell in ECLIPSE order.
+    n_collapsed : int
+        The number of cell nodes lying on a collapsed pillar, over the whole grid.
+
+    Notes
+    -----
+    The coords are computed one layer at a time, so the memory used besides the output is bounded by
+        the size of a layer.
+
+    """
+
+    nx, ny, nz = [int(x) for x in cart_dims[0:3]]
+    layer = nx * ny
+
+    # Range of the active cells of each layer
+    bounds = np.searchsorted(active, np.arange(nz+1) * layer)
+
+    coords = np.empty((len(active), 8, 3), dtype=dtype)
+    n_collapsed = 0
+    for k in range(nz):
+        layer_coords, n = corner_point_coords(coord, zcorn, cart_dims, k, k+1)
+        coords[bounds[k]:bounds[k+1]] = layer_coords[active[bounds[k]:bounds[k+1]] - k*layer]
+        n_collapsed += n
+
+    return coords, n_collapsed
+
+
+def weld_points(coords, cart_dims, tolerance=0.0, cells=None):
+    r"""
+    Merge the coincident nodes of neighbouring cells into shared points.
+
+    Parameters
+    ----------
+    coords : ndarray
+        Array of shape (N, 8, 3) with the nodes of each cell in ECLIPSE order.
+    cart_dims : ndarray
+        Dimensions of the grid.
+    tolerance : float, default is 0.0.
+        Maximum difference between the depths of two nodes of the same pillar to be merged, 0 for exact equality.
+    cells : ndarray, optional
+        Global indexes of the N cells, default is all the cells of the grid.
+
+    Returns
+    -------
+    points : ndarray
+        Array of shape (M, 3) with the XYZ coords of the shared points.
+    connectivity : ndarray
+        Integer array of shape (N, 8) with the point ids of each cell in ECLIPSE order.
+
+    Notes
+    -----
+    Each node lies on a pillar, given by the (I, J) of the cell and the (ii, jj) of the node, and its X and Y
+        only depend on its depth along the pillar. So two nodes are coincident if they are on the same pillar
+        at the same depth, and the nodes are merged by sorting the (pillar, z) keys at once.
+
+    The nodes of the cells on each side of a fault are on the same pillar but at different depths, so they
+        are kept apart. With a tolerance, nodes are merged while consecutive depths along a pillar differ by
+        no more than the tolerance.
+
+    """
+
+    nx, ny = [int(x) for x in cart_dims[0:2]]
+    n_cells = coords.shape[0]
+
+    cells = np.arange(n_cells) if cells is None else np.asarray(cells)
+    i = cells % nx
+    j = (cells // nx) % ny
+
+    # Pillar of each node, nodes in ECLIPSE order: ii runs fastest, then jj, then kk
+    ii = np.array([0, 1, 0, 1, 0, 1, 0, 1])
+    jj = np.array([0, 0, 1, 1, 0, 0, 1, 1])
+    pillar = ((j[:, None] + jj) * (nx + 1) + i[:, None] + ii).ravel()
+
+    z = coords[..., 2].ravel()
+    if len(z) == 0:
+        return coords.reshape(-1, 3), np.empty((0, 8), dtype=np.int64)
+
+    order = np.lexsort((z, pillar))
+    pillar, z = pillar[order], z[order]
+
+    # A new point starts when the pillar changes or the depth moves away from the previous node
+    new = np.empty(len(order), dtype=bool)
+    new[0] = True
+    new[1:] = (pillar[1:] != pillar[:-1]) | (np.diff(z) > tolerance)
+
+    point_ids = np.empty(len(order), dtype=np.int64)
+    point_ids[order] = np.cumsum(new) - 1
+
+    points = coords.reshape(-1, 3)[order[new]]
+
+    return points, point_ids.reshape(n_cells, 8)
+
+
+def hexahedron_geometry(coords):
+    r"""
+    Compute the bulk volume, centroid, face areas and face normals of hexahedral cells.
+
+    Parameters
+    ----------
+    coords : ndarray
+        Array of shape (N, 8, 3) with the nodes of each cell in ECLIPSE order.
+
+    Returns
+    -------
+    volume : ndarray
+        Array of shape (N,) with the bulk volume of each cell.
+    centroid : ndarray
+        Array of shape (N, 3) with the centre of mass of each cell.
+    face_areas : ndarray
+        Array of shape (N, 6) with the area of the faces I-, I+, J-, J+, K-, K+ of each cell.
+    face_normals : ndarray
+        Array of shape (N, 6, 3) with the outward unit normal of each face, zero for a collapsed face.
+
+    Notes
+    -----
+    The faces of a corner-point cell are not planar, each one is split into four triangles around its centre
+        and the cell into the 24 tetrahedra joining these triangles to the mean of the nodes. The volume and
+        centroid are then exact for this triangulation, whatever the handedness of the coordinates (depth
+        pointing down), and the cells with collapsed pillars give zero area faces instead of NaNs.
+
+    """
+
+    coords = np.asarray(coords)
+    n_cells = coords.shape[0]
+
+    volume = np.empty(n_cells)
+    centroid = np.empty((n_cells, 3))
+    face_areas = np.empty((n_cells, 6))
+    face_normals = np.empty((n_cells, 6, 3))
+
+    for start in range(0, n_cells, GEOMETRY_CHUNK):
+        cells = slice(start, start + GEOMETRY_CHUNK)
+        volume[cells], centroid[cells], face_areas[cells], face_normals[cells] = _hexahedron_geometry(coords[cells])
+
+    return volume, centroid, face_areas, face_normals
+
+
+def hexahedron_volume(coords):
+    r"""
+    Compute the bulk volume of hexahedral cells, as in hexahedron_geometry() without the other arrays.
+
+    Parameters
+    ----------
+    coords : ndarray
+        Array of shape (N, 8, 3) with the nodes of each cell in ECLIPSE order.
+
+    Returns
+    -------
+    volume : ndarray
+        Array of shape (N,) with the bulk volume of each cell.
+
+    """
+
+    coords = np.asarray(coords)
+    volume = np.empty(coords.shape[0])
+
+    for start in range(0, coords.shape[0], GEOMETRY_CHUNK):
+        cells = slice(start, start + GEOMETRY_CHUNK)
+        volume[cells] = np.abs(_hexahedron_tetrahedra(coords[cells])[4].sum(axis=(0, 1)))
+
+    return volume
+
+
+def _hexahedron_tetrahedra(coords):
+    r"""
+    Split a chunk of hexahedral cells into the 24 tetrahedra of hexahedron_geometry().
+
+    Returns
+    -------
+    centre : ndarray
+        Array of shape (3, N) with the mean of the nodes of each cell.
+    nodes, face_centre : ndarray
+        Arrays of shape (3, 6, 4, N) and (3, 6, N) with the nodes and the centre of each face, from the centre.
+    triangles : ndarray
+        Array of shape (3, 6, 4, N) with the area vectors of the triangles (face centre, node, next node).
+    tetrahedra : ndarray
+        Array of shape (6, 4, N) with the signed volumes of the tetrahedra (centre, face centre, node, next node).
+
+    Notes
+    -----
+    The nodes are stored as (X / Y / Z, face, node, cell) so every operation runs over contiguous rows of cells.
+
+    """
+
+    xyz = np.ascontiguousarray(np.asarray(coords, dtype=np.float64).transpose(2, 1, 0))  # (3, 8, N)
+    centre = xyz.mean(axis=1)
+
+    nodes = xyz[:, HEXAHEDRON_FACES] - centre[:, None, None, :]  # (3, 6, 4, N)
+    face_centre = nodes.mean(axis=2)
+
+    a = nodes - face_centre[:, :, None, :]
+    b = a[:, :, [1, 2, 3, 0]]
+    triangles = 0.5 * np.stack([a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]])
+
+    tetrahedra = np.sum(face_centre[:, :, None, :] * triangles, axis=0) / 3.0
+
+    return centre, nodes, face_centre, triangles, tetrahedra
+
+
+def _hexahedron_geometry(coords):
+    r"""
+    Compute the geometry of hexahedral cells as in hexahedron_geometry(), on a chunk of cells.
+
+    """
+
+    centre, nodes, face_centre, triangles, tetrahedra = _hexahedron_tetrahedra(coords)
+    signed_volume = tetrahedra.sum(axis=(0, 1))
+
+    # Centroid of the tetrahedra weighted by their volume
+    moments = np.sum((face_centre[:, :, None, :] + nodes + nodes[:, :, [1, 2, 3, 0]]) / 4.0 * tetrahedra, axis=(1, 2))
+    shift = np.zeros_like(centre)
+    np.divide(moments, signed_volume, out=shift, where=signed_volume != 0)
+
+    face_areas = np.sqrt(np.sum(triangles ** 2, axis=0)).sum(axis=1)
+
+    # The faces are oriented outward for a right-handed system, flipped for a left-handed one
+    area_vectors = triangles.sum(axis=2) * np.where(signed_volume < 0, -1.0, 1.0)
+    norms = np.sqrt(np.sum(area_vectors ** 2, axis=0))
+    face_normals = np.zeros_like(area_vectors)
+    np.divide(area_vectors, norms, out=face_normals, where=norms > 0)
+
+    return np.abs(signed_volume), (centre + shift).T, face_areas.T, face_normals.transpose(2, 1, 0)
+
+
+def block_centred_coords(dx, dy, dz, tops, cart_dims):
+    r"""
+    Compute the XYZ coords of the nodes of a cartesian (block-centred) grid.
+
+    Parameters
+    ----------
+    dx, dy, dz : ndarray
+        A list of floating point numbers that represents the DX, DY and DZ keywords from Schlumberger Eclipse.
+    tops : ndarray
+        A list of floating point numbers that represents the TOPS keyword from Schlumberger Eclipse.
+    cart_dims : ndarray
+        Dimensions of the grid.
+
+    Returns
+    -------
+    coords : ndarray
+        Array of shape (2*NX*2*NY*2*NZ, 3) with the nodes of the grid, ordered with the
+            2*NX index running fastest, then 2*NY, then 2*NZ.
+
+    Notes
+    -----
+    Each cell owns its eight nodes, so the node 2*I is the low face of the cell I and the node 2*I+1 is
+        the high face. The faces are the cumulative sums of DX (DY) along each row of cells and the
+        cumulative sum of DZ below TOPS along each column of cells.
+
+    """
+
+    nx, ny, nz = [int(x) for x in cart_dims[0:3]]
+
+    dx = np.reshape(dx, (nz, ny, nx))
+    dy = np.reshape(dy, (nz, ny, nx))
+    dz = np.reshape(dz, (nz, ny, nx))
+    tops = np.reshape(tops, (1, ny, nx))
+
+    # Faces of the cells along each direction
+    x_faces = np.cumsum(np.concatenate([np.zeros((nz, ny, 1)), dx], axis=2), axis=2)
+    y_faces = np.cumsum(np.concatenate([np.zeros((nz, 1, nx)), dy], axis=1), axis=1)
+    z_faces = np.cumsum(np.concatenate([tops, dz], axis=0), axis=0)
+
+    # Low and high faces of each cell -> nodes as (K, kk, J, jj, I, ii)
+    x = np.stack([x_faces[:, :, :-1], x_faces[:, :, 1:]], axis=-1)[:, None, :, None, :, :]
+    y = np.stack([y_faces[:, :-1, :], y_faces[:, 1:, :]], axis=-2)[:, None, :, :, :, None]
+    z = np.stack([z_faces[:-1], z_faces[1:]], axis=1)[:, :, :, None, :, None]
+
+    shape = (nz, 2, ny, 2, nx, 2)
+    coords = np.empty(shape + (3,))
+    coords[..., 0] = np.broadcast_to(x, shape)
+    coords[..., 1] = np.broadcast_to(y, shape)
+    coords[..., 2] = np.broadcast_to(z, shape)
+
+    return coords.reshape(-1, 3)
+
+
+def block_centred_connectivity(cart_dims):
+    r"""
+    Get the point ids of the eight nodes of each cell of a cartesian (block-centred) grid.
+
+    Parameters
+    ----------
+    cart_dims : ndarray
+        Dimensions of the grid.
+
+    Returns
+    -------
+    connectivity : ndarray
+        Integer array of shape (N, 8) with the point ids of each cell in ECLIPSE order.
+
+    """
+
+    nx, ny, nz = [int(x) for x in cart_dims[0:3]]
+
+    k, j, i = [x.ravel() for x in np.meshgrid(np.arange(nz), np.arange(ny), np.arange(nx), indexing='ij')]
+
+    return np.stack([misc.get_ijk(2*i+ii, 2*j+jj, 2*k+kk, 2*nx, 2*ny, 2*nz)
+                     for kk in range(2) for jj in range(2) for ii in range(2)], axis=1)
+
+
+def face_connections(zcorn, cart_dims, actnum=None):
+    r"""
+    Find the pairs of cells sharing a face, including the partial overlaps across faults.
+
+    Parameters
+    ----------
+    zcorn : ndarray
+        A list of floating point numbers that represents the ZCORN keyword from Schlumberger Eclipse.
+    cart_dims : ndarray
+        Dimensions of the grid.
+    actnum : ndarray, optional
+        A list of integer (0 or 1) numbers, the connections of the inactive cells are dropped.
+
+    Returns
+    -------
+    connections : dict
+        Arrays of the same length, one item per connection, ordered I faces first, then J, then K:
+            'cell1', 'cell2' : global indexes of the two cells, cell1 is on the low side of the face.
+            'direction' : 0, 1 or 2 for a face normal to I, J or K.
+            'fault' : True if the depths of the two faces differ on the shared pillars.
+            'nnc' : True for a non-neighbour connection, the two cells are not neighbours in (I, J, K).
+            'overlap' : mean length of the overlap of the two faces along the two shared pillars
+                (the thickness of the face without fault), 0 for the K faces.
+
+    Notes
+    -----
+    Across the I and J faces, each cell of a column may touch any cell of the neighbouring column. The depth
+        range of the cells of each column is made monotonic, which only widens it, so the candidates of all
+        the columns are found at once by a binary search, in O(N log N), then checked exactly on each of the
+        two shared pillars. Two faces are connected if they overlap on at least one pillar, so the faces
+        crossing between the pillars are kept.
+
+    The K connections are the cells above each other in a column, without checking for gaps.
+
+    """
+
+    nx, ny, nz = [int(x) for x in cart_dims[0:3]]
+
+    # Depth of each node as (K, kk, J, jj, I, ii)
+    z = get_zcorn(zcorn, cart_dims).reshape(nz, 2, ny, 2, nx, 2)
+    cells = np.arange(nx * ny * nz).reshape(nz, ny, nx)
+
+    # Faces as (column pair, K, kk, shared pillar) with the cells of the low and high sides
+    faces = [
+        (0, z[:, :, :, :, :-1, 1].transpose(2, 4, 0, 1, 3), z[:, :, :, :, 1:, 0].transpose(2, 4, 0, 1, 3),
+         cells[:, :, :-1].transpose(1, 2, 0), cells[:, :, 1:].transpose(1, 2, 0)),
+        (1, z[:, :, :-1, 1, :, :].transpose(2, 3, 0, 1, 4), z[:, :, 1:, 0, :, :].transpose(2, 3, 0, 1, 4),
+         cells[:, :-1, :].transpose(1, 2, 0), cells[:, 1:, :].transpose(1, 2, 0))
+    ]
+
+    connections = []
+    for direction, low, high, low_cells, high_cells in faces:
+        connections.append(_lateral_connections(direction, np.ascontiguousarray(low).reshape(-1, nz, 4),
+                                                np.ascontiguousarray(high).reshape(-1, nz, 4),
+                                                low_cells.reshape(-1, nz), high_cells.reshape(-1, nz)))
+
+    n_vertical = nx * ny * (nz - 1)
+    connections.append({
+        'cell1': cells[:-1].ravel(),
+        'cell2': cells[1:].ravel(),
+        'direction': np.full(n_vertical, 2, dtype=np.uint8),
+        'fault': np.zeros(n_vertical, dtype=bool),
+        'nnc': np.zeros(n_vertical, dtype=bool),
+        'overlap': np.zeros(n_vertical)
+    })
+
+    connections = {name: np.concatenate([x[name] for x in connections]) for name in connections[0]}
+
+    if actnum is not None and len(actnum) != 0:
+        active = np.asarray(actnum).ravel() != 0
+        keep = active[connections['cell1']] & active[connections['cell2']]
+        connections = {name: array[keep] for name, array in connections.items()}
+
+    return connections
+
+
+def _lateral_connections(direction, low, high, low_cells, high_cells):
+    r"""
+    Match the faces of the cells of pairs of neighbouring columns.
+
+    Parameters
+    ----------
+    direction : int
+        0 or 1 for the I or J faces.
+    low, high : ndarray
+        Arrays of shape (C, NZ, 4) with the depths of the faces of the low and high columns of each pair,
+            as (pair, K, [top of the first pillar, top of the second pillar, bottom of the first, bottom of
+            the second]).
+    low_cells, high_cells : ndarray
+        Arrays of shape (C, NZ) with the global indexes of the cells.
+
+    Returns the connections as in face_connections().
+
+    """
+
+    n_pairs, nz = low_cells.shape
+    if n_pairs == 0:
+        return {'cell1': np.empty(0, dtype=np.int64), 'cell2': np.empty(0, dtype=np.int64),
+                'direction': np.empty(0, dtype=np.uint8), 'fault': np.empty(0, dtype=bool),
+                'nnc': np.empty(0, dtype=bool), 'overlap': np.empty(0)}
+
+    # Shift each pair by more than the depth range so the search runs on all the pairs at once
+    z_min = min(low.min(), high.min())
+    span = max(low.max(), high.max()) - z_min + 1.0
+    shift = np.arange(n_pairs)[:, None] * span - z_min
+
+    pairs = []
+    for pillar in range(2):
+        # Depth range of each face on the pillar, the range of the high columns is made monotonic along K
+        low_top = np.minimum(low[..., pillar], low[..., 2+pillar]) + shift
+        low_btm = np.maximum(low[..., pillar], low[..., 2+pillar]) + shift
+        high_top = np.minimum.accumulate(np.minimum(high[..., pillar], high[..., 2+pillar])[:, ::-1], axis=1)[:, ::-1]
+        high_btm = np.maximum.accumulate(np.maximum(high[..., pillar], high[..., 2+pillar]), axis=1)
+
+        # Cells of the high column overlapping each cell of the low column: high_btm > low_top and high_top < low_btm
+        start = np.searchsorted((high_btm + shift).ravel(), low_top.ravel(), side='right')
+        stop = np.searchsorted((high_top + shift).ravel(), low_btm.ravel(), side='left')
+        count = np.maximum(stop - start, 0)
+
+        pairs.append((np.repeat(np.arange(n_pairs * nz), count),
+                      np.repeat(start, count) + np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)))
+
+    first, second = [np.concatenate(x) for x in zip(*pairs)]
+    from_first_pillar = np.arange(len(first)) < len(pairs[0][0])
+
+    low, high = low.reshape(-1, 4)[first], high.reshape(-1, 4)[second]
+
+    # Overlap along each shared pillar, the pairs found on both pillars are kept once
+    overlap = np.minimum(low[:, 2:], high[:, 2:]) - np.maximum(low[:, :2], high[:, :2])
+    keep = np.where(from_first_pillar, overlap[:, 0] > 0, (overlap[:, 1] > 0) & (overlap[:, 0] <= 0))
+
+    first, second, low, high = first[keep], second[keep], low[keep], high[keep]
+    overlap = np.clip(overlap[keep], 0, None).mean(axis=1)
+
+    # Pairs of the I (J) columns in order, then K of the low and of the high cell
+    order = np.lexsort((second, first))
+    first, second, low, high, overlap = first[order], second[order], low[order], high[order], overlap[order]
+
+    return {
+        'cell1': low_cells.ravel()[first],
+        'cell2': high_cells.ravel()[second],
+        'direction': np.full(len(first), direction, dtype=np.uint8),
+        'fault': np.any(low != high, axis=1),
+        'nnc': first % nz != second % nz,
+        'overlap': overlap
+    }
+
+
+def column_index(coord, zcorn, cart_dims):
+    r"""
+    Build a bin index of the columns of cells of a corner-point grid over the XY plane.
+
+    Parameters
+    ----------
+    coord : ndarray
+        A list of floating point numbers that represents the COORD keyword from Schlumberger Eclipse.
+    zcorn : ndarray
+        A list of floating point numbers that represents the ZCORN keyword from Schlumberger Eclipse.
+    cart_dims : ndarray
+        Dimensions of the grid.
+
+    Returns
+    -------
+    index : dict
+        'origin' : (X, Y) of the low corner of the bins.
+        'size' : (DX, DY) of the bins.
+        'shape' : number of bins (NBX, NBY).
+        'offsets' : array of size NBX*NBY+1, the columns of the bin b are columns[offsets[b]:offsets[b+1]].
+        'columns' : the column (J*NX + I) of each item of the bins.
+        'pillars' : the pillars of COORD in float64, shape ((NX+1)*(NY+1), 2, 3).
+
+    Notes
+    -----
+    The XY extent of a column is the box of its four pillars between the lowest and the highest depth of its
+        cells, so a point is only tested against the columns whose box holds it. There are about as many bins
+        as columns.
+
+    """
+
+    nx, ny = [int(x) for x in cart_dims[0:2]]
+
+    # Depth range of each column of cells
+    zs = get_zcorn(zcorn, cart_dims).reshape(-1, ny, 2, nx, 2)
+    z_range = [zs.min(axis=(0, 2, 4)), zs.max(axis=(0, 2, 4))]
+
+    # XY of the four pillars of each column at the top and the bottom of the column
+    xy = np.stack([_pillar_xy(coord, cart_dims, z, ii, jj) for z in z_range for jj in range(2) for ii in range(2)])
+    low, high = xy.min(axis=0).reshape(-1, 2), xy.max(axis=0).reshape(-1, 2)
+
+    origin = low.min(axis=0)
+    shape = np.array([nx, ny])
+    size = np.maximum((high.max(axis=0) - origin) / shape, np.finfo(float).tiny)
+
+    # Range of bins covered by each column
+    first = np.clip(((low - origin) // size).astype(np.int64), 0, shape - 1)
+    last = np.clip(((high - origin) // size).astype(np.int64), 0, shape - 1)
+    extent = last - first + 1
+    count = extent[:, 0] * extent[:, 1]
+
+    columns = np.repeat(np.arange(nx * ny), count)
+    rank = _ranks(count)
+    bx = first[columns, 0] + rank % extent[columns, 0]
+    by = first[columns, 1] + rank // extent[columns, 0]
+    bins = by * shape[0] + bx
+
+    order = np.argsort(bins, kind='stable')
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(bins, minlength=nx * ny))])
+
+    return {'origin': origin, 'size': size, 'shape': shape, 'offsets': offsets, 'columns': columns[order],
+            'pillars': np.asarray(coord, dtype=np.float64).reshape(-1, 2, 3)}
+
+
+def locate_points(points, coord, zcorn, cart_dims, index):
+    r"""
+    Find the cell holding each point of a corner-point grid.
+
+    Parameters
+    ----------
+    points : ndarray
+        Array of shape (P, 3) with the XYZ of the points, Z being the depth as in ZCORN.
+    coord : ndarray
+        A list of floating point numbers that represents the COORD keyword from Schlumberger Eclipse.
+    zcorn : ndarray
+        A list of floating point numbers that represents the ZCORN keyword from Schlumberger Eclipse.
+    cart_dims : ndarray
+        Dimensions of the grid.
+    index : dict
+        The bin index of the columns, see column_index().
+
+    Returns
+    -------
+    ijk : ndarray
+        Integer array of shape (P, 3) with the (I, J, K) of the cell holding each point, -1 outside the grid.
+
+    Notes
+    -----
+    The candidate layers of a column are the ones whose depth range holds the point, the first one being found
+        by a binary search on the deepest bottoms of the layers, assumed to be sorted along K as in any valid
+        corner-point grid. Collapsed layers give several candidates. The columns whose pillars are too far
+        from the point are dropped, then the point is tested against each candidate cell as a trilinear
+        hexahedron. A point on a face shared by several cells gets the one of lowest index.
+
+    The points are processed in chunks of LOCATE_CHUNK, each step being vectorized over the chunk.
+
+    """
+
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    ijk = np.full((len(points), 3), -1, dtype=np.int64)
+
+    for start in range(0, len(points), LOCATE_CHUNK):
+        ijk[start:start+LOCATE_CHUNK] = _locate_points(points[start:start+LOCATE_CHUNK], coord, zcorn, cart_dims, index)
+
+    return ijk
+
+
+def _locate_points(points, coord, zcorn, cart_dims, index):
+    r"""
+    Find the cell holding each point of a chunk, see locate_points().
+
+    """
+
+    nx, ny, nz = [int(x) for x in cart_dims[0:3]]
+    ijk = np.full((len(points), 3), -1, dtype=np.int64)
+
+    # Bin of each point, the points outside all the bins have no candidate
+    point_bin = np.floor((points[:, 0:2] - index['origin']) / index['size']).astype(np.int64)
+    inside = np.all((point_bin >= 0) & (point_bin < index['shape']), axis=1)
+    bins = np.where(inside, point_bin[:, 1] * index['shape'][0] + point_bin[:, 0], 0)
+    count = np.where(inside, index['offsets'][bins+1] - index['offsets'][bins], 0)
+
+    # Candidate (point, column) pairs
+    point = np.repeat(np.arange(len(points)), count)
+    column = index['columns'][index['offsets'][bins[point]] + _ranks(count)]
+    i, j, z = column % nx, column // nx, points[point, 2]
+
+    # ZCORN index of the four corners of the cells of the column in layer 0
+    zs = np.asarray(zcorn).ravel()
+    corner = np.stack([(2*j + jj) * 2*nx + 2*i + ii for jj in range(2) for ii in range(2)], axis=1)
+    layer = 4 * nx * ny
+
+    def depth(rows, k, kk, reduce):
+        # Shallowest top (kk = 0) or deepest bottom (kk = 1) of the layer k
+        return reduce(zs[corner[rows] + (2*k + kk)[:, None] * layer], axis=1)
+
+    # First layer whose deepest bottom is not above the point
+    low, high = np.zeros(len(point), dtype=np.int64), np.full(len(point), nz, dtype=np.int64)
+    while np.any(low < high):
+        searching = np.flatnonzero(low < high)
+        middle = (low[searching] + high[searching]) // 2
+        below = depth(searching, middle, 1, np.max) >= z[searching]
+        high[searching[below]] = middle[below]
+        low[searching[~below]] = middle[~below] + 1
+
+    # Next layers whose shallowest top is above the point, several ones around collapsed layers
+    count = np.zeros(len(point), dtype=np.int64)
+    scanning = np.flatnonzero(low < nz)
+    while len(scanning):
+        above = depth(scanning, low[scanning] + count[scanning], 0, np.min) <= z[scanning]
+        count[scanning[above]] += 1
+        scanning = scanning[above]
+        scanning = scanning[low[scanning] + count[scanning] < nz]
+
+    # The nodes of the candidate cells lie on the four pillars between the top of the first one and the bottom
+    # of the last one, so the cells are inside the box of the pillars at the point widened by their slope
+    rows = np.flatnonzero(count)
+    top, btm = depth(rows, low[rows], 0, np.min), depth(rows, low[rows] + count[rows] - 1, 1, np.max)
+    pillars = [index['pillars'][(j[rows]+jj) * (nx+1) + i[rows] + ii] for jj in range(2) for ii in range(2)]
+    xy = np.stack([_interpolate_pillars(x, z[rows]) for x in pillars])
+    margin = (btm - top) * np.max([_pillar_slope(x) for x in pillars], axis=0)
+    near = np.all((points[point[rows], 0:2] >= xy.min(axis=0) - margin[:, None]) &
+                  (points[point[rows], 0:2] <= xy.max(axis=0) + margin[:, None]), axis=1)
+    count[rows[~near]] = 0
+
+    rows = np.repeat(np.arange(len(point)), count)
+    point, i, j, k = point[rows], i[rows], j[rows], low[rows] + _ranks(count)
+
+    # Test the point against each candidate cell
+    found = _inside_hexahedra(points[point], _cell_nodes(index['pillars'], zs, (nx, ny), i, j, k))
+    point, i, j, k = point[found], i[found], j[found], k[found]
+
+    # Cell of lowest index found for each point
+    order = np.lexsort([(k * ny + j) * nx + i, point])
+    point, first = np.unique(point[order], return_index=True)
+    ijk[point] = np.stack([i[order][first], j[order][first], k[order][first]], axis=1)
+
+    return ijk
+
+
+def _ranks(count):
+    r"""
+    Return the rank of each item in its group, for groups of count items laid one after the other.
+
+    """
+
+    return np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+
+
+def _cell_nodes(pillars, zs, dims, i, j, k):
+    r"""
+    Return the XYZ of the eight nodes of the cells (I, J, K) in ECLIPSE order, shape (N, 8, 3).
+
+    """
+
+    nx, ny = dims
+    nodes = np.empty((len(i), 8, 3))
+
+    for kk in range(2):
+        for jj in range(2):
+            for ii in range(2):
+                n = 4*kk + 2*jj + ii
+                nodes[:, n, 2] = zs[(2*k + kk) * 4*nx*ny + (2*j + jj) * 2*nx + 2*i + ii]
+                nodes[:, n, 0:2] = _interpolate_pillars(pillars[(j+jj) * (nx+1) + i + ii], nodes[:, n, 2])
+
+    return nodes
+
+
+def _inside_hexahedra(points, nodes):
+    r"""
+    Check if each point lies inside its hexahedron, nodes of shape (N, 8, 3) in ECLIPSE order.
+
+    Notes
+    -----
+    The parametric coords of the point in the trilinear hexahedron are found by Newton iterations as in
+        vtkHexahedron, the point is inside if they converge within [0, 1] up to LOCATE_TOLERANCE. Degenerate
+        cells hold no point.
+
+    """
+
+    inside = np.zeros(len(points), dtype=bool)
+
+    # Only the points inside the box of their cell are iterated
+    low, high = nodes.min(axis=1), nodes.max(axis=1)
+    margin = LOCATE_TOLERANCE * np.max(high - low, axis=1, keepdims=True)
+    rows = np.flatnonzero(np.all((points >= low - margin) & (points <= high + margin), axis=1))
+
+    # x(r, s, t) = a + b r + c s + d t + e rs + f rt + g st + h rst
+    n = nodes[rows].transpose(1, 0, 2)
+    a, b, c, d = n[0], n[1] - n[0], n[2] - n[0], n[4] - n[0]
+    e, f, g = n[3] - n[2] - n[1] + n[0], n[5] - n[4] - n[1] + n[0], n[6] - n[4] - n[2] + n[0]
+    h = n[7] - n[6] - n[5] - n[3] + n[4] + n[2] + n[1] - n[0]
+    size = np.max(high[rows] - low[rows], axis=1)
+
+    pcoords = np.full((len(rows), 3), 0.5)
+    active = np.arange(len(rows))
+
+    for _ in range(LOCATE_ITERATIONS):
+        r, s, t = [pcoords[active, axis:axis+1] for axis in range(3)]
+        a_, b_, c_, d_, e_, f_, g_, h_ = [x[active] for x in (a, b, c, d, e, f, g, h)]
+        residual = a_ + b_*r + c_*s + d_*t + e_*r*s + f_*r*t + g_*s*t + h_*r*s*t - points[rows[active]]
+        dr, ds, dt = b_ + e_*s + f_*t + h_*s*t, c_ + e_*r + g_*t + h_*r*t, d_ + f_*r + g_*s + h_*r*s
+
+        # Rows of the inverse Jacobian from the cross products of its columns
+        cross = [np.cross(ds, dt), np.cross(dt, dr), np.cross(dr, ds)]
+        determinant = np.sum(dr * cross[0], axis=1)
+        valid = np.abs(determinant) > 1e-12 * size[active] ** 3
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = np.stack([np.sum(residual * x, axis=1) for x in cross], axis=1) / determinant[:, None]
+
+        pcoords[active] -= np.where(valid[:, None], step, 0.0)
+        converged = valid & (np.max(np.abs(step), axis=1) < 1e-10)
+        inside[rows[active[converged]]] = True
+        active = active[valid & ~converged]
+        if len(active) == 0:
+            break
+
+    inside[rows] &= np.all((pcoords >= -LOCATE_TOLERANCE) & (pcoords <= 1 + LOCATE_TOLERANCE), axis=1)
+
+    return inside
+
+
+def _pillar_xy(coord, cart_dims, z, ii, jj):
+    r"""
+    Return the XY of the pillars (I+ii, J+jj) of every column (I, J) at the depth z, shape (NY, NX, 2).
+
+    """
+
+    nx, ny = [int(x) for x in cart_dims[0:2]]
+    pillars = np.asarray(get_pillars(coord, cart_dims)[jj:jj+ny, ii:ii+nx], dtype=np.float64)
+
+    return _interpolate_pillars(pillars, z)
+
+
+def _pillar_slope(pillars):
+    r"""
+    Return the horizontal shift per unit of depth of pillars, array of shape (..., 2, 3), 0 if collapsed.
+
+    """
+
+    top, btm = pillars[..., 0, :], pillars[..., 1, :]
+    collapsed = np.abs(btm[..., 2] - top[..., 2]) < COINCIDENCE_TOLERANCE
+
+    return np.where(collapsed, 0.0, np.hypot(*(btm[..., 0:2] - top[..., 0:2]).T) /
+                    np.where(collapsed, 1.0, np.abs(btm[..., 2] - top[..., 2])))
+
+
+def _interpolate_pillars(pillars, z):
+    r"""
+    Return the XY of pillars, array of shape (..., 2, 3) with their top and bottom, at the depth z.
+
+    """
+
+    top, btm = pillars[..., 0, :], pillars[..., 1, :]
+
+    # Collapsed pillars keep the XY of their top
+    collapsed = np.abs(btm[..., 2] - top[..., 2]) < COINCIDENCE_TOLERANCE
+    t = np.where(collapsed, 0.0, (z - top[..., 2]) / np.where(collapsed, 1.0, btm[..., 2] - top[..., 2]))
+
+    return top[..., 0:2] + t[..., None] * (btm[..., 0:2] - top[..., 0:2])
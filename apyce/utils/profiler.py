@@ -0,0 +1,215 @@
+r"""
+Instrumentation of the stages of the APyCE pipeline.
+
+Each stage (read of a file, parse of a keyword, build of the points / cells, attach of the properties and
+    write of the output) emits an event with its wall time, the bytes read or written, the cells processed
+    and the peak RSS of the process. The events are kept for the summary of Profiler.report(), logged on
+    the 'apyce.utils.profiler' logger at DEBUG level and passed to the callbacks.
+
+"""
+
+from contextlib import contextmanager
+import logging
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Stages of the pipeline, in order
+STAGES = ['file read', 'keyword parse', 'point build', 'cell build', 'topology build', 'geometry build', 'lod build',
+          'property attach', 'write']
+
+
+def get_peak_rss():
+    r"""
+    Get the peak resident set size (bytes) of the process since it started, None if not available.
+
+    """
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Profiler:
+    r"""
+    Collect the events of the stages of the pipeline.
+
+    Parameters
+    ----------
+    callback : callable, optional
+        A function called with each event, e.g. to feed a metrics system.
+
+    Notes
+    -----
+    An event is a dict with the keys:
+        'stage' : one of STAGES.
+        'name' : what the stage worked on e.g. the keyword or the file.
+        'wall_time' : the wall time of the stage in seconds.
+        'bytes' : the bytes read (or written for 'write').
+        'cells' : the number of cells processed, or of values parsed for 'keyword parse'.
+        'peak_rss' : the peak RSS of the process at the end of the stage in bytes (a high-water mark,
+            so it never decreases).
+
+    Events may be emitted from the threads reading the files, the callbacks must be thread-safe.
+
+    Examples
+    --------
+    >>> P = Profiler(callback=print)
+    >>> with P.stage('keyword parse', 'PORO', cells=1600) as event:
+    ...     event['bytes'] = 12800
+    >>> print(P.report())
+
+    """
+
+    def __init__(self, callback=None):
+        self._events = []
+        self._callbacks = [] if callback is None else [callback]
+        self._lock = threading.Lock()
+
+    def add_callback(self, callback):
+        r"""
+        Add a function called with each event.
+
+        Parameters
+        ----------
+        callback : callable
+            The function, called with the event dict.
+
+        """
+
+        self._callbacks.append(callback)
+
+    def callbacks(self):
+        r"""
+        Return a copy of the list of the functions called with each event, e.g. to pass them to another Profiler.
+
+        """
+
+        return list(self._callbacks)
+
+    @contextmanager
+    def stage(self, stage, name='', bytes=0, cells=0):
+        r"""
+        Time a stage and emit its event when it ends, the event dict is yielded to be completed.
+
+        Parameters
+        ----------
+        stage : string
+            One of STAGES.
+        name : string, default is ''.
+            What the stage works on e.g. the keyword or the file.
+        bytes : int, default is 0.
+            The bytes read or written.
+        cells : int, default is 0.
+            The number of cells processed.
+
+        Notes
+        -----
+        No event is emitted if the stage raises.
+
+        """
+
+        event = {'stage': stage, 'name': name, 'wall_time': 0.0, 'bytes': bytes, 'cells': cells, 'peak_rss': None}
+
+        start = time.perf_counter()
+        yield event
+        event['wall_time'] = time.perf_counter() - start
+        event['peak_rss'] = get_peak_rss()
+
+        self.emit(event)
+
+    def emit(self, event):
+        r"""
+        Record an event, log it and pass it to the callbacks.
+
+        Parameters
+        ----------
+        event : dict
+            The event (see Notes of Profiler).
+
+        """
+
+        with self._lock:
+            self._events.append(event)
+
+        logger.debug("%s %s: %.6f s, %d bytes, %d cells, peak RSS %s", event['stage'], event['name'],
+                     event['wall_time'], event['bytes'], event['cells'], event['peak_rss'])
+
+        for callback in self._callbacks:
+            callback(event)
+
+    def events(self):
+        r"""
+        Return a copy of the list of the events, in the order they ended.
+
+        """
+
+        with self._lock:
+            return list(self._events)
+
+    def clear(self):
+        r"""
+        Remove all the events.
+
+        """
+
+        with self._lock:
+            self._events = []
+
+    def summary(self):
+        r"""
+        Return the totals of each stage.
+
+        Returns
+        -------
+        summary : dict
+            For each stage with events, in the order of STAGES, a dict with the number of events ('count'),
+                the sum of 'wall_time', 'bytes' and 'cells' and the maximum of 'peak_rss'.
+
+        """
+
+        summary = {}
+
+        for event in self.events():
+            totals = summary.setdefault(event['stage'], {'count': 0, 'wall_time': 0.0, 'bytes': 0, 'cells': 0,
+                                                         'peak_rss': None})
+            totals['count'] += 1
+            totals['wall_time'] += event['wall_time']
+            totals['bytes'] += event['bytes']
+            totals['cells'] += event['cells']
+            if event['peak_rss'] is not None:
+                totals['peak_rss'] = max(totals['peak_rss'] or 0, event['peak_rss'])
+
+        order = STAGES + sorted(x for x in summary if x not in STAGES)
+
+        return {stage: summary[stage] for stage in order if stage in summary}
+
+    def report(self):
+        r"""
+        Return the summary as a table.
+
+        """
+
+        header = "-" * 78
+        lines = [header, "{0:<18s} {1:>6s} {2:>12s} {3:>12s} {4:>12s} {5:>12s}".format(
+            'stage', 'count', 'time (s)', 'MB', 'cells', 'peak RSS (MB)'), header]
+
+        for stage, totals in self.summary().items():
+            peak = '' if totals['peak_rss'] is None else "{:.1f}".format(totals['peak_rss'] / 2**20)
+            lines.append("{0:<18s} {1:>6d} {2:>12.4f} {3:>12.2f} {4:>12d} {5:>12s}".format(
+                stage, totals['count'], totals['wall_time'], totals['bytes'] / 2**20, totals['cells'], peak))
+
+        lines.append(header)
+
+        return "\n".join(lines)
@@ -0,0 +1,172 @@
+r"""
+Coarsening of corner-point grids into blocks of cells, for the level of detail (LOD) previews of large models.
+
+The level n merges blocks of 2**n x 2**n x 2**(n-1) cells along I, J and K (2x2x1, 4x4x2, ...). The corners of
+    each block are taken on the pillars and the layers bounding it, and the properties of its cells are
+    averaged with the weights and the means of METHODS.
+
+"""
+
+from apyce.utils import geometry
+from apyce.utils.Errors import Errors
+
+import numpy as np
+
+# Mean used to upscale each property, the others are arithmetic means
+METHODS = {
+    'ACTNUM': 'any',
+    'PERMX': 'arithmetic',
+    'PERMY': 'arithmetic',
+    'PERMZ': 'harmonic'
+}
+
+
+def get_factors(lod):
+    r"""
+    Return the numbers of cells (FI, FJ, FK) merged into a block along I, J and K.
+
+    Parameters
+    ----------
+    lod : int or tuple
+        The level of detail n >= 1, for blocks of 2**n x 2**n x 2**(n-1) cells, or the numbers of cells
+            of a block (FI, FJ, FK).
+
+    """
+
+    if np.ndim(lod) == 0:
+        if int(lod) < 1:
+            raise ValueError(Errors.LOD_LEVEL_ERROR.value)
+        return 2 ** int(lod), 2 ** int(lod), 2 ** (int(lod) - 1)
+
+    factors = tuple(int(x) for x in lod)
+    if len(factors) != 3 or min(factors) < 1:
+        raise ValueError(Errors.LOD_LEVEL_ERROR.value)
+
+    return factors
+
+
+def get_blocks(cart_dims, factors):
+    r"""
+    Return the bounds of the blocks along I, J and K.
+
+    Parameters
+    ----------
+    cart_dims : ndarray
+        Dimensions of the grid.
+    factors : tuple
+        The numbers of cells (FI, FJ, FK) of a block.
+
+    Returns
+    -------
+    blocks : list
+        For I, J and K, the integer array of the first cell of each block followed by the number of cells,
+            the last block holds the remaining cells when the dimension is not a multiple of the factor.
+
+    """
+
+    return [np.append(np.arange(0, int(n), f), int(n)) for n, f in zip(cart_dims[0:3], factors)]
+
+
+def coarsen_corner_point(coord, zcorn, cart_dims, blocks):
+    r"""
+    Compute the COORD and ZCORN of the grid of the blocks.
+
+    Parameters
+    ----------
+    coord : ndarray
+        A list of floating point numbers that represents the COORD keyword from Schlumberger Eclipse.
+    zcorn : ndarray
+        A list of floating point numbers that represents the ZCORN keyword from Schlumberger Eclipse.
+    cart_dims : ndarray
+        Dimensions of the grid.
+    blocks : list
+        The bounds of the blocks along I, J and K, see get_blocks().
+
+    Returns
+    -------
+    coord, zcorn : ndarray
+        The COORD and ZCORN of the coarse grid.
+
+    Notes
+    -----
+    The pillars of the coarse grid are the pillars at the bounds of the blocks. The depth of each corner of
+        a block is the depth of the same corner of the cell of the block holding it, i.e. the top of the first
+        layer or the bottom of the last layer of the block on that pillar. The pillars inside a block are
+        dropped, so are the faults crossing it.
+
+    """
+
+    bi, bj, bk = blocks
+
+    pillars = geometry.get_pillars(coord, cart_dims)[np.ix_(bj, bi)]
+
+    # Nodes of the low and high faces of each block along each direction of ZCORN
+    nodes = [np.stack([2 * b[:-1], 2 * b[1:] - 1], axis=1).ravel() for b in [bk, bj, bi]]
+    zs = geometry.get_zcorn(zcorn, cart_dims)[np.ix_(*nodes)]
+
+    return pillars.ravel(), zs.ravel()
+
+
+def block_index(cart_dims, blocks):
+    r"""
+    Return the block of each cell, blocks ordered with I running fastest, then J, then K.
+
+    Parameters
+    ----------
+    cart_dims : ndarray
+        Dimensions of the grid.
+    blocks : list
+        The bounds of the blocks along I, J and K, see get_blocks().
+
+    """
+
+    bi, bj, bk = [np.repeat(np.arange(len(b) - 1), np.diff(b)) for b in blocks]
+    nbi, nbj = len(blocks[0]) - 1, len(blocks[1]) - 1
+
+    return ((bk[:, None, None] * nbj + bj[None, :, None]) * nbi + bi[None, None, :]).ravel()
+
+
+def upscale(data, index, n_blocks, weights, method='arithmetic'):
+    r"""
+    Average the values of a property over the cells of each block.
+
+    Parameters
+    ----------
+    data : ndarray
+        Array of size NX*NY*NZ with the values of the property.
+    index : ndarray
+        The block of each cell, see block_index().
+    n_blocks : int
+        The number of blocks.
+    weights : ndarray
+        Array of size NX*NY*NZ with the weight of each cell e.g. its bulk or pore volume, 0 to be ignored.
+    method : string, default is 'arithmetic'.
+        'arithmetic' or 'harmonic' weighted means, or 'any' for 1 if any value of the block is not 0
+            (ACTNUM).
+
+    Returns
+    -------
+    values : ndarray
+        Float array of size n_blocks with the mean of each block, 0 if all the weights of the block are 0.
+
+    Notes
+    -----
+    The harmonic mean of a block with a cell of value 0 (and weight > 0) is 0.
+
+    """
+
+    data = np.asarray(data, dtype=np.float64).ravel()
+
+    if method == 'any':
+        return (np.bincount(index, weights=data != 0, minlength=n_blocks) > 0).astype(np.float64)
+
+    total = np.bincount(index, weights=weights, minlength=n_blocks)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if method == 'harmonic':
+            inverse = np.bincount(index, weights=np.where(weights > 0, weights / data, 0.0), minlength=n_blocks)
+            values = total / inverse
+        else:
+            values = np.bincount(index, weights=weights * data, minlength=n_blocks) / total
+
+    return np.where(total > 0, values, 0.0)
@@ -0,0 +1,51 @@
+r"""
+Benchmark of the installation of the ghost array of the inactive cells.
+
+Compares the legacy loop of InsertNextTuple1 calls with VTK.set_ghost_array, in seconds per million cells.
+
+Usage
+-----
+python -m benchmarks.bench_ghost_array [number of cells]    (from the root of the repository)
+
+"""
+
+from apyce.io import VTK
+
+import numpy as np
+
+import sys
+import time
+
+
+def legacy_ghost_array(vtk_unstructured_grid, ghost_cells):
+    # One Python call per cell, as previously done in Grid._remove_cells
+    vtk_unstructured_grid.AllocateCellGhostArray()
+    ghosts = vtk_unstructured_grid.GetCellGhostArray()
+    for i in ghost_cells:
+        ghosts.InsertNextTuple1(i)
+
+
+def bench(function, ghost_cells, repeat=3):
+    best = np.inf
+    for _ in range(repeat):
+        vtk_unstructured_grid = VTK()
+        start = time.perf_counter()
+        function(vtk_unstructured_grid, ghost_cells)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    n_cells = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    # 70% of inactive cells
+    rng = np.random.default_rng(0)
+    ghost_cells = np.where(rng.random(n_cells) < 0.7, VTK.get_duplicatecell(), 0).astype(np.uint8)
+
+    legacy = bench(legacy_ghost_array, ghost_cells)
+    vectorized = bench(VTK.set_ghost_array, ghost_cells)
+
+    print("Ghost array of {} cells (seconds per million cells)".format(n_cells))
+    print("\tInsertNextTuple1 loop : {:.4f}".format(legacy * 1e6 / n_cells))
+    print("\tVTK.set_ghost_array   : {:.4f}".format(vectorized * 1e6 / n_cells))
+    print("\tSpeedup               : {:.0f}x".format(legacy / vectorized))
@@ -0,0 +1,134 @@
+r"""
+Benchmark of each stage of the APyCE pipeline on synthetic corner-point decks.
+
+For each size, the wall time and the peak RSS of the process (VTK allocations included) during every stage
+    are measured and compared against the baselines stored in 'baselines.json'. The peak RSS is reset before
+    each stage through /proc/self/clear_refs, where it is not available (e.g. macOS) the peak is the high-water
+    mark of the process so far.
+
+Stages
+------
+scan : Grid(), indexing of the keywords of the deck.
+parse : parsing of COORD, ZCORN, ACTNUM, PORO and PERMX.
+process_grid : construction of the points, cells and cell data of the vtkUnstructuredGrid.
+process_grid_weld : the same with the coincident corners welded.
+export : VTK.export_data() of the vtkUnstructuredGrid.
+export_stream : streaming export in K-layer slabs.
+
+Usage
+-----
+python -m benchmarks.bench_pipeline [--cells 10000 100000] [--save] [--tolerance 1.5]    (from the root of the repository)
+
+The decks are written once to 'benchmarks/.decks/'. With --save the results are stored as the new
+    baselines, otherwise a stage slower than tolerance times its baseline (and by more than MIN_DELAY), or
+    whose peak RSS is above tolerance times its baseline (and by more than MIN_MEMORY), is reported and the
+    exit status is 1. Baselines depend on the machine, save them again on a new one.
+
+"""
+
+from apyce.grid import Grid
+from apyce.utils import profiler
+from benchmarks import synthetic
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+DECKS = os.path.join(DIRECTORY, '.decks')
+BASELINES = os.path.join(DIRECTORY, 'baselines.json')
+
+# Slowdowns below this time (s) and growths of the peak RSS below this size (bytes) are noise
+MIN_DELAY = 0.05
+MIN_MEMORY = 16 * 2**20
+
+
+def reset_peak_rss():
+    # Reset the peak RSS to the current RSS (Linux only)
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def measure(function):
+    # Wall time and peak RSS of a stage
+    reset_peak_rss()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    return result, {'time': elapsed, 'peak_rss': profiler.get_peak_rss()}
+
+
+def run(n_cells):
+    filename = synthetic.get_deck(DECKS, n_cells)
+    results_dir = os.path.join(DECKS, 'Results')
+    stages = {}
+
+    G, stages['scan'] = measure(lambda: Grid(filename=filename, verbose=False))
+    _, stages['parse'] = measure(lambda: [G._coord, G._zcorn, G._actnum, G._poro, G._permx])
+    _, stages['process_grid'] = measure(G.process_grid)
+    _, stages['export'] = measure(G.export_data)
+    shutil.rmtree(results_dir)
+
+    W = Grid(filename=filename, verbose=False)
+    _, stages['process_grid_weld'] = measure(lambda: W.process_grid(weld=True))
+
+    S = Grid(filename=filename, verbose=False)
+    _, stages['export_stream'] = measure(lambda: S.export_data(stream=True))
+    shutil.rmtree(results_dir)
+
+    return {'cells': int(G._num_cell), 'stages': stages}
+
+
+def compare(name, result, baseline, tolerance):
+    slow = []
+    print("\n{} ({} cells)".format(name, result['cells']))
+    print("\t{:<20}{:>12}{:>12}{:>16}{:>12}".format('stage', 'time (s)', 'baseline', 'peak RSS (MB)', 'baseline'))
+    for stage, values in result['stages'].items():
+        reference = baseline.get('stages', {}).get(stage, {})
+        time_ref, memory_ref = reference.get('time'), reference.get('peak_rss')
+        peak = values['peak_rss']
+        print("\t{:<20}{:>12.3f}{:>12}{:>16}{:>12}".format(
+            stage, values['time'], '' if time_ref is None else '{:.3f}'.format(time_ref),
+            '' if peak is None else '{:.1f}'.format(peak / 2**20),
+            '' if memory_ref is None else '{:.1f}'.format(memory_ref / 2**20)))
+        if time_ref is not None and values['time'] > max(tolerance * time_ref, time_ref + MIN_DELAY):
+            slow.append('{} / {} (time)'.format(name, stage))
+        if memory_ref is not None and peak is not None and peak > max(tolerance * memory_ref, memory_ref + MIN_MEMORY):
+            slow.append('{} / {} (peak RSS)'.format(name, stage))
+    return slow
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cells', type=int, nargs='+', default=[10000, 100000],
+                        help='approximate number of cells of each deck (10k to 10M)')
+    parser.add_argument('--save', action='store_true', help='store the results as the new baselines')
+    parser.add_argument('--tolerance', type=float, default=1.5, help='allowed slowdown and memory growth against the baselines')
+    args = parser.parse_args()
+
+    baselines = {}
+    if os.path.isfile(BASELINES):
+        with open(BASELINES) as f:
+            baselines = json.load(f)
+
+    slow = []
+    for n_cells in args.cells:
+        name = '{}k'.format(n_cells // 1000)
+        result = run(n_cells)
+        slow += compare(name, result, baselines.get(name, {}), args.tolerance)
+        if args.save:
+            baselines[name] = result
+
+    if args.save:
+        with open(BASELINES, 'w') as f:
+            json.dump(baselines, f, indent=1)
+        print("\nBaselines saved to {}".format(BASELINES))
+    elif slow:
+        print("\nAbove {}x the baselines: {}".format(args.tolerance, ', '.join(slow)))
+        sys.exit(1)
@@ -0,0 +1,116 @@
+r"""
+Generator of synthetic corner-point GRDECL decks for the benchmarks.
+
+The decks describe a dome with a vertical fault in the middle of the I direction, a row of collapsed
+    pillars along J = 0 and a fraction of inactive cells.
+
+"""
+
+import numpy as np
+
+import os
+
+
+def get_dims(n_cells, aspect=(4, 4, 1)):
+    r"""
+    Get the dimensions (NX, NY, NZ) of a grid with about n_cells cells.
+
+    Parameters
+    ----------
+    n_cells : int
+        Approximate number of cells.
+    aspect : tuple, default is (4, 4, 1).
+        Relative number of cells along I, J and K.
+
+    """
+
+    scale = (n_cells / np.prod(aspect)) ** (1 / 3)
+
+    return [max(2, int(round(x * scale))) for x in aspect]
+
+
+def write_deck(filename, cart_dims, throw=5.0, inactive=0.3, seed=0):
+    r"""
+    Write a synthetic corner-point deck.
+
+    Parameters
+    ----------
+    filename : string
+        A string that holds the name (path) of the deck.
+    cart_dims : list
+        Dimensions (NX, NY, NZ) of the grid.
+    throw : float, default is 5.0.
+        Vertical offset of the cells on the right side of the fault (I >= NX/2).
+    inactive : float, default is 0.3.
+        Fraction of inactive cells (ACTNUM = 0).
+    seed : int, default is 0.
+        Seed of the random ACTNUM and properties.
+
+    """
+
+    nx, ny, nz = cart_dims
+    rng = np.random.default_rng(seed)
+
+    # Slightly tilted pillars over a 50 x 50 m grid, the pillars along J = 0 are collapsed
+    x, y = np.meshgrid(np.arange(nx+1) * 50.0, np.arange(ny+1) * 50.0)
+    top = np.full(x.shape, 1000.0)
+    btm = np.full(x.shape, 1100.0)
+    btm[0, :] = top[0, :]
+    coord = np.stack([x, y, top, x + 0.01 * x, y, btm], axis=-1)
+
+    # Layers of a dome, 2 m thick, with the right block thrown down
+    xc, yc = (np.arange(2*nx) // 2 + np.arange(2*nx) % 2) * 50.0, (np.arange(2*ny) // 2 + np.arange(2*ny) % 2) * 50.0
+    dome = 1000.0 + 1e-4 * ((xc[None, :] - xc.mean()) ** 2 + (yc[:, None] - yc.mean()) ** 2)
+    dome = dome + np.where(np.arange(2*nx) // 2 >= nx // 2, throw, 0.0)[None, :]
+    depth = 2.0 * (np.arange(2*nz) // 2 + np.arange(2*nz) % 2)
+    zcorn = depth[:, None, None] + dome[None, :, :]
+
+    n_cells = nx * ny * nz
+    actnum = (rng.random(n_cells) >= inactive).astype(int)
+    poro = rng.uniform(0.05, 0.35, n_cells)
+    permx = rng.lognormal(4.0, 1.0, n_cells)
+
+    with open(filename, 'w') as f:
+        f.write('-- Synthetic deck {} x {} x {}\n'.format(nx, ny, nz))
+        f.write('SPECGRID\n{} {} {} 1 F /\n\n'.format(nx, ny, nz))
+        _write_keyword(f, 'COORD', coord.ravel(), '%.3f', 6)
+        _write_keyword(f, 'ZCORN', zcorn.ravel(), '%.3f', 8)
+        _write_keyword(f, 'ACTNUM', actnum, '%d', 20)
+        _write_keyword(f, 'PORO', poro, '%.4f', 10)
+        _write_keyword(f, 'PERMX', permx, '%.2f', 10)
+
+
+def get_deck(directory, n_cells, **kwargs):
+    r"""
+    Get the path of the synthetic deck with about n_cells cells, writing it if it does not exist.
+
+    Parameters
+    ----------
+    directory : string
+        A string that holds the directory of the decks.
+    n_cells : int
+        Approximate number of cells.
+    kwargs : dict
+        Options of write_deck().
+
+    """
+
+    cart_dims = get_dims(n_cells)
+    filename = os.path.join(directory, 'SYNTHETIC_{}x{}x{}.grdecl'.format(*cart_dims))
+
+    if not os.path.isfile(filename):
+        os.makedirs(directory, exist_ok=True)
+        write_deck(filename + '.tmp', cart_dims, **kwargs)
+        os.replace(filename + '.tmp', filename)
+
+    return filename
+
+
+def _write_keyword(f, keyword, values, fmt, columns):
+    # Full rows then the remaining values
+    f.write(keyword + '\n')
+    n_full = len(values) // columns * columns
+    np.savetxt(f, values[:n_full].reshape(-1, columns), fmt=fmt)
+    if n_full < len(values):
+        np.savetxt(f, values[n_full:].reshape(1, -1), fmt=fmt)
+    f.write('/\n\n')
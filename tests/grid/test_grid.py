@@ -1,6 +1,13 @@
 from apyce.grid import Grid
+from apyce.io import VTK
+from apyce.utils import geometry
+
+import numpy as np
+import pytest
+import vtk
 
 import os
+import shutil
 
 FILE = '../Data/dome.grdecl'
 BASENAME = 'dome.grdecl'
@@ -11,6 +18,8 @@ class TestGrid():
     def test_constructor(self):
         G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
         assert isinstance(G, Grid)
+        with pytest.raises(FileNotFoundError, match="Can't open the file"):
+            Grid(filename='nope.grdecl', grid_origin='eclipse', verbose=False)
 
     def test_process_grid(self):
         G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
@@ -30,4 +39,267 @@ class TestGrid():
         G.process_grid()
         assert G.export_data() is None
         os.remove(DIRNAME + '/Results/dome.vtu')
-        os.removedirs(DIRNAME + '/Results')
\ No newline at end of file
+        os.removedirs(DIRNAME + '/Results')
+
+    def test_lazy_keywords(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        assert 'PORO' in G._index
+        assert '_poro' not in G.__dict__
+        assert len(G._poro) == 1600
+        assert '_poro' in G.__dict__
+        assert G._so == []
+
+    def test_process_grid_properties(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        G.process_grid(properties=['poro'])
+        assert G._vtk_unstructured_grid.GetCellData().GetArray('PORO') is not None
+        assert G._vtk_unstructured_grid.GetCellData().GetArray('PERMX') is None
+        assert '_permx' not in G.__dict__
+
+    def test_export_data_stream(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        assert G.export_data(stream=True, slab_size=1) is None
+        assert os.path.getsize(DIRNAME + '/Results/dome.vtu') > 1600 * 24 * 8
+        os.remove(DIRNAME + '/Results/dome.vtu')
+        os.removedirs(DIRNAME + '/Results')
+
+    def test_export_data_parallel(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        assert G.export_data(parallel=2) is None
+        assert os.path.isfile(DIRNAME + '/Results/dome.pvtu')
+        assert os.path.isfile(DIRNAME + '/Results/dome/dome_1.vtu')
+        shutil.rmtree(DIRNAME + '/Results')
+
+    def test_process_grid_active_only(self, tmp_path):
+        filename = str(tmp_path / 'dome.grdecl')
+        shutil.copy(FILE, filename)
+        with open(filename, 'a') as f:
+            f.write('\nACTNUM\n' + '1 0 0 1 ' * 400 + '/\n')
+
+        G = Grid(filename=filename, grid_origin='eclipse', verbose=False)
+        G.process_grid()
+        A = Grid(filename=filename, grid_origin='eclipse', verbose=False)
+        A.process_grid(active_only=True)
+
+        ug = A._vtk_unstructured_grid
+        assert ug.GetNumberOfCells() == 800
+        assert ug.GetNumberOfPoints() == 6400
+        assert ug.GetCellGhostArray() is None
+        assert list(A._global_index[:4]) == [0, 3, 4, 7]
+        assert ug.GetCellData().GetArray('GLOBAL_INDEX').GetValue(3) == 7
+        assert ug.GetCellData().GetArray('PORO').GetValue(3) == G._vtk_unstructured_grid.GetCellData().GetArray('PORO').GetValue(7)
+        assert ug.GetCell(3).GetPoints().GetPoint(6) == G._vtk_unstructured_grid.GetCell(7).GetPoints().GetPoint(6)
+        assert A._n_collapsed == G._n_collapsed
+
+        A.load_cell_data(filename='../Data/dome_Temperature.txt', name='TEMP')
+        assert ug.GetCellData().GetArray('TEMP').GetNumberOfTuples() == 800
+
+        # Processing again drops the arrays of the previous call
+        G.process_grid(active_only=True)
+        assert G._vtk_unstructured_grid.GetCellGhostArray() is None
+        G.process_grid(properties=['PORO'])
+        assert G._vtk_unstructured_grid.GetCellData().GetArray('GLOBAL_INDEX') is None
+        assert G._vtk_unstructured_grid.GetCellData().GetArray('PERMX') is None
+
+    def test_process_grid_weld(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        G.process_grid(weld=True)
+        assert G._vtk_unstructured_grid.GetNumberOfPoints() == 2400
+        assert G._vtk_unstructured_grid.GetNumberOfCells() == 1600
+
+    def test_zero_copy(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False, zero_copy=True)
+        G.process_grid()
+        poro = G._vtk_unstructured_grid.GetCellData().GetArray('PORO')
+        assert poro.GetDataType() == vtk.VTK_DOUBLE
+        assert np.shares_memory(G._cell_buffers['PORO'], G._poro)
+
+        # Only the new array is added
+        G.load_cell_data(filename='../Data/dome_Temperature.txt', name='TEMP')
+        assert G._vtk_unstructured_grid.GetCellData().GetArray('PORO') is poro
+        assert 'TEMP' in G._cell_buffers
+
+    def test_load_cell_data_many(self, tmp_path):
+        filename = str(tmp_path / 'SWAT.txt')
+        with open(filename, 'w') as f:
+            f.write('1600*0.5 /\n')
+
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        G.process_grid()
+        poro = G._vtk_unstructured_grid.GetCellData().GetArray('PORO')
+        G.load_cell_data_many({'TEMP': '../Data/dome_Temperature.txt', 'SWAT': filename})
+        assert G._keywords[-2:] == ['TEMP', 'SWAT']
+        assert G._vtk_unstructured_grid.GetCellData().GetArray('SWAT').GetValue(10) == 0.5
+        assert G._vtk_unstructured_grid.GetCellData().GetArray('PORO') is poro
+
+        # A replaced array is pushed again
+        G._cell_data['SWAT'] = np.full(1600, 0.25)
+        G._update()
+        assert G._vtk_unstructured_grid.GetCellData().GetArray('SWAT').GetValue(10) == 0.25
+
+    def test_io_workers(self, tmp_path):
+        with open(FILE) as f:
+            deck = f.read()
+        # Move the COORD and ZCORN sections to nested INCLUDE files
+        start, end = deck.index('COORD'), deck.index('/', deck.index('ZCORN')) + 1
+        (tmp_path / 'INC').mkdir()
+        (tmp_path / 'INC' / 'ZCORN.INC').write_text(deck[deck.index('ZCORN'):end] + '\n')
+        (tmp_path / 'INC' / 'GRID.INC').write_text(deck[start:deck.index('ZCORN')] + "\nINCLUDE\n'ZCORN.INC' /\n")
+        filename = str(tmp_path / 'dome.grdecl')
+        with open(filename, 'w') as f:
+            f.write(deck[:start] + "\nINCLUDE\n'INC/GRID.INC' /\n" + deck[end:])
+
+        G = Grid(filename=filename, grid_origin='eclipse', verbose=False)
+        P = Grid(filename=filename, grid_origin='eclipse', verbose=False, io_workers=4)
+        assert P._files == G._files
+        assert P._keywords == G._keywords
+        assert P._index == G._index
+        assert '_zcorn' in P.__dict__
+        assert np.array_equal(P._zcorn, G._zcorn)
+
+        # Same errors in both modes
+        (tmp_path / 'INC' / 'GRID.INC').write_text("PORO\n1600*0.2 /\nSPECGRID\n20 20 4 1 F /\n")
+        with open(filename, 'w') as f:
+            f.write("INCLUDE\n'INC/GRID.INC' /\n")
+        for workers in [None, 2]:
+            with pytest.raises(ValueError, match='PORO'):
+                Grid(filename=filename, grid_origin='eclipse', verbose=False, io_workers=workers)
+
+    def test_compressed_include(self, tmp_path):
+        import gzip
+
+        with open(FILE, 'rb') as f:
+            deck = f.read()
+        start, end = deck.index(b'ZCORN'), deck.index(b'/', deck.index(b'ZCORN')) + 1
+        (tmp_path / 'ZCORN.INC.gz').write_bytes(gzip.compress(deck[start:end]))
+        (tmp_path / 'dome.grdecl.gz').write_bytes(gzip.compress(deck[:start] + b"INCLUDE\n'ZCORN.INC.gz' /\n" + deck[end:]))
+
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        C = Grid(filename=str(tmp_path / 'dome.grdecl.gz'), grid_origin='eclipse', verbose=False)
+        assert np.array_equal(C._zcorn, G._zcorn)
+        assert np.array_equal(C._poro, G._poro)
+
+    def test_float32(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        G.process_grid()
+        F = Grid(filename=FILE, grid_origin='eclipse', verbose=False, dtype='float32')
+        F.process_grid()
+        assert F._zcorn.dtype == np.float32
+        assert F._poro.dtype == np.float32
+        assert F._vtk_unstructured_grid.GetPoints().GetDataType() == vtk.VTK_FLOAT
+        assert np.allclose(F._vtk_unstructured_grid.GetPoint(100), G._vtk_unstructured_grid.GetPoint(100), rtol=1e-6)
+
+    def test_profile(self):
+        events = []
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False, callback=events.append)
+        G.process_grid(properties=['PORO'])
+        assert [x['stage'] for x in events][0] == 'file read'
+        assert events[0]['bytes'] == os.path.getsize(FILE)
+        assert {x['name'] for x in events if x['stage'] == 'keyword parse'} == {'COORD', 'ZCORN', 'PORO'}
+        assert [x['cells'] for x in events if x['stage'] in ['point build', 'cell build']] == [1600, 1600]
+        assert G.profile(events=True) == events
+        assert 'property attach' in G.profile()
+        # The callbacks are passed to the grids extracted from this one
+        assert G.subgrid(k=(0, 1))._profiler.callbacks() == [events.append]
+
+    def test_compute_topology(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        G.process_grid()
+        connections = G.compute_topology()
+        n_nnc = np.count_nonzero(connections['nnc'])
+        assert n_nnc > 0
+        assert G._vtk_unstructured_grid.GetCellData().GetArray('FAULT') is not None
+        assert G._vtk_unstructured_grid.GetFieldData().GetArray('NNC1').GetNumberOfTuples() == n_nnc
+
+    def test_compute_geometry(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        G.process_grid()
+        cell_geometry = G.compute_geometry()
+        assert G.compute_geometry() is cell_geometry
+        size = vtk.vtkCellSizeFilter()
+        size.SetInputData(G._vtk_unstructured_grid)
+        size.Update()
+        volume = VTK.vtk_to_numpy(size.GetOutput().GetCellData().GetArray('Volume'))
+        assert np.allclose(cell_geometry['volume'], volume)
+        assert np.allclose(G.pore_volume(), volume * G._poro)
+
+    def test_locate(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        G.process_grid()
+        grid = G._vtk_unstructured_grid
+        # Points near the top of each cell of the layer K = 2 and points spread over the box of the grid
+        coords = geometry.corner_point_coords(G._coord, G._zcorn, G._cart_dims)[0]
+        bounds = np.reshape(grid.GetBounds(), (3, 2))
+        points = np.concatenate([coords[800:1200].mean(axis=1) * 0.8 + coords[800:1200, 0:4].mean(axis=1) * 0.2,
+                                 np.random.default_rng(0).uniform(bounds[:, 0], bounds[:, 1], (2000, 3))])
+        ijk = G.locate(points)
+        locator = vtk.vtkCellLocator()
+        locator.SetDataSet(grid)
+        locator.BuildLocator()
+        cell, weights, ids = vtk.vtkGenericCell(), [0.0] * 8, vtk.vtkIdList()
+        checked = 0
+        for point, found in zip(points, ijk):
+            # Skip the points on a face shared by several cells
+            locator.FindCellsWithinBounds(np.repeat(point, 2) + np.tile([-1e-6, 1e-6], 3), ids)
+            holding = [ids.GetId(n) for n in range(ids.GetNumberOfIds())
+                       if grid.GetCell(ids.GetId(n)).EvaluatePosition(point, [0.0] * 3, vtk.reference(0), [0.0] * 3,
+                                                                      vtk.reference(0.0), weights) == 1]
+            if len(holding) > 1:
+                continue
+            expected = locator.FindCell(point, 0.0, cell, [0.0] * 3, weights)
+            assert (np.dot(found, [1, 20, 400]) if found[0] >= 0 else -1) == expected
+            checked += 1
+        assert checked > 2300 and np.count_nonzero(ijk[:, 0] >= 0) > 400
+        assert G.locate([[0, 0, 0]]).tolist() == [[-1, -1, -1]]
+        with pytest.raises(ValueError):
+            Grid(filename='../Data/Cart2D_Fault.data', grid_origin='eclipse', verbose=False).locate([[0, 0, 0]])
+
+    def test_subgrid(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        S = G.subgrid(i=(3, 12), j=(5, 9), k=(1, 3))
+        assert S._cart_dims.tolist() == [9, 4, 2]
+        assert np.shares_memory(S._coord, G._coord) and np.shares_memory(S._zcorn, G._zcorn)
+        coords = geometry.corner_point_coords(G._coord, G._zcorn, G._cart_dims)[0].reshape(4, 20, 20, 8, 3)
+        assert np.array_equal(S._get_cell_coords(), coords[1:3, 5:9, 3:12].reshape(-1, 8, 3))
+        assert np.array_equal(S._poro, np.reshape(G._poro, (4, 20, 20))[1:3, 5:9, 3:12].ravel())
+        S.process_grid()
+        assert S._vtk_unstructured_grid.GetNumberOfCells() == 72
+        # Region of two cells of the layer K = 1
+        mask = np.zeros(1600, dtype=bool)
+        mask[[405, 427]] = True
+        M = G.subgrid(mask=mask)
+        assert M._cart_dims.tolist() == [3, 2, 1]
+        assert M._actnum.tolist() == [1, 0, 0, 0, 0, 1]
+        with pytest.raises(ValueError):
+            G.subgrid(i=(5, 5))
+
+    def test_subgrid_name(self, tmp_path):
+        # The results of the subgrid don't overwrite the ones of a grid whose name has several dots
+        filename = str(tmp_path / 'dome.v2.grdecl')
+        shutil.copy(FILE, filename)
+        G = Grid(filename=filename, grid_origin='eclipse', verbose=False)
+        G.export_data(stream=True)
+        G.subgrid(i=(3, 12)).export_data(stream=True)
+        assert sorted(os.listdir(str(tmp_path / 'Results'))) == ['dome.vtu', 'dome_I3-12_J0-20_K0-4.vtu']
+
+    def test_coarsen(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        C = G.coarsen(lod=1)
+        assert C._cart_dims.tolist() == [10, 10, 4]
+        # Only the bulk volumes are computed, the geometry is not cached
+        assert not G._geometry
+        # PORO weighted by the net volume keeps the pore volume, up to the geometry of the blocks
+        assert np.isclose(C.pore_volume().sum(), G.pore_volume().sum(), rtol=0.01)
+        G.export_data(lod=(4, 4, 2), stream=True)
+        assert os.path.isfile(DIRNAME + '/Results/dome_LOD4x4x2.vtu')
+        assert [x['name'] for x in G.profile(events=True) if x['stage'] == 'write'] == ['dome_LOD4x4x2.vtu']
+        shutil.rmtree(DIRNAME + '/Results')
+
+    def test_coarsen_name(self, tmp_path):
+        # The LOD results don't overwrite the ones of a grid whose name has several dots
+        filename = str(tmp_path / 'dome.v2.grdecl')
+        shutil.copy(FILE, filename)
+        G = Grid(filename=filename, grid_origin='eclipse', verbose=False)
+        G.export_data(stream=True)
+        G.export_data(lod=1, stream=True)
+        assert sorted(os.listdir(str(tmp_path / 'Results'))) == ['dome.vtu', 'dome_LOD2x2x1.vtu']
@@ -0,0 +1,99 @@
+from apyce.grid import Grid
+from apyce.io import Cache
+
+import numpy as np
+import pytest
+from vtk.util.numpy_support import vtk_to_numpy
+
+import os
+import shutil
+
+FILE = '../Data/dome.grdecl'
+
+
+class TestCache():
+    def test_get_directory(self):
+        assert Cache.get_directory(FILE) == os.path.abspath('../Data/.apyce_cache/dome.grdecl')
+
+    def test_grid_cache(self, tmp_path):
+        filename = str(tmp_path / 'dome.grdecl')
+        shutil.copy(FILE, filename)
+
+        G = Grid(filename=filename, grid_origin='eclipse', verbose=False, cache=True)
+        assert os.path.isfile(os.path.join(Cache.get_directory(filename), Cache.MANIFEST))
+
+        C = Grid(filename=filename, grid_origin='eclipse', verbose=False, cache=True)
+        assert isinstance(C._zcorn, np.memmap)
+        assert np.array_equal(C._zcorn, G._zcorn)
+        assert np.array_equal(C._cart_dims, G._cart_dims)
+        assert C._keywords == G._keywords
+        assert C._files == [os.path.abspath(filename)]
+
+        C.process_grid()
+        assert C._vtk_unstructured_grid.GetNumberOfCells() == 1600
+
+    def test_unwritable_cache(self, tmp_path):
+        filename = str(tmp_path / 'dome.grdecl')
+        shutil.copy(FILE, filename)
+        # A file in the way of the cache directory
+        open(str(tmp_path / Cache.DIRECTORY), 'w').close()
+        open(str(tmp_path / Cache.GEOMETRY), 'w').close()
+
+        with pytest.warns(UserWarning, match="Can't write the cache"):
+            G = Grid(filename=filename, grid_origin='eclipse', verbose=False, cache=True)
+            G.process_grid()
+        assert G._vtk_unstructured_grid.GetNumberOfCells() == 1600
+
+    def test_invalidation(self, tmp_path):
+        filename = str(tmp_path / 'dome.grdecl')
+        include = str(tmp_path / 'PORO.INC')
+        shutil.copy(FILE, filename)
+        with open(include, 'w') as f:
+            f.write('PORO\n1600*0.25 /\n')
+        with open(filename, 'a') as f:
+            f.write("\nINCLUDE\n'PORO.INC' /\n")
+
+        G = Grid(filename=filename, grid_origin='eclipse', verbose=False, cache=True)
+        assert G._files == [os.path.abspath(filename), os.path.abspath(include)]
+        assert Cache.load(filename)[0] is not None
+
+        # Touching a file without changing it keeps the cache valid
+        os.utime(include, ns=(0, 0))
+        assert Cache.load(filename)[0] is not None
+
+        # Changing an included file invalidates the cache
+        with open(include, 'w') as f:
+            f.write('PORO\n1600*0.30 /\n')
+        assert Cache.load(filename)[0] is None
+
+        C = Grid(filename=filename, grid_origin='eclipse', verbose=False, cache=True)
+        assert not isinstance(C._poro, np.memmap)
+        assert np.all(C._poro == 0.30)
+        assert np.all(Grid(filename=filename, grid_origin='eclipse', verbose=False, cache=True)._poro == 0.30)
+
+    def test_geometry_cache(self, tmp_path):
+        filename = str(tmp_path / 'dome.grdecl')
+        shutil.copy(FILE, filename)
+
+        G = Grid(filename=filename, grid_origin='eclipse', verbose=False, cache=True)
+        G.process_grid()
+        key = G._get_geometry_key([G._coord, G._zcorn])
+        assert Cache.load_geometry(filename, key)[0] == {'n_collapsed': 544}
+        # Kept apart from the caches of the grid files, whatever their names
+        assert os.path.isdir(str(tmp_path / '.apyce_geometry' / key))
+
+        # Changing a property keeps the geometry
+        with open(filename, 'a') as f:
+            f.write('\nSO\n1600*0.7 /\n')
+        C = Grid(filename=filename, grid_origin='eclipse', verbose=False, cache=True)
+        assert C._get_geometry_key([C._coord, C._zcorn]) == key
+        C.process_grid()
+        assert C._n_collapsed == 544
+        assert np.array_equal(vtk_to_numpy(C._vtk_unstructured_grid.GetPoints().GetData()),
+                              vtk_to_numpy(G._vtk_unstructured_grid.GetPoints().GetData()))
+        assert C._vtk_unstructured_grid.GetCellData().GetArray('SO').GetValue(0) == np.float32(0.7)
+
+        # Other options give another geometry
+        C.process_grid(weld=True)
+        assert C._get_geometry_key([C._coord, C._zcorn]) != key
+        assert C._vtk_unstructured_grid.GetNumberOfPoints() == 2400
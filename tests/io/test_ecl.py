@@ -0,0 +1,71 @@
+from apyce.grid import Grid
+from apyce.io import ECL
+
+import numpy as np
+
+FILE = '../Data/dome.grdecl'
+
+
+def write_ecl(filename, arrays):
+    # Write (keyword, type, values) as big-endian unformatted Fortran records
+    with open(filename, 'wb') as f:
+        for keyword, data_type, values in arrays:
+            values = np.asarray(values, dtype=ECL.TYPES[data_type])
+            header = keyword.ljust(8).encode() + np.array(len(values), '>i4').tobytes() + data_type.encode()
+            f.write(np.array(16, '>i4').tobytes() + header + np.array(16, '>i4').tobytes())
+            block = ECL.CHAR_BLOCK_SIZE if data_type == 'CHAR' else ECL.BLOCK_SIZE
+            for i in range(0, len(values), block):
+                data = values[i:i+block].tobytes()
+                f.write(np.array(len(data), '>i4').tobytes() + data + np.array(len(data), '>i4').tobytes())
+
+
+class TestECL():
+    def test_read(self, tmp_path):
+        filename = str(tmp_path / 'CASE.EGRID')
+        zcorn = np.arange(2500, dtype=np.float32)
+        write_ecl(filename, [('FILEHEAD', 'INTE', np.arange(100)), ('MAPUNITS', 'CHAR', [b'METRES  ']),
+                             ('ZCORN', 'REAL', zcorn), ('ACTNUM', 'INTE', [1, 0, 1]), ('ZCORN', 'REAL', [1.0])])
+        f = ECL(filename)
+        assert ECL.is_binary(filename)
+        assert f.keywords() == ['FILEHEAD', 'MAPUNITS', 'ZCORN', 'ACTNUM', 'ZCORN']
+        assert f.read('MAPUNITS')[0] == b'METRES  '
+        assert np.array_equal(f.read('ZCORN'), zcorn)
+        assert f.read('ZCORN').dtype == np.float32
+        assert list(f.read('ACTNUM')) == [1, 0, 1]
+        assert list(f.read('ZCORN', -1)) == [1.0]
+        assert f.read('PORO') is None
+
+    def test_find_file(self, tmp_path):
+        write_ecl(str(tmp_path / 'CASE.INIT'), [])
+        assert ECL.find_file(str(tmp_path / 'CASE.EGRID'), 'INIT') == str(tmp_path / 'CASE.INIT')
+        assert ECL.find_file(str(tmp_path / 'CASE.EGRID'), 'UNRST') is None
+        assert not ECL.is_binary(FILE)
+
+    def test_grid(self, tmp_path):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        actnum = np.ones(1600, dtype=int)
+        actnum[::3] = 0
+        active = actnum == 1
+        soil = np.linspace(0, 1, np.count_nonzero(active))
+
+        write_ecl(str(tmp_path / 'DOME.EGRID'), [('FILEHEAD', 'INTE', np.zeros(100)),
+                                                ('GRIDHEAD', 'INTE', [1, 20, 20, 4] + [0] * 96),
+                                                ('COORD', 'REAL', G._coord), ('ZCORN', 'REAL', G._zcorn),
+                                                ('ACTNUM', 'INTE', actnum), ('ENDGRID', 'INTE', [])])
+        write_ecl(str(tmp_path / 'DOME.INIT'), [('PORO', 'REAL', G._poro[active])])
+        write_ecl(str(tmp_path / 'DOME.UNRST'), [('SEQNUM', 'INTE', [0]), ('SOIL', 'REAL', np.zeros(len(soil))),
+                                                ('SEQNUM', 'INTE', [1]), ('SOIL', 'REAL', soil)])
+
+        E = Grid(filename=str(tmp_path / 'DOME.EGRID'), grid_origin='eclipse', verbose=False)
+        assert E._grid_type == 'corner-point'
+        assert list(E._cart_dims) == [20, 20, 4]
+        assert np.array_equal(E._coord, G._coord.astype(np.float32))
+        assert np.array_equal(E._actnum, actnum)
+        assert np.array_equal(E._poro[active], G._poro[active].astype(np.float32))
+        assert np.all(E._poro[~active] == 0)
+        assert np.array_equal(E._so[active], soil.astype(np.float32))
+        assert 'FILEHEAD' in E._unrec
+
+        E.process_grid()
+        assert E._vtk_unstructured_grid.GetNumberOfCells() == 1600
+        assert E._vtk_unstructured_grid.GetCellData().GetArray('SO') is not None
@@ -0,0 +1,84 @@
+from apyce.io import GRDECL
+
+import numpy as np
+import pytest
+
+FILE = '../Data/dome.grdecl'
+
+
+class TestGRDECL():
+    def test_readline(self):
+        with GRDECL(FILE) as f:
+            assert f.readline() == b'NOECHO\n'
+            assert f.readline() == b'PINCH\n'
+
+    def test_read_section(self):
+        with GRDECL(FILE) as f:
+            while not f.readline().startswith(b'COORD'):
+                pass
+            coord, count = f.read_section(6*21*21)
+            assert count == 6*21*21
+            assert coord[0] == 0.60814319E+03
+            assert coord[-1] == 0.26257432E+04
+            assert f.readline().startswith(b'ZCORN')
+
+    def test_read_section_repeat(self, tmp_path):
+        filename = tmp_path / 'repeat.grdecl'
+        filename.write_text('ACTNUM\n3*1 2*0\n-- 5*1 / comment\n1 4*0 -- 2*1\n2*1 / ignored\nPORO\n')
+        with GRDECL(filename) as f:
+            f.readline()
+            actnum, count = f.read_section(12, dtype=np.int32)
+            assert count == 12
+            assert actnum.dtype == np.int32
+            assert list(actnum) == [1, 1, 1, 0, 0, 1, 0, 0, 0, 0, 1, 1]
+            assert f.readline() == b'PORO\n'
+
+    def test_read_section_size(self, tmp_path):
+        filename = tmp_path / 'size.grdecl'
+        filename.write_text('PORO\n0.1 0.2 0.3\n0.4 /\n')
+        with GRDECL(filename) as f:
+            f.readline()
+            poro, count = f.read_section(2)
+            assert count == 4
+            assert list(poro) == [0.1, 0.2]
+
+    def test_read_section_eof(self, tmp_path):
+        filename = tmp_path / 'eof.grdecl'
+        filename.write_text('PORO\n0.1 0.2 0.3\n')
+        with GRDECL(filename) as f:
+            f.readline()
+            with pytest.raises(EOFError):
+                f.read_section(3)
+
+    def test_skip_section(self, tmp_path):
+        filename = tmp_path / 'skip.grdecl'
+        filename.write_text('PORO\n0.1 2*0.2 -- 5*1 / comment\n0.3 / ignored\nPERMX\n')
+        with GRDECL(filename) as f:
+            f.readline()
+            offset, length = f.skip_section()
+            assert f.readline() == b'PERMX\n'
+            f.seek(offset)
+            poro, count = f.read_section(4)
+            assert list(poro) == [0.1, 0.2, 0.2, 0.3]
+            assert f.tell() == offset + length
+
+    def test_compressed(self, tmp_path):
+        import bz2
+        import gzip
+        import lzma
+
+        with open(FILE, 'rb') as f:
+            deck = f.read()
+        for extension, module in [('.gz', gzip), ('.bz2', bz2), ('.xz', lzma), ('', gzip)]:
+            filename = tmp_path / ('dome.grdecl' + extension)
+            filename.write_bytes(module.compress(deck))
+            assert GRDECL.get_compression(filename) == ('xz' if module is lzma else module.__name__)
+            with GRDECL(filename) as f:
+                while not f.readline().startswith(b'COORD'):
+                    pass
+                offset, _ = f.skip_section()
+                f.seek(offset)
+                coord, count = f.read_section(6*21*21)
+                assert coord[-1] == 0.26257432E+04
+
+        assert GRDECL.get_compression(FILE) is None
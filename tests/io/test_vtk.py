@@ -40,3 +40,31 @@ class TestVTK():
         vtk_unstructured_grid = VTK()
         VTK.numpy_to_vtk(keyword, data_array, vtk_unstructured_grid, False)
         assert vtk_unstructured_grid.GetCellData().GetArray('PORO').GetSize() == 1600
+
+    def test_create_hexahedra(self):
+        vtk_unstructured_grid = VTK()
+        vtk_unstructured_grid.SetPoints(VTK.create_points(np.zeros((16, 3))))
+        VTK.create_hexahedra(vtk_unstructured_grid, np.arange(16).reshape(2, 8))
+        assert vtk_unstructured_grid.GetNumberOfCells() == 2
+        assert vtk_unstructured_grid.GetCellType(1) == vtk.VTK_HEXAHEDRON
+        ids = vtk_unstructured_grid.GetCell(1).GetPointIds()
+        assert [ids.GetId(i) for i in range(8)] == [8, 9, 11, 10, 12, 13, 15, 14]
+
+    def test_set_ghost_array(self):
+        vtk_unstructured_grid = VTK()
+        VTK.set_ghost_array(vtk_unstructured_grid, np.array([0, 1, 0, 1]))
+        ghosts = vtk_unstructured_grid.GetCellGhostArray()
+        assert ghosts is not None
+        assert [ghosts.GetValue(i) for i in range(4)] == [0, 1, 0, 1]
+
+    def test_numpy_to_vtk(self):
+        vtk_unstructured_grid = VTK()
+        data = np.array([1, 0, 1], dtype=np.int32)
+        assert VTK.numpy_to_vtk('ACTNUM', data, vtk_unstructured_grid, False, np.uint8).dtype == np.uint8
+        assert vtk_unstructured_grid.GetCellData().GetArray('ACTNUM').GetDataType() == vtk.VTK_UNSIGNED_CHAR
+
+        data = np.array([0.1, 0.2, 0.3])
+        shared = VTK.numpy_to_vtk('PERMX', data, vtk_unstructured_grid, False, None, deep=False)
+        assert np.shares_memory(shared, data)
+        data[0] = 5.0
+        assert vtk_unstructured_grid.GetCellData().GetArray('PERMX').GetValue(0) == 5.0
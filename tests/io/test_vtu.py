@@ -0,0 +1,67 @@
+from apyce.grid import Grid
+from apyce.io import VTU
+
+import vtk
+import vtk.util.numpy_support as np_support
+import numpy as np
+
+FILE = '../Data/dome.grdecl'
+
+
+def read_vtu(filename):
+    reader = vtk.vtkXMLUnstructuredGridReader()
+    reader.SetFileName(filename)
+    reader.Update()
+    return reader.GetOutput()
+
+
+class TestVTU():
+    def test_write_corner_point(self, tmp_path):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        G.process_grid()
+        actnum = np.ones(1600, dtype=np.int32)
+        actnum[::7] = 0
+
+        filename = str(tmp_path / 'dome.vtu')
+        VTU.write_corner_point(filename, G._coord, G._zcorn, G._cart_dims, {'PORO': G._poro}, actnum, slab_size=3)
+        ug = read_vtu(filename)
+
+        assert ug.GetNumberOfCells() == 1600
+        assert np.array_equal(np_support.vtk_to_numpy(ug.GetPoints().GetData()),
+                              np_support.vtk_to_numpy(G._vtk_unstructured_grid.GetPoints().GetData()))
+        assert [ug.GetCell(5).GetPointId(i) for i in range(8)] == \
+               [G._vtk_unstructured_grid.GetCell(5).GetPointId(i) for i in range(8)]
+        assert np.array_equal(np_support.vtk_to_numpy(ug.GetCellData().GetArray('PORO')), G._poro.astype(np.float32))
+        assert np.array_equal(np_support.vtk_to_numpy(ug.GetCellGhostArray()) != 0, actnum == 0)
+
+        # Names with characters reserved by XML
+        VTU.write_corner_point(filename, G._coord, G._zcorn, G._cart_dims, {'S<1 & "2"': G._poro})
+        assert read_vtu(filename).GetCellData().GetArray('S<1 & "2"') is not None
+
+    def test_write_layers(self, tmp_path):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        filename = str(tmp_path / 'dome.vtu')
+        VTU.write_corner_point(filename, G._coord, G._zcorn, G._cart_dims, {'PORO': G._poro}, k_start=1, k_stop=3)
+        ug = read_vtu(filename)
+
+        assert ug.GetNumberOfCells() == 800
+        assert ug.GetNumberOfPoints() == 6400
+        assert np.array_equal(np_support.vtk_to_numpy(ug.GetCellData().GetArray('PORO')),
+                              G._poro[400:1200].astype(np.float32))
+
+    def test_write_partitioned(self, tmp_path):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        G.process_grid()
+        filename = str(tmp_path / 'dome.pvtu')
+        VTU.write_partitioned(filename, G._coord, G._zcorn, G._cart_dims, {'PORO': G._poro}, n_pieces=3)
+        assert sorted(x.name for x in (tmp_path / 'dome').iterdir()) == ['dome_0.vtu', 'dome_1.vtu', 'dome_2.vtu']
+
+        reader = vtk.vtkXMLPUnstructuredGridReader()
+        reader.SetFileName(filename)
+        reader.Update()
+        ug = reader.GetOutput()
+
+        assert ug.GetNumberOfCells() == 1600
+        assert np.array_equal(np_support.vtk_to_numpy(ug.GetPoints().GetData()),
+                              np_support.vtk_to_numpy(G._vtk_unstructured_grid.GetPoints().GetData()))
+        assert np.array_equal(np_support.vtk_to_numpy(ug.GetCellData().GetArray('PORO')), G._poro.astype(np.float32))
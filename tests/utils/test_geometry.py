@@ -0,0 +1,182 @@
+from apyce.grid import Grid
+from apyce.utils import misc, geometry
+
+import numpy as np
+
+FILE = '../Data/dome.grdecl'
+CARTESIAN_FILE = '../Data/Cart2D_Fault.data'
+
+
+def block_centred_coords_loop(dx, dy, dz, tops, cart_dims):
+    # Node by node construction previously done in Grid._process_grdecl_block_centred
+    nx, ny, nz = cart_dims[0:3]
+    coord_x = np.zeros((2*nx, 2*ny, 2*nz))
+    coord_y = np.zeros((2*nx, 2*ny, 2*nz))
+    coord_z = np.zeros((2*nx, 2*ny, 2*nz))
+    for k in range(2*nz):
+        for j in range(2*ny):
+            for i in range(2*nx):
+                I, J, K = int(i/2), int(j/2), int(k/2)
+                ijk = misc.get_ijk(I, J, K, nx, ny, nz)
+                if k == 0:
+                    coord_z[i][j][k] = tops[ijk]
+                if 0 < i < 2*nx-1:
+                    coord_x[i][j][k] = dx[ijk]
+                    if i > 2:
+                        coord_x[i][j][k] = dx[ijk] + coord_x[i-1][j][k]
+                    if i > 1 and i%2 == 0:
+                        coord_x[i][j][k] = coord_x[i-1][j][k]
+                if 0 < j < 2*ny-1:
+                    coord_y[i][j][k] = dy[ijk]
+                    if j > 2:
+                        coord_y[i][j][k] = dy[ijk] + coord_y[i][j-1][k]
+                    if j > 1 and j%2 == 0:
+                        coord_y[i][j][k] = coord_y[i][j-1][k]
+                if 0 < k < 2*nz-1:
+                    coord_z[i][j][k] = dz[ijk]
+                    if k > 2:
+                        coord_z[i][j][k] = dz[ijk] + coord_z[i][j][k-1]
+                    if k > 1 and k%2 == 0:
+                        coord_z[i][j][k] = coord_z[i][j][k-1]
+                if i == 2*nx-1:
+                    coord_x[i][j][k] = dx[ijk] + coord_x[i-1][j][k]
+                if j == 2*ny-1:
+                    coord_y[i][j][k] = dy[ijk] + coord_y[i][j-1][k]
+                if k == 2*nz-1:
+                    coord_z[i][j][k] = dz[ijk] + coord_z[i][j][k-1]
+    return np.stack([coord_x, coord_y, coord_z], axis=-1).transpose(2, 1, 0, 3).reshape(-1, 3)
+
+
+class TestGeometry():
+    def test_get_pillars(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        pillars = geometry.get_pillars(G._coord, G._cart_dims)
+        assert pillars.shape == (21, 21, 2, 3)
+        assert np.array_equal(pillars[0, 1, 0], G._coord[6:9])
+
+    def test_get_zcorn(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        zs = geometry.get_zcorn(G._zcorn, G._cart_dims)
+        assert zs.shape == (8, 40, 40)
+        assert zs[1, 0, 0] == G._zcorn[40*40]
+
+    def test_corner_point_coords(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        coords, n_collapsed = geometry.corner_point_coords(G._coord, G._zcorn, G._cart_dims)
+        assert coords.shape == (1600, 8, 3)
+        assert n_collapsed == 544
+
+        # Compare with the interpolation along the pillars done node by node
+        nx, ny, nz = G._cart_dims
+        for i, j, k in [(0, 0, 0), (7, 3, 1), (19, 19, 3)]:
+            cell = coords[k*nx*ny + j*nx + i]
+            for n in range(8):
+                ii, jj, kk = n % 2, (n // 2) % 2, n // 4
+                p = 6 * ((j+jj) * (nx+1) + (i+ii))
+                top, btm = G._coord[p:p+3], G._coord[p+3:p+6]
+                z = G._zcorn[(2*k+kk) * 4*nx*ny + (2*j+jj) * 2*nx + (2*i+ii)]
+                t = 0.0 if abs(btm[2] - top[2]) < geometry.COINCIDENCE_TOLERANCE else (z - top[2]) / (btm[2] - top[2])
+                assert np.array_equal(cell[n], [top[0] + t * (btm[0] - top[0]), top[1] + t * (btm[1] - top[1]), z])
+
+    def test_corner_point_coords_layers(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        coords, _ = geometry.corner_point_coords(G._coord, G._zcorn, G._cart_dims)
+        layers, _ = geometry.corner_point_coords(G._coord, G._zcorn, G._cart_dims, k_start=1, k_stop=3)
+        assert np.array_equal(layers, coords[400:1200])
+
+    def test_active_corner_point_coords(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        coords, n_collapsed = geometry.corner_point_coords(G._coord, G._zcorn, G._cart_dims)
+        active = np.flatnonzero(np.arange(1600) % 3 != 0)
+        active_coords, active_collapsed = geometry.active_corner_point_coords(G._coord, G._zcorn, G._cart_dims, active)
+        assert np.array_equal(active_coords, coords[active])
+        assert active_collapsed == n_collapsed
+
+    def test_weld_points(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        coords, _ = geometry.corner_point_coords(G._coord, G._zcorn, G._cart_dims)
+        points, connectivity = geometry.weld_points(coords, G._cart_dims)
+        assert len(points) == 2400
+        assert np.array_equal(points[connectivity], coords)
+
+    def test_weld_points_fault(self):
+        # Two cells sharing the pillars x = 1, the right one thrown down by 0.25
+        coord = np.array([[x, y, 0.0, x, y, 1.0] for y in range(2) for x in range(3)]).ravel()
+        zcorn = np.array([[0, 0, 0.25, 0.25] * 2, [1, 1, 1.25, 1.25] * 2]).ravel()
+        coords, _ = geometry.corner_point_coords(coord, zcorn, [2, 1, 1])
+        points, connectivity = geometry.weld_points(coords, [2, 1, 1])
+        assert len(points) == 16
+        points, connectivity = geometry.weld_points(coords, [2, 1, 1], tolerance=0.3)
+        assert len(points) == 12
+        assert connectivity[0, 1] == connectivity[1, 0]
+
+    def test_block_centred_coords(self):
+        G = Grid(filename=CARTESIAN_FILE, grid_origin='eclipse', verbose=False)
+        coords = geometry.block_centred_coords(G._dx, G._dy, G._dz, G._tops, G._cart_dims)
+        assert coords.shape == (8*120, 3)
+        assert np.array_equal(coords, block_centred_coords_loop(G._dx, G._dy, G._dz, G._tops, G._cart_dims))
+
+    def test_block_centred_coords_layers(self):
+        cart_dims = np.array([3, 2, 4])
+        dx, dy, dz = np.full(24, 10.0), np.full(24, 20.0), np.arange(1.0, 25.0)
+        tops = np.full(6, 1000.0)
+        coords = geometry.block_centred_coords(dx, dy, dz, tops, cart_dims)
+        loop = block_centred_coords_loop(dx, dy, dz, tops, cart_dims)
+        assert np.array_equal(coords[:, 0:2], loop[:, 0:2])
+
+        # Each layer starts where the previous one ends, below TOPS
+        zs = coords[:, 2].reshape(8, 4, 6)
+        assert np.array_equal(zs[0], np.full((4, 6), 1000.0))
+        assert np.array_equal(zs[7, 0, 0:2], [1040.0, 1040.0])
+        assert np.array_equal(zs[2], zs[1])
+
+    def test_block_centred_connectivity(self):
+        connectivity = geometry.block_centred_connectivity(np.array([9, 3, 1]))
+        assert connectivity.shape == (27, 8)
+        assert list(connectivity[1]) == [2, 3, 20, 21, 110, 111, 128, 129]
+
+    def test_face_connections(self):
+        # 2 x 1 x 3 grid of 1 m layers, the right column thrown down by half a layer
+        cart_dims = [2, 1, 3]
+        zcorn = np.repeat(np.array([0, 1, 1, 2, 2, 3], dtype=float), 8).reshape(6, 2, 4)
+        zcorn[:, :, 2:] += 0.5
+        connections = geometry.face_connections(zcorn.ravel(), cart_dims)
+        lateral = connections['direction'] == 0
+        assert list(zip(connections['cell1'][lateral], connections['cell2'][lateral])) == [(0, 1), (2, 1), (2, 3),
+                                                                                           (4, 3), (4, 5)]
+        assert np.all(connections['fault'][lateral])
+        assert list(connections['nnc'][lateral]) == [False, True, False, True, False]
+        assert np.allclose(connections['overlap'][lateral], 0.5)
+        assert np.count_nonzero(connections['direction'] == 2) == 4
+
+        # Without throw, only the neighbours in (I, J, K) are connected
+        zcorn[:, :, 2:] -= 0.5
+        connections = geometry.face_connections(zcorn.ravel(), cart_dims, actnum=[1, 1, 1, 1, 0, 1])
+        assert not np.any(connections['fault']) and not np.any(connections['nnc'])
+        assert len(connections['cell1']) == 5
+
+    def test_hexahedron_geometry(self):
+        # 2 x 3 x 4 box with the depth pointing down, then sheared and collapsed
+        box = np.array([[2*ii, 3*jj, 4*kk] for kk in range(2) for jj in range(2) for ii in range(2)], dtype=float)
+        sheared = box.copy()
+        sheared[4:, 0] += 1
+        collapsed = box.copy()
+        collapsed[4:, 2] = 0
+        volume, centroid, face_areas, face_normals = geometry.hexahedron_geometry(np.stack([box, sheared, collapsed]))
+        assert np.allclose(volume, [24, 24, 0])
+        assert np.allclose(centroid[0:2], [[1, 1.5, 2], [1.5, 1.5, 2]])
+        assert np.allclose(face_areas[0], [12, 12, 8, 8, 6, 6])
+        assert np.allclose(face_normals[0], [[-1, 0, 0], [1, 0, 0], [0, -1, 0], [0, 1, 0], [0, 0, -1], [0, 0, 1]])
+        assert np.all(face_normals[2, 0:4] == 0) and not np.any(np.isnan(centroid))
+        assert np.array_equal(geometry.hexahedron_volume(np.stack([box, sheared, collapsed])), volume)
+
+    def test_locate_points(self):
+        # 2 x 2 x 2 grid of 10 m cells with the right column thrown down by 5 m
+        coord = np.array([[10*i, 10*j, 0, 10*i, 10*j, 100] for j in range(3) for i in range(3)], dtype=float)
+        zcorn = np.repeat(np.array([0, 10, 10, 20], dtype=float), 16).reshape(4, 4, 4)
+        zcorn[:, :, 2:] += 5
+        cart_dims = [2, 2, 2]
+        index = geometry.column_index(coord.ravel(), zcorn.ravel(), cart_dims)
+        points = [[5, 5, 2], [15, 5, 2], [15, 15, 12], [5, 15, 19], [25, 5, 5], [5, 5, 21]]
+        ijk = geometry.locate_points(points, coord.ravel(), zcorn.ravel(), cart_dims, index)
+        assert ijk.tolist() == [[0, 0, 0], [-1, -1, -1], [1, 1, 0], [0, 1, 1], [-1, -1, -1], [-1, -1, -1]]
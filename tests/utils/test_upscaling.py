@@ -0,0 +1,38 @@
+from apyce.grid import Grid
+from apyce.utils import geometry, upscaling
+
+import numpy as np
+import pytest
+
+FILE = '../Data/dome.grdecl'
+
+
+class TestUpscaling():
+    def test_get_factors(self):
+        assert upscaling.get_factors(1) == (2, 2, 1)
+        assert upscaling.get_factors(2) == (4, 4, 2)
+        assert upscaling.get_factors([3, 3, 1]) == (3, 3, 1)
+        with pytest.raises(ValueError, match='level of detail'):
+            upscaling.get_factors(0)
+        with pytest.raises(ValueError, match='level of detail'):
+            upscaling.get_factors([2, 2])
+
+    def test_coarsen_corner_point(self):
+        G = Grid(filename=FILE, grid_origin='eclipse', verbose=False)
+        blocks = upscaling.get_blocks(G._cart_dims, (3, 3, 4))
+        assert blocks[2].tolist() == [0, 4]
+        assert blocks[0].tolist() == [0, 3, 6, 9, 12, 15, 18, 20]
+        coord, zcorn = upscaling.coarsen_corner_point(G._coord, G._zcorn, G._cart_dims, blocks)
+        coords = geometry.corner_point_coords(coord, zcorn, [7, 7, 1])[0]
+        fine = geometry.corner_point_coords(G._coord, G._zcorn, G._cart_dims)[0].reshape(4, 20, 20, 8, 3)
+        # The corners of the first block are the outer corners of its cells
+        assert np.allclose(coords[0], [fine[kk*3, jj*2, ii*2, kk*4 + jj*2 + ii]
+                                       for kk in range(2) for jj in range(2) for ii in range(2)])
+
+    def test_upscale(self):
+        index = np.array([0, 0, 1, 1])
+        weights = np.array([1.0, 3.0, 1.0, 0.0])
+        data = np.array([2.0, 4.0, 0.0, 5.0])
+        assert np.allclose(upscaling.upscale(data, index, 2, weights), [3.5, 0.0])
+        assert np.allclose(upscaling.upscale(data, index, 2, weights, 'harmonic'), [4 / (1 / 2 + 3 / 4), 0.0])
+        assert upscaling.upscale(data, index, 2, weights, 'any').tolist() == [1, 1]